@@ -10,15 +10,24 @@ For each task:
   - Ensure the Issue is present in ProjectV2
   - Set ProjectV2.Status according to task.status
 
+Only tasks changed since the last run (--state, default .tasks-sync-state.json)
+are synced; --full resyncs every task.
+
 Required env:
   GITHUB_TOKEN
   GITHUB_OWNER   (e.g. "basilisk-labs")
   GITHUB_REPO    (e.g. "codex-swarm")
   GITHUB_PROJECT_NUMBER  (integer project number from URL)
+
+Optional env (set by GitHub Actions; override to point at another server):
+  GITHUB_API_URL      (default "https://api.github.com")
+  GITHUB_GRAPHQL_URL  (default "$GITHUB_API_URL/graphql")
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -30,9 +39,16 @@ import requests
 
 ROOT = Path(__file__).resolve().parents[2]  # repo root
 TASKS_PATH = ROOT / "tasks.json"
+SYNC_STATE_PATH = ROOT / ".tasks-sync-state.json"
+SYNC_STATE_VERSION = 1
 
-GITHUB_API_REST = "https://api.github.com"
-GITHUB_API_GRAPHQL = "https://api.github.com/graphql"
+GITHUB_API_REST = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_API_GRAPHQL = os.environ.get("GITHUB_GRAPHQL_URL", f"{GITHUB_API_REST}/graphql")
+
+TASK_ID_LABEL_PREFIX = "task-id:"
+# Update responses meaning the recorded issue is no longer in this repo:
+# moved to another repo (301, not followed), deleted (404) or gone (410).
+ISSUE_GONE_STATUSES = (301, 404, 410)
 
 OWNER = os.environ["GITHUB_OWNER"]
 REPO = os.environ["GITHUB_REPO"]
@@ -58,7 +74,7 @@ def load_tasks() -> List[Dict[str, Any]]:
 
 def build_labels(task: Dict[str, Any]) -> List[str]:
     labels: List[str] = []
-    labels.append(f"task-id:{task['id']}")
+    labels.append(f"{TASK_ID_LABEL_PREFIX}{task['id']}")
 
     labels.append(f"status:{task['status']}")
     labels.append(f"priority:{task.get('priority', 'med')}")
@@ -101,42 +117,66 @@ def build_body(task: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def find_issue_by_task_id(task_id: str) -> Optional[Dict[str, Any]]:
-    """Search issue by label task-id:<id>. Returns first match or None."""
-    label = f"task-id:{task_id}"
-    url = f"{GITHUB_API_REST}/repos/{OWNER}/{REPO}/issues"
-    params = {"labels": label, "state": "all", "per_page": 50}
-    r = SESSION.get(url, params=params)
-    r.raise_for_status()
-    issues = r.json()
-    return issues[0] if issues else None
-
-
-def create_issue(task: Dict[str, Any]) -> Dict[str, Any]:
-    url = f"{GITHUB_API_REST}/repos/{OWNER}/{REPO}/issues"
-    data = {
+def fetch_task_issues() -> Dict[str, Dict[str, Any]]:
+    """
+    Index the repo's task-id:<id> issues by task id (the newest wins).
+    """
+    url: Optional[str] = f"{GITHUB_API_REST}/repos/{OWNER}/{REPO}/issues"
+    params: Optional[Dict[str, Any]] = {
+        "state": "all",
+        "sort": "created",
+        "direction": "desc",
+        "per_page": 100,
+    }
+    issues_by_task_id: Dict[str, Dict[str, Any]] = {}
+    while url:
+        r = SESSION.get(url, params=params)
+        r.raise_for_status()
+        for issue in r.json():
+            if "pull_request" in issue:
+                continue
+            for label in issue.get("labels", []):
+                name = label["name"] if isinstance(label, dict) else label
+                if name.startswith(TASK_ID_LABEL_PREFIX):
+                    issues_by_task_id.setdefault(name[len(TASK_ID_LABEL_PREFIX):], issue)
+        url = r.links.get("next", {}).get("url")
+        params = None  # the next link already carries the query
+    return issues_by_task_id
+
+
+def build_issue_fields(task: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         "title": build_title(task),
         "body": build_body(task),
         "labels": build_labels(task),
+        "state": "closed" if task["status"] == "DONE" else "open",
     }
+
+
+def issue_fields_hash(fields: Dict[str, Any]) -> str:
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def create_issue(task: Dict[str, Any]) -> Dict[str, Any]:
+    url = f"{GITHUB_API_REST}/repos/{OWNER}/{REPO}/issues"
+    data = build_issue_fields(task)
+    data.pop("state")  # new issues are always open
     r = SESSION.post(url, json=data)
     r.raise_for_status()
     return r.json()
 
 
-def update_issue(issue: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
+def update_issue(issue: Dict[str, Any], task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    PATCH the issue with the task's fields; None when it left the repo.
+    """
     number = issue["number"]
     url = f"{GITHUB_API_REST}/repos/{OWNER}/{REPO}/issues/{number}"
-
-    desired_state = "closed" if task["status"] == "DONE" else "open"
-
-    data = {
-        "title": build_title(task),
-        "body": build_body(task),
-        "labels": build_labels(task),
-        "state": desired_state,
-    }
-    r = SESSION.patch(url, json=data)
+    data = build_issue_fields(task)
+    r = SESSION.patch(url, json=data, allow_redirects=False)
+    if r.status_code in ISSUE_GONE_STATUSES:
+        return None
     r.raise_for_status()
     return r.json()
 
@@ -203,25 +243,27 @@ def get_project_and_status_field():
     return project_id, status_field["id"], options_by_name
 
 
-def find_project_item_by_task_id(
-    project_id: str, task_id: str
-) -> Optional[str]:
+def fetch_project_items(project_id: str) -> Dict[int, str]:
     """
-    Use project items search by issue title: "[T-XXX] ..."
-    Returns item_id or None.
+    Returns {issue number: item_id} for the ProjectV2 items that are issues of this repo.
     """
-    search = f"[{task_id}]"
     query = """
-    query($projectId: ID!, $search: String!) {
+    query($projectId: ID!, $cursor: String) {
       node(id: $projectId) {
         ... on ProjectV2 {
-          items(first: 5, query: $search) {
+          items(first: 100, after: $cursor) {
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
             nodes {
               id
               content {
                 ... on Issue {
                   number
-                  title
+                  repository {
+                    nameWithOwner
+                  }
                 }
               }
             }
@@ -230,11 +272,22 @@ def find_project_item_by_task_id(
       }
     }
     """
-    data = gql(query, {"projectId": project_id, "search": search})
-    items = data["node"]["items"]["nodes"]
-    if not items:
-        return None
-    return items[0]["id"]
+    repo = f"{OWNER}/{REPO}".lower()
+    items_by_number: Dict[int, str] = {}
+    cursor: Optional[str] = None
+    while True:
+        data = gql(query, {"projectId": project_id, "cursor": cursor})
+        items = data["node"]["items"]
+        for node in items["nodes"]:
+            content = node.get("content") or {}
+            if "number" not in content:
+                continue  # draft issue or pull request
+            if (content.get("repository") or {}).get("nameWithOwner", "").lower() != repo:
+                continue
+            items_by_number.setdefault(content["number"], node["id"])
+        if not items["pageInfo"]["hasNextPage"]:
+            return items_by_number
+        cursor = items["pageInfo"]["endCursor"]
 
 
 def add_issue_to_project(project_id: str, issue_node_id: str) -> str:
@@ -271,7 +324,7 @@ def set_project_status(
     option_id = options_by_name.get(status_name)
     if not option_id:
         print(f"[WARN] Status option '{status_name}' not found in project; skip")
-        return
+        return False
 
     mutation = """
     mutation($projectId: ID!, $itemId: ID!, $fieldId: ID!, $optionId: String!) {
@@ -298,6 +351,7 @@ def set_project_status(
             "optionId": option_id,
         },
     )
+    return True
 
 
 STATUS_MAP = {
@@ -307,42 +361,169 @@ STATUS_MAP = {
     "DONE": "DONE",
 }
 
-def sync():
-    project_id, status_field_id, status_options_by_name = get_project_and_status_field()
+# ---------- Sync state ----------
 
+def load_sync_state(path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns {task_id: {"hash", "status", "issue", "item"}} from the last run, or {}.
+    """
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if (
+        not isinstance(state, dict)
+        or state.get("version") != SYNC_STATE_VERSION
+        or state.get("repo") != f"{OWNER}/{REPO}"
+        or state.get("project") != PROJECT_NUMBER
+    ):
+        return {}
+    return state.get("tasks") or {}
+
+
+def store_sync_state(path: Path, tasks_state: Dict[str, Dict[str, Any]]) -> None:
+    state = {
+        "version": SYNC_STATE_VERSION,
+        "repo": f"{OWNER}/{REPO}",
+        "project": PROJECT_NUMBER,
+        "tasks": tasks_state,
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def sync(full: bool = False, state_path: Path = SYNC_STATE_PATH):
     tasks = load_tasks()
+    previous = {} if full else load_sync_state(state_path)
+
+    # Tasks whose rendered issue fields and project Status match the last run are
+    # skipped without any request; the others keep their old entry until synced.
+    synced: Dict[str, Dict[str, Any]] = {}
+    pending = []
     for task in tasks:
         task_id = task["id"]
-        print(f"\n=== {task_id} ===")
+        fields = build_issue_fields(task)
+        fields_hash = issue_fields_hash(fields)
+        status_name = STATUS_MAP.get(task["status"], "Todo")
+        entry = previous.get(task_id)
+        if entry is not None:
+            synced[task_id] = entry
+            if entry.get("hash") == fields_hash and entry.get("status") == status_name:
+                continue
+        pending.append((task, fields, fields_hash, status_name, entry))
+
+    print(f"[*] {len(pending)} of {len(tasks)} task(s) to sync" + (" (full)" if full else ""))
+    try:
+        if pending:
+            _sync_pending(pending, synced)
+    finally:
+        store_sync_state(state_path, synced)
+
+
+def _sync_pending(pending, synced: Dict[str, Dict[str, Any]]) -> None:
+    project_id, status_field_id, status_options_by_name = get_project_and_status_field()
 
-        existing = find_issue_by_task_id(task_id)
-        if existing is None:
-            print(f"[+] create issue")
-            issue = create_issue(task)
-        else:
-            print(f"[*] update issue #{existing['number']}")
-            issue = update_issue(existing, task)
+    # Tasks synced before carry their issue number and project item; only tasks
+    # without one need the issue/item listing (to find issues created elsewhere).
+    issues_by_task_id: Dict[str, Dict[str, Any]] = {}
+    items_by_task_id: Dict[str, str] = {}
+    prefetched = False
+
+    def prefetch() -> None:
+        nonlocal issues_by_task_id, items_by_task_id, prefetched
+        if prefetched:
+            return
+        prefetched = True
+        issues_by_task_id = fetch_task_issues()
+        items_by_number = fetch_project_items(project_id)
+        items_by_task_id = {
+            task_id: items_by_number[issue["number"]]
+            for task_id, issue in issues_by_task_id.items()
+            if issue["number"] in items_by_number
+        }
+        print(
+            f"[*] prefetched {len(issues_by_task_id)} task issue(s), "
+            f"{len(items_by_task_id)} of them in the project"
+        )
+
+    if any(entry is None for _, _, _, _, entry in pending):
+        prefetch()
 
-        issue_node_id = issue["node_id"]
+    for task, fields, fields_hash, status_name, entry in pending:
+        task_id = task["id"]
+        print(f"\n=== {task_id} ===")
 
-        item_id = find_project_item_by_task_id(project_id, task_id)
+        issue: Optional[Dict[str, Any]] = None
+        if entry is not None and entry.get("hash") == fields_hash:
+            print(f"[=] issue #{entry['issue']} unchanged")
+            issue = {"number": entry["issue"]}
+        elif entry is not None:
+            print(f"[*] update issue #{entry['issue']}")
+            issue = update_issue({"number": entry["issue"]}, task)
+            if issue is None:
+                print(f"[!] issue #{entry['issue']} was deleted or transferred; dropping its sync state")
+                del synced[task_id]
+                entry = None
+                prefetch()
+
+        if entry is None:
+            existing = issues_by_task_id.get(task_id)
+            if existing is not None:
+                print(f"[*] update issue #{existing['number']}")
+                issue = update_issue(existing, task)
+            if issue is None:
+                print("[+] create issue")
+                issue = create_issue(task)
+                # A new issue is open; record that so a DONE task gets closed next run.
+                fields_hash = issue_fields_hash(dict(fields, state=issue.get("state", "open")))
+
+        item_id = entry["item"] if entry is not None else items_by_task_id.get(task_id)
         if item_id is None:
             print("[+] add issue to project")
-            item_id = add_issue_to_project(project_id, issue_node_id)
+            item_id = add_issue_to_project(project_id, issue["node_id"])
         else:
             print(f"[*] project item {item_id}")
 
-        task_status = task["status"]
-        status_name = STATUS_MAP.get(task_status, "Todo")
-        print(f"[*] set project Status -> {status_name}")
-        set_project_status(
-            project_id=project_id,
-            item_id=item_id,
-            field_id=status_field_id,
-            status_name=status_name,
-            options_by_name=status_options_by_name,
-        )
+        synced_status = None
+        if entry is not None and entry.get("item") == item_id and entry.get("status") == status_name:
+            synced_status = status_name
+        else:
+            print(f"[*] set project Status -> {status_name}")
+            if set_project_status(
+                project_id=project_id,
+                item_id=item_id,
+                field_id=status_field_id,
+                status_name=status_name,
+                options_by_name=status_options_by_name,
+            ):
+                synced_status = status_name
+
+        synced[task_id] = {
+            "hash": fields_hash,
+            "status": synced_status,
+            "issue": issue["number"],
+            "item": item_id,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync tasks.json to GitHub Issues and ProjectV2 Status.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="ignore the sync state and update every task",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default=SYNC_STATE_PATH,
+        metavar="PATH",
+        help="sync-state file (default: .tasks-sync-state.json in the repo root)",
+    )
+    args = parser.parse_args()
+    sync(full=args.full, state_path=args.state)
 
 
 if __name__ == "__main__":
-    sync()
+    main()
@@ -26,6 +26,7 @@ rm -rf \
   docs \
   README.md \
   tasks.html \
+  tests \
   LICENSE \
   tasks.json \
   CONTRIBUTING.md \
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""Benchmark harness for agentctl.
+
+Generates synthetic backlogs (tasks.json with depends_on DAGs, comment threads
+and tags) in scratch git workspaces, times agentctl subcommands there (wall time
+and peak RSS of each agentctl process) and compares the results with a stored
+baseline.
+
+    python scripts/agentctl_bench.py generate --tasks 20000 --output /tmp/backlog
+    python scripts/agentctl_bench.py run --sizes 1000,10000 --output bench.json
+    python scripts/agentctl_bench.py compare bench.json --baseline bench-baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPT_DIR.parent
+AGENTS_DIR = ROOT / ".AGENTS"
+AGENTCTL_FILES = ("agentctl.py", "agentctl_core.py")
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.20
+DEFAULT_RSS_THRESHOLD = 0.20
+# Differences below this are noise for process-level timings, whatever the ratio.
+MIN_REGRESSION_MS = 10.0
+
+OWNERS = ("CODER", "PLANNER", "REVIEWER", "TESTER", "DOCS", "CREATOR")
+TAGS = (
+    "agentctl", "api", "backend", "bug", "ci", "cleanup", "docs", "frontend", "garmin", "infra",
+    "lint", "perf", "readme", "refactor", "release", "security", "sync", "tests", "ui", "workflow",
+)
+WORDS = (
+    "add", "agent", "allowlist", "board", "cache", "check", "cleanup", "commit", "config", "coverage",
+    "dependency", "deploy", "diff", "docs", "endpoint", "error", "export", "fix", "flow", "guard",
+    "handler", "index", "journal", "lint", "loader", "metrics", "migrate", "parser", "pipeline", "plan",
+    "readme", "refactor", "release", "report", "review", "schema", "script", "search", "status", "sync",
+    "task", "template", "test", "timeout", "update", "validate", "verify", "workflow", "worker", "write",
+)
+SEARCH_TERM = "pipeline"
+
+
+def die(message: str, code: int = 1) -> None:
+    print(message, file=sys.stderr)
+    raise SystemExit(code)
+
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def generate_tasks(count: int, *, seed: int = 0) -> List[Dict]:
+    """A lint-clean backlog shaped like a long-running project: mostly DONE, depends_on pointing at earlier tasks."""
+    rng = random.Random(seed)
+    tasks: List[Dict] = []
+    done_until = int(count * 0.75)
+    statuses: List[str] = []
+    for index in range(count):
+        task_id = f"T-{index + 1:06d}"
+        if index < done_until:
+            status = "DONE" if rng.random() < 0.97 else rng.choice(("DOING", "BLOCKED"))
+        else:
+            status = rng.choices(("TODO", "DOING", "BLOCKED"), weights=(60, 25, 15))[0]
+        window = range(max(0, index - 200), index)
+        wanted = min(len(window), rng.choices((0, 1, 2, 3), weights=(40, 35, 17, 8))[0])
+        deps = sorted(rng.sample(window, wanted))
+        if status in ("DOING", "DONE"):
+            deps = [dep for dep in deps if statuses[dep] == "DONE"]
+        title = _sentence(rng, 3, 8).capitalize()
+        task: Dict = {
+            "id": task_id,
+            "title": title,
+            "description": _sentence(rng, 12, 40).capitalize() + ".",
+            "status": status,
+            "priority": rng.choice(("low", "med", "high")),
+            "owner": rng.choice(OWNERS),
+            "depends_on": [tasks[dep]["id"] for dep in deps],
+            "tags": sorted(rng.sample(TAGS, rng.randint(1, 3))),
+            "comments": [
+                {"author": rng.choice(OWNERS), "body": _sentence(rng, 8, 40).capitalize() + "."}
+                for _ in range(rng.randint(2, 12) if status == "DONE" else rng.randint(0, 4))
+            ],
+        }
+        if status == "DONE":
+            task["commit"] = {"hash": f"{rng.getrandbits(160):040x}", "message": f"✨ {task_id} {title}"}
+        if rng.random() < 0.1:
+            task["verify"] = ["python -c pass"]
+        tasks.append(task)
+        statuses.append(status)
+    return tasks
+
+
+def write_backlog(path: Path, tasks: List[Dict]) -> None:
+    """Write tasks.json exactly as agentctl would (sha256-merkle meta)."""
+    sys.path.insert(0, str(SCRIPT_DIR))
+    from agentctl_core import update_tasks_meta
+
+    data: Dict = {"tasks": tasks, "meta": {"schema_version": 1, "managed_by": "agentctl"}}
+    update_tasks_meta(data)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def make_workspace(path: Path, tasks: List[Dict]) -> None:
+    """A scratch git repo holding the current agentctl scripts, the agent registry and the backlog."""
+    if path.exists() and any(path.iterdir()):
+        die(f"Workspace is not empty: {path}")
+    (path / "scripts").mkdir(parents=True, exist_ok=True)
+    for name in AGENTCTL_FILES:
+        shutil.copy2(SCRIPT_DIR / name, path / "scripts" / name)
+    if AGENTS_DIR.is_dir():
+        shutil.copytree(AGENTS_DIR, path / ".AGENTS")
+    (path / ".gitignore").write_text("/.agentctl/\n__pycache__/\n", encoding="utf-8")
+    write_backlog(path / "tasks.json", tasks)
+    git = ["git", "-c", "user.name=agentctl-bench", "-c", "user.email=bench@localhost"]
+    for cmd in (["init", "-q"], ["add", "scripts", ".gitignore", *([".AGENTS"] if AGENTS_DIR.is_dir() else [])]):
+        subprocess.run(["git", *cmd], cwd=path, check=True, capture_output=True)
+    subprocess.run([*git, "commit", "-q", "-m", "bench: workspace"], cwd=path, check=True, capture_output=True)
+
+
+def bench_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Measure what users get: cached bytecode, no resident server, no optional modes.
+    for name in ("PYTHONDONTWRITEBYTECODE", "AGENTCTL_NO_CACHE", "AGENTCTL_JOURNAL", "AGENTCTL_SQLITE", "AGENTCTL_TRACE"):
+        env.pop(name, None)
+    env["AGENTCTL_NO_SERVER"] = "1"
+    return env
+
+
+def measure(argv: List[str], cwd: Path, env: Dict[str, str]) -> Tuple[float, float]:
+    """Run one agentctl command; return (wall ms, peak RSS MiB) of that process alone."""
+    with tempfile.TemporaryFile() as errors:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "scripts/agentctl.py", *argv], cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=errors
+        )
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = (time.perf_counter() - start) * 1000
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode not in (0, 2):
+            errors.seek(0)
+            tail = errors.read().decode("utf-8", "replace").strip().splitlines()[-5:]
+            die(f"agentctl {' '.join(argv)} failed with exit code {proc.returncode}:\n" + "\n".join(tail))
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, rss
+
+
+def bench_plan(tasks: List[Dict], repeat: int) -> List[Tuple[str, List[List[str]]]]:
+    """(name, argv per run) for every benchmarked subcommand; run 0 is the cold-cache run."""
+    by_id = {task["id"]: task for task in tasks}
+    ready = [
+        task["id"]
+        for task in tasks
+        if task["status"] == "TODO" and all(by_id[dep]["status"] == "DONE" for dep in task["depends_on"])
+    ]
+    doing = [task["id"] for task in tasks if task["status"] == "DOING"]
+    runs = repeat + 1
+    if len(ready) < 2 * runs or len(doing) < runs:
+        die(f"Backlog of {len(tasks)} tasks is too small for --repeat {repeat}")
+    middle = tasks[len(tasks) // 2]["id"]
+    start_body = "Start: benchmark run exercising the start command path end to end"
+    same = lambda *argv: [list(argv)] * runs  # noqa: E731
+    return [
+        ("task list", same("task", "list")),
+        ("task list --status TODO", same("task", "list", "--status", "TODO")),
+        ("task next", same("task", "next", "--limit", "20")),
+        ("task search", same("task", "search", SEARCH_TERM, "--limit", "20")),
+        ("task search --regex", same("task", "search", "--regex", f"{SEARCH_TERM} (fix|sync)", "--limit", "20")),
+        ("task show", same("task", "show", middle)),
+        ("task lint", same("task", "lint")),
+        ("ready", same("ready", ready[-1])),
+        ("task comment", [["task", "comment", middle, "--author", "CODER", "--body", f"bench note {n}"] for n in range(runs)]),
+        ("start", [["start", task_id, "--author", "CODER", "--body", start_body] for task_id in ready[:runs]]),
+        ("finish", [["finish", task_id, "--skip-verify", "--no-require-task-id-in-commit", "--quiet"] for task_id in doing[:runs]]),
+    ]
+
+
+def bench_size(size: int, *, repeat: int, seed: int, keep: Optional[Path]) -> Dict:
+    scratch = Path(tempfile.mkdtemp(prefix=f"agentctl-bench-{size}-"))
+    workspace = scratch / "repo" if keep is None else keep / str(size)
+    plan_path = scratch / "plan.json"
+    try:
+        # Generate in a child process: on Linux a forked child's peak RSS starts from the
+        # parent's, so the backlog must never live in this process.
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "generate", "--tasks", str(size), "--seed", str(seed)]
+            + ["--output", str(workspace), "--plan", str(plan_path), "--repeat", str(repeat)],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        result: Dict = {
+            "generate_s": round(time.perf_counter() - started, 2),
+            "tasks_json_bytes": (workspace / "tasks.json").stat().st_size,
+            "commands": {},
+        }
+        env = bench_env()
+        for name, runs in json.loads(plan_path.read_text(encoding="utf-8")):
+            shutil.rmtree(workspace / ".agentctl", ignore_errors=True)
+            samples = [measure(argv, workspace, env) for argv in runs]
+            walls = [wall for wall, _ in samples[1:]]
+            metrics = result["commands"][name] = {
+                "cold_ms": round(samples[0][0], 1),
+                "wall_ms": round(statistics.median(walls), 1),
+                "min_ms": round(min(walls), 1),
+                "rss_mb": round(max(rss for _, rss in samples[1:]), 1),
+                "cold_rss_mb": round(samples[0][1], 1),
+            }
+            print(f"{size:>8} {name:<24} {metrics['wall_ms']:>9.1f} ms  {metrics['rss_mb']:>7.1f} MiB")
+        return result
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def bench_import(repeat: int) -> Dict:
+    """Start-up cost: `python -X importtime` of agentctl_core (best of repeat) and the modules it pulls in."""
+    best = None
+    modules = 0
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import agentctl_core"],
+            cwd=SCRIPT_DIR,
+            env=bench_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        lines = [line for line in proc.stderr.splitlines() if line.startswith("import time:") and "|" in line]
+        for line in lines:
+            self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+            if name == "agentctl_core" and cumulative_us.isdigit():
+                best = min(best, int(cumulative_us)) if best is not None else int(cumulative_us)
+        modules = len(lines) - 1  # the header line
+    return {"import_ms": round((best or 0) / 1000, 1), "modules": modules}
+
+
+def compare_results(results: Dict, baseline: Dict, *, threshold: float, rss_threshold: float) -> List[str]:
+    """Regressions of results against baseline (sizes/commands missing from either side are skipped)."""
+    regressions: List[str] = []
+
+    def check(label: str, metric: str, now: float, then: float, limit: float, floor: float) -> None:
+        if then and now > then * (1 + limit) and now - then > floor:
+            regressions.append(f"{label} {metric}: {then} -> {now} (+{(now / then - 1) * 100:.0f}%)")
+
+    startup, base_startup = results.get("startup") or {}, baseline.get("startup") or {}
+    if "import_ms" in startup and "import_ms" in base_startup:
+        check("startup", "import_ms", startup["import_ms"], base_startup["import_ms"], threshold, 2.0)
+    if "modules" in startup and "modules" in base_startup:
+        check("startup", "modules", startup["modules"], base_startup["modules"], 0.0, 0)
+    for size, entry in sorted((results.get("sizes") or {}).items(), key=lambda item: int(item[0])):
+        base_commands = ((baseline.get("sizes") or {}).get(size) or {}).get("commands") or {}
+        for name, metrics in entry["commands"].items():
+            base = base_commands.get(name)
+            if not base:
+                continue
+            for metric in ("wall_ms", "cold_ms"):
+                check(f"{size} {name}", metric, metrics[metric], base[metric], threshold, MIN_REGRESSION_MS)
+            for metric in ("rss_mb", "cold_rss_mb"):
+                check(f"{size} {name}", metric, metrics[metric], base[metric], rss_threshold, 2.0)
+    return regressions
+
+
+def report_comparison(results: Dict, baseline_path: Path, args: argparse.Namespace) -> None:
+    try:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        die(f"Missing baseline: {baseline_path}")
+    except json.JSONDecodeError as exc:
+        die(f"Invalid JSON in {baseline_path}: {exc}")
+    regressions = compare_results(results, baseline, threshold=args.threshold, rss_threshold=args.rss_threshold)
+    if args.import_budget_ms is not None and (results.get("startup") or {}).get("import_ms", 0) > args.import_budget_ms:
+        regressions.append(f"startup import_ms: {results['startup']['import_ms']} exceeds budget {args.import_budget_ms}")
+    if regressions:
+        for line in regressions:
+            print(f"❌ {line}", file=sys.stderr)
+        raise SystemExit(1)
+    print(f"✅ no regressions against {baseline_path}")
+
+
+def parse_size(value: str) -> int:
+    match = re.fullmatch(r"\s*(\d+)\s*([kK]?)\s*", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r} (use e.g. 1000, 10k, 500k)")
+    return int(match.group(1)) * (1000 if match.group(2) else 1)
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [parse_size(part) for part in value.split(",")]
+
+
+def cmd_generate(args: argparse.Namespace) -> None:
+    output = Path(args.output)
+    tasks = generate_tasks(args.tasks, seed=args.seed)
+    if args.tasks_only:
+        write_backlog(output, tasks)
+    else:
+        make_workspace(output, tasks)
+    if args.plan:
+        Path(args.plan).write_text(json.dumps(bench_plan(tasks, args.repeat)) + "\n", encoding="utf-8")
+    print(f"✅ generated {len(tasks)} task(s) in {output}")
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    if args.repeat < 1:
+        die("--repeat must be at least 1", code=2)
+    keep = Path(args.keep) if args.keep else None
+    results: Dict = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "startup": bench_import(args.repeat),
+        "sizes": {},
+    }
+    print(f"{'startup':>8} {'import agentctl_core':<24} {results['startup']['import_ms']:>9.1f} ms  ({results['startup']['modules']} modules)")
+    for size in args.sizes:
+        results["sizes"][str(size)] = bench_size(size, repeat=args.repeat, seed=args.seed, keep=keep)
+    Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"✅ wrote {args.output}")
+    if args.baseline:
+        report_comparison(results, Path(args.baseline), args)
+
+
+def cmd_compare(args: argparse.Namespace) -> None:
+    try:
+        results = json.loads(Path(args.results).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        die(f"Cannot read {args.results}: {exc}")
+    report_comparison(results, Path(args.baseline), args)
+
+
+def add_threshold_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed wall-time slowdown (default: 0.20 = 20%%)"
+    )
+    parser.add_argument(
+        "--rss-threshold", type=float, default=DEFAULT_RSS_THRESHOLD, help="Allowed peak RSS growth (default: 0.20)"
+    )
+    parser.add_argument("--import-budget-ms", type=float, help="Fail if importing agentctl_core takes longer than this")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="agentctl_bench", description="agentctl benchmark harness")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_generate = sub.add_parser("generate", help="Write a synthetic backlog workspace (or just tasks.json)")
+    p_generate.add_argument("--tasks", type=parse_size, default=10000, help="Number of tasks (default: 10000)")
+    p_generate.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    p_generate.add_argument("--output", required=True, help="Workspace directory (or file with --tasks-only)")
+    p_generate.add_argument("--tasks-only", action="store_true", help="Only write a tasks.json file to --output")
+    p_generate.add_argument("--plan", help="Also write the benchmark command plan (JSON) to this file")
+    p_generate.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Warm runs the plan covers (default: 5)")
+    p_generate.set_defaults(func=cmd_generate)
+
+    p_run = sub.add_parser("run", help="Time agentctl subcommands on generated backlogs")
+    p_run.add_argument(
+        "--sizes", type=parse_sizes, default=parse_sizes(DEFAULT_SIZES), help=f"Backlog sizes (default: {DEFAULT_SIZES})"
+    )
+    p_run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Warm runs per command (default: 5)")
+    p_run.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    p_run.add_argument("--output", default="agentctl-bench.json", help="Results file (default: agentctl-bench.json)")
+    p_run.add_argument("--baseline", help="Compare against this results file and exit 1 on regressions")
+    p_run.add_argument("--keep", help="Keep the generated workspaces under this directory")
+    add_threshold_args(p_run)
+    p_run.set_defaults(func=cmd_run)
+
+    p_compare = sub.add_parser("compare", help="Compare a results file with a baseline")
+    p_compare.add_argument("results")
+    p_compare.add_argument("--baseline", required=True)
+    add_threshold_args(p_compare)
+    p_compare.set_defaults(func=cmd_compare)
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
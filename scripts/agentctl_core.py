@@ -0,0 +1,4887 @@
+#!/usr/bin/env python3
+"""Codex Swarm Agent Helper.
+
+This script automates repetitive, error-prone steps that show up across agent
+workflows (readiness checks, safe tasks.json updates, and git hygiene).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import io
+import json
+import marshal
+import math
+import os
+import re
+import sys
+import time
+from contextlib import closing, contextmanager, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    # Imported lazily by the commands that need them, to keep start-up cheap.
+    import sqlite3
+    import subprocess
+    import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without the advisory lock
+    fcntl = None  # type: ignore[assignment]
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPT_DIR.parent
+TASKS_PATH = ROOT / "tasks.json"
+TASKS_SHARD_DIR = ROOT / "tasks"
+# Written by `task shard`: only a tasks/ directory holding it is the sharded task source.
+TASKS_SHARD_MARKER = TASKS_SHARD_DIR / ".agentctl-shards"
+ARCHIVE_DIR = ROOT / "tasks.archive"
+ARCHIVE_INDEX_PATH = ARCHIVE_DIR / "index.json"
+AGENTS_DIR = ROOT / ".AGENTS"
+AGENTCTL_DOCS_PATH = ROOT / "docs" / "agentctl.md"
+WORKFLOW_DIR = ROOT / "docs" / "workflow"
+CACHE_DIR = ROOT / ".agentctl"
+TASKS_CACHE_PATH = CACHE_DIR / "tasks.cache"
+TASKS_VERIFIED_PATH = CACHE_DIR / "tasks.verified"
+SHARDS_CACHE_PATH = CACHE_DIR / "shards.cache"
+TASKS_DB_PATH = CACHE_DIR / "tasks.sqlite"
+TASKS_DB_VERSION = 2
+JOURNAL_PATH = ROOT / "tasks.journal.jsonl"
+TASKS_LOCK_PATH = CACHE_DIR / "tasks.lock"
+SEARCH_INDEX_PATH = CACHE_DIR / "search.index"
+DEPS_CACHE_PATH = CACHE_DIR / "deps.cache"
+DEPS_CACHE_VERSION = 1
+VERIFY_CACHE_PATH = CACHE_DIR / "verify.cache"
+COMMITS_CACHE_PATH = CACHE_DIR / "commits.cache"
+COMMITS_CACHE_VERSION = 1
+LINT_CACHE_PATH = CACHE_DIR / "lint.cache"
+LINT_CACHE_VERSION = 1
+# Incremental lint leaves lint.cache alone until this many tasks differ from it: re-checking
+# a few drifted tasks per run is cheaper than rewriting the per-task state each time.
+LINT_CACHE_REWRITE_AFTER = 64
+VERIFY_CACHE_VERSION = 2
+VERIFY_CACHE_MAX_ENTRIES = 512
+VERIFY_CACHE_ENV: Tuple[str, ...] = ("PATH", "VIRTUAL_ENV", "PYTHONPATH")
+SERVER_SOCKET_PATH = CACHE_DIR / "agentctl.sock"
+# The forwarding client in agentctl.py waits this long (AGENTCTL_SERVER_TIMEOUT) for the server to
+# pick up its request before running locally; the server gives each connection as long per read/write.
+# SERVER_TIMEOUT, SERVER_READY and SERVER_GO are duplicated there.
+SERVER_TIMEOUT = 2.0
+SERVER_READY = b"ready\n"
+SERVER_GO = b"go\n"
+SEARCH_INDEX_VERSION = 2
+SEARCH_GRAM = 3  # n-gram length of the infix token map
+SEARCH_BM25_K1 = 1.2
+SEARCH_BM25_B = 0.75
+JOURNAL_MAX_RECORDS = 200
+TASKS_CACHE_VERSION = 3
+TASKS_META_TAIL_BYTES = 4096
+TASK_SUMMARY_FIELDS: Tuple[str, ...] = ("id", "title", "status", "priority", "owner", "tags", "depends_on")
+
+ALLOWED_STATUSES: Set[str] = {"TODO", "DOING", "BLOCKED", "DONE"}
+TASKS_SCHEMA_VERSION = 1
+TASKS_META_KEY = "meta"
+TASKS_META_MANAGED_BY = "agentctl"
+TASKS_CHECKSUM_ALGO = "sha256-merkle"
+LEGACY_TASKS_CHECKSUM_ALGO = "sha256"
+# Shard meta.checksum: the task's own leaf hash (compute_task_hash), not a whole-payload sha256.
+SHARD_CHECKSUM_ALGO = "sha256-task"
+
+GENERIC_COMMIT_TOKENS: Set[str] = {
+    "start",
+    "status",
+    "mark",
+    "done",
+    "wip",
+    "update",
+    "tasks",
+    "task",
+}
+
+
+def run(cmd: List[str], *, cwd: Path = ROOT, check: bool = True, input: Optional[str] = None) -> subprocess.CompletedProcess:
+    import subprocess
+
+    with trace_span("subprocess", cmd=" ".join(cmd[:4])) as span:
+        result = subprocess.run(
+            cmd,
+            cwd=str(cwd),
+            text=True,
+            capture_output=True,
+            check=check,
+            input=input,
+        )
+        span.set(returncode=result.returncode, stdout_bytes=len(result.stdout or ""))
+    return result
+
+
+def die(message: str, code: int = 1) -> None:
+    print(message, file=sys.stderr)
+    raise SystemExit(code)
+
+
+# Set by `agentctl serve`: name -> (key, value) for state kept in memory between requests.
+_RESIDENT: Optional[Dict[str, Tuple[object, object]]] = None
+
+
+def resident_memo(name: str, key: object, build):
+    """Return build(), reusing the previous result inside `serve` while `key` is unchanged."""
+    if _RESIDENT is None or key is None:
+        return build()
+    hit = _RESIDENT.get(name)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    value = build()
+    _RESIDENT[name] = (key, value)
+    return value
+
+
+class _NoSpan:
+    """What trace_span() returns while tracing is off: a shared do-nothing context manager."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def set(self, **attrs: object) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """Spans recorded by one agentctl invocation (AGENTCTL_TRACE=FILE or --profile)."""
+
+    def __init__(self, path: Optional[str], *, profile: bool = False) -> None:
+        import threading
+
+        self.path = path
+        self.profile = profile
+        self.events: List[Tuple[str, int, int, int, int, Dict[str, object]]] = []
+        self.depths: Dict[int, int] = {}
+        self.get_ident = threading.get_ident
+        self.origin = time.perf_counter_ns()
+        self.epoch_us = time.time_ns() // 1000
+
+    def emit(self) -> None:
+        """Write the spans: Chrome trace format for a .json path, JSON lines (appended) otherwise."""
+        events = sorted(self.events, key=lambda event: (event[1], -event[2]))
+        if self.profile:
+            for name, start, duration, depth, _, attrs in events:
+                extra = " ".join(f"{key}={value}" for key, value in attrs.items())
+                print(f"⏱️ {duration / 1e6:9.2f} ms  {'  ' * depth}{name}  {extra}".rstrip(), file=sys.stderr)
+        if not self.path:
+            return
+        pid = os.getpid()
+        try:
+            if self.path.endswith(".json"):
+                trace = {
+                    "traceEvents": [
+                        {
+                            "name": name,
+                            "cat": "agentctl",
+                            "ph": "X",
+                            "ts": (start - self.origin) / 1000,
+                            "dur": duration / 1000,
+                            "pid": pid,
+                            "tid": tid,
+                            "args": attrs,
+                        }
+                        for name, start, duration, _, tid, attrs in events
+                    ],
+                    "displayTimeUnit": "ms",
+                }
+                Path(self.path).write_text(json.dumps(trace, default=str) + "\n", encoding="utf-8")
+            else:
+                lines = [
+                    json.dumps(
+                        {
+                            "name": name,
+                            "ts_us": self.epoch_us + (start - self.origin) // 1000,
+                            "dur_ms": round(duration / 1e6, 3),
+                            "depth": depth,
+                            "pid": pid,
+                            "tid": tid,
+                            "args": attrs,
+                        },
+                        default=str,
+                    )
+                    for name, start, duration, depth, tid, attrs in events
+                ]
+                with open(self.path, "a", encoding="utf-8") as handle:
+                    handle.write("".join(line + "\n" for line in lines))
+        except OSError as exc:
+            print(f"⚠️ cannot write trace to {self.path}: {exc}", file=sys.stderr)
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "depth", "tid")
+
+    def __init__(self, tracer: Tracer, name: str, attrs: Dict[str, object]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> "_Span":
+        self.tid = self.tracer.get_ident()
+        self.depth = self.tracer.depths.get(self.tid, 0)
+        self.tracer.depths[self.tid] = self.depth + 1
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc: Optional[BaseException], _: object) -> None:
+        duration = time.perf_counter_ns() - self.start
+        self.tracer.depths[self.tid] = self.depth
+        if isinstance(exc, SystemExit):
+            if exc.code:
+                self.attrs["exit"] = exc.code
+        elif exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.events.append((self.name, self.start, duration, self.depth, self.tid, self.attrs))
+
+    def set(self, **attrs: object) -> None:
+        self.attrs.update(attrs)
+
+
+# Set by main() when AGENTCTL_TRACE or --profile asks for spans.
+_TRACE: Optional[Tracer] = None
+
+
+def trace_span(name: str, **attrs: object):
+    """Context manager timing one phase (a no-op unless tracing is on); span.set(key=value) adds attributes."""
+    if _TRACE is None:
+        return _NO_SPAN
+    return _Span(_TRACE, name, attrs)
+
+
+def commit_message_has_meaningful_summary(task_id: str, message: str) -> bool:
+    task_token = task_id.strip().lower()
+    if not task_token:
+        return True
+    tokens = re.findall(r"[0-9A-Za-zА-Яа-яЁё]+(?:-[0-9A-Za-zА-Яа-яЁё]+)*", message.lower())
+    meaningful = [t for t in tokens if t != task_token and t not in GENERIC_COMMIT_TOKENS]
+    return bool(meaningful)
+
+
+def require_structured_comment(body: str, *, prefix: str, min_chars: int) -> None:
+    normalized = (body or "").strip()
+    if not normalized.lower().startswith(prefix.lower()):
+        die(f"Comment body must start with {prefix!r}", code=2)
+    if len(normalized) < min_chars:
+        die(f"Comment body must be at least {min_chars} characters", code=2)
+
+
+def load_json(path: Path) -> Dict:
+    try:
+        with trace_span("read", path=path.name) as span:
+            raw = path.read_bytes()
+            span.set(bytes=len(raw))
+        text = raw.decode("utf-8")
+        with trace_span("json.parse", path=path.name), gc_paused():
+            return json.loads(text)
+    except FileNotFoundError:
+        die(f"Missing file: {path}")
+    except json.JSONDecodeError as exc:
+        die(f"Invalid JSON in {path}: {exc}")
+
+
+STREAM_CHUNK_SIZE = 1 << 16
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+
+
+def iter_tasks_json(path: Path) -> Iterator[Dict]:
+    """Yield the entries of the top-level 'tasks' array of path one at a time, reading it in chunks."""
+    decoder = json.JSONDecoder()
+    try:
+        handle = path.open("r", encoding="utf-8")
+    except FileNotFoundError:
+        die(f"Missing file: {path}")
+    with handle:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            chunk = "" if eof else handle.read(max(STREAM_CHUNK_SIZE, len(buf) - pos))
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def peek() -> str:
+            nonlocal pos
+            while True:
+                pos = _JSON_WS.match(buf, pos).end()
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    die(f"Invalid JSON in {path}: unexpected end of file")
+
+        def expect(char: str) -> None:
+            nonlocal pos
+            if peek() != char:
+                die(f"Invalid JSON in {path}: expected {char!r}")
+            pos += 1
+
+        def separator(close: str) -> None:
+            nonlocal pos
+            char = peek()
+            if char == ",":
+                pos += 1
+                if peek() == close:
+                    die(f"Invalid JSON in {path}: trailing ',' before {close!r}")
+            elif char != close:
+                die(f"Invalid JSON in {path}: expected ',' or {close!r}")
+
+        def value() -> object:
+            nonlocal pos
+            peek()
+            while True:
+                try:
+                    result, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as exc:
+                    if fill():
+                        continue
+                    die(f"Invalid JSON in {path}: {exc}")
+                if end == len(buf) and fill():
+                    continue
+                pos = end
+                return result
+
+        expect("{")
+        seen_tasks = False
+        while peek() != "}":
+            if peek() != '"':
+                die(f"Invalid JSON in {path}: expected a property name")
+            key = value()
+            expect(":")
+            if key != "tasks":
+                value()
+            elif seen_tasks:
+                die(f"Invalid JSON in {path}: duplicate 'tasks' key")
+            elif peek() != "[":
+                die("tasks.json must contain a top-level 'tasks' list")
+            else:
+                seen_tasks = True
+                pos += 1
+                index = 0
+                while peek() != "]":
+                    task = value()
+                    if not isinstance(task, dict):
+                        die(f"tasks.json tasks[{index}] must be an object")
+                    yield task
+                    index += 1
+                    separator("]")
+                pos += 1
+            separator("}")
+        pos += 1
+        while True:
+            pos = _JSON_WS.match(buf, pos).end()
+            if pos < len(buf):
+                die(f"Invalid JSON in {path}: extra data after the document")
+            if not fill():
+                break
+    if not seen_tasks:
+        die("tasks.json must contain a top-level 'tasks' list")
+
+
+def write_json(path: Path, data: Dict) -> None:
+    """Write JSON via a temp file + atomic rename so readers never see a partial file."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with trace_span("json.dump", path=path.name):
+            text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+        with trace_span("write", path=path.name, bytes=len(text)):
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+_TASKS_LOCK_DEPTH = 0
+
+
+@contextmanager
+def tasks_lock() -> Iterator[None]:
+    """Hold the advisory tasks.json writer lock (shared by every agentctl process; re-entrant within one)."""
+    global _TASKS_LOCK_DEPTH
+    if fcntl is None or _TASKS_LOCK_DEPTH:
+        _TASKS_LOCK_DEPTH += 1
+        try:
+            yield
+        finally:
+            _TASKS_LOCK_DEPTH -= 1
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with TASKS_LOCK_PATH.open("a") as handle:
+        with trace_span("tasks_lock wait"):
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        _TASKS_LOCK_DEPTH += 1
+        try:
+            yield
+        finally:
+            _TASKS_LOCK_DEPTH -= 1
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def canonical_tasks_payload(tasks: List[Dict]) -> str:
+    return json.dumps({"tasks": tasks}, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def compute_tasks_checksum(tasks: List[Dict]) -> str:
+    """Legacy whole-payload checksum (checksum_algo 'sha256'); still accepted by lint."""
+    import hashlib
+
+    with trace_span("compute_tasks_checksum", tasks=len(tasks)) as span:
+        payload = canonical_tasks_payload(tasks).encode("utf-8")
+        span.set(bytes=len(payload))
+        return hashlib.sha256(payload).hexdigest()
+
+
+def compute_task_hash(task: Dict) -> str:
+    import hashlib
+
+    payload = json.dumps(task, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def compute_root_checksum(task_hashes: List[str]) -> str:
+    import hashlib
+
+    return hashlib.sha256("".join(task_hashes).encode("ascii")).hexdigest()
+
+
+def update_tasks_meta(data: Dict, task_hashes: Optional[List[str]] = None) -> List[str]:
+    """Refresh meta (root checksum last) and return the per-task hashes it was computed from."""
+    tasks = data.get("tasks")
+    if not isinstance(tasks, list):
+        return []
+    if task_hashes is None or len(task_hashes) != len(tasks):
+        with trace_span("compute_task_hashes", tasks=len(tasks)):
+            task_hashes = [compute_task_hash(task) for task in tasks]
+    meta = data.get(TASKS_META_KEY)
+    if not isinstance(meta, dict):
+        meta = {}
+    meta["schema_version"] = TASKS_SCHEMA_VERSION
+    meta["managed_by"] = TASKS_META_MANAGED_BY
+    meta["checksum_algo"] = TASKS_CHECKSUM_ALGO
+    # Keep checksum as the last key: read_meta_checksum() only scans the file tail.
+    meta.pop("checksum", None)
+    meta["checksum"] = compute_root_checksum(task_hashes)
+    data[TASKS_META_KEY] = meta
+    return task_hashes
+
+
+def write_tasks_json(data: Dict, *, task_hashes: Optional[List[str]] = None, verified: bool = True) -> None:
+    """Write tasks.json with fresh meta; verified states whether every reused hash matches its task."""
+    hashes = update_tasks_meta(data, task_hashes)
+    write_json(TASKS_PATH, data)
+    if shards_enabled():
+        return  # tasks.json is only a rendered view; caches are keyed by the shards
+    signature = tasks_file_signature(TASKS_PATH)
+    tasks = data.get("tasks")
+    if signature is not None and isinstance(tasks, list) and all(isinstance(task, dict) for task in tasks):
+        store_tasks_cache(signature, tasks)
+        # Unverified hashes are still recorded, so lint can name tasks whose content no longer matches.
+        record_verified_signature(
+            signature, dict(data[TASKS_META_KEY], task_hashes=hashes), verified=verified or task_hashes is None
+        )
+
+
+def shards_enabled() -> bool:
+    """Sharded layout: tasks/<id>.json files are the source of truth and tasks.json is rendered from them."""
+    return TASKS_SHARD_MARKER.is_file()
+
+
+def task_sort_key(task_id: str) -> List:
+    """Natural order for ids (T-9 before T-10), used to order shards."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", task_id)]
+
+
+def task_shard_path(task_id: str) -> Path:
+    if not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9._-]*", task_id):
+        die(f"Task id {task_id!r} cannot be stored as a shard file")
+    return TASKS_SHARD_DIR / f"{task_id}.json"
+
+
+def shards_signature() -> Optional[Tuple[int, int, str]]:
+    """(total size, newest change stamp, digest of name/size/stamp of every shard), like tasks_file_signature."""
+    import hashlib
+
+    entries: List[str] = []
+    total = newest = 0
+    try:
+        with os.scandir(TASKS_SHARD_DIR) as scan:
+            for entry in scan:
+                if not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                stamp = change_stamp(stat)
+                total += stat.st_size
+                newest = max(newest, stamp)
+                entries.append(f"{entry.name}\0{stat.st_size}\0{stamp}")
+    except OSError:
+        return None
+    entries.sort()
+    return total, newest, hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+
+def tasks_signature() -> Optional[Tuple[int, int, str]]:
+    """Signature of the task source (tasks.json, or the shard directory in the sharded layout)."""
+    return shards_signature() if shards_enabled() else tasks_file_signature(TASKS_PATH)
+
+
+def read_task_shard(task_id: str) -> Optional[Tuple[Dict, str]]:
+    """(task, recorded checksum) from tasks/<id>.json, None when there is no such shard."""
+    path = task_shard_path(task_id)
+    label = path.relative_to(ROOT)
+    try:
+        with trace_span("read", path=path.name):
+            shard = json.loads(path.read_bytes().decode("utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"{label}: invalid JSON: {exc}") from None
+    task = shard.get("task") if isinstance(shard, dict) else None
+    meta = shard.get(TASKS_META_KEY) if isinstance(shard, dict) else None
+    if not isinstance(task, dict) or str(task.get("id") or "").strip() != task_id:
+        raise ValueError(f"{label}: must contain a 'task' object whose id is {task_id!r}")
+    if not isinstance(meta, dict) or meta.get("checksum_algo") != SHARD_CHECKSUM_ALGO:
+        raise ValueError(f"{label}: meta.checksum_algo must be {SHARD_CHECKSUM_ALGO!r}")
+    return task, str(meta.get("checksum") or "")
+
+
+def load_task_shard(task_id: str) -> Optional[Tuple[Dict, str]]:
+    """read_task_shard for a single task the caller asked for: a malformed shard is fatal."""
+    try:
+        return read_task_shard(task_id)
+    except ValueError as exc:
+        die(str(exc))
+
+
+def write_task_shard(task: Dict, task_hash: str, *, directory: Optional[Path] = None) -> None:
+    task_id = str(task.get("id") or "").strip()
+    path = task_shard_path(task_id)
+    if directory is not None:
+        path = directory / path.name
+    meta = {"managed_by": TASKS_META_MANAGED_BY, "checksum_algo": SHARD_CHECKSUM_ALGO, "checksum": task_hash}
+    write_json(path, {"task": task, TASKS_META_KEY: meta})
+
+
+def report_skipped_shards(problems: Iterable[str]) -> None:
+    for problem in problems:
+        print(f"⚠️ {problem} (skipped)", file=sys.stderr)
+
+
+def iter_task_shards(skipped: Optional[List[str]] = None) -> Iterator[Tuple[Dict, str]]:
+    """(task, recorded checksum) per shard in natural id order, passing over malformed shards."""
+    for task_id in sorted((path.stem for path in TASKS_SHARD_DIR.glob("*.json")), key=task_sort_key):
+        try:
+            loaded = read_task_shard(task_id)
+        except ValueError as exc:
+            if skipped is None:
+                report_skipped_shards([str(exc)])
+            else:
+                skipped.append(str(exc))
+            continue
+        if loaded is not None:
+            yield loaded
+
+
+def load_tasks_document(
+    signature: Optional[Tuple[int, int, str]] = None,
+    *,
+    skipped: Optional[List[str]] = None,
+    hashes: Optional[List[str]] = None,
+) -> Dict:
+    """tasks.json, or in the sharded layout the equivalent document assembled from tasks/*.json."""
+    if not shards_enabled():
+        return load_json(TASKS_PATH)
+    cached = load_shards_cache(signature) if signature is not None else None
+    if cached is not None:
+        tasks, checksums = cached
+    else:
+        problems: List[str] = []
+        tasks = []
+        checksums = []
+        with trace_span("read shards") as span, gc_paused():
+            for task, checksum in iter_task_shards(problems):
+                tasks.append(task)
+                checksums.append(checksum)
+            span.set(shards=len(tasks), skipped=len(problems))
+        if skipped is None:
+            report_skipped_shards(problems)
+        else:
+            skipped.extend(problems)
+        if not problems and signature is not None and tasks_signature() == signature:
+            store_shards_cache(signature, tasks, checksums)
+    if hashes is not None:
+        hashes.extend(checksums)
+    meta = {
+        "schema_version": TASKS_SCHEMA_VERSION,
+        "managed_by": TASKS_META_MANAGED_BY,
+        "checksum_algo": TASKS_CHECKSUM_ALGO,
+        "checksum": compute_root_checksum(checksums),
+    }
+    return {"tasks": tasks, TASKS_META_KEY: meta}
+
+
+_ARCHIVE_INDEX: Optional[Tuple[Tuple[int, int], Dict]] = None
+
+
+def load_archive_index() -> Dict:
+    """tasks.archive/index.json: {"segments": [{file, tasks, sha256}], "ids": {task id: segment number}}."""
+    global _ARCHIVE_INDEX
+    try:
+        stat = ARCHIVE_INDEX_PATH.stat()
+    except OSError:
+        return {"segments": [], "ids": {}}
+    stat_key = (stat.st_size, stat.st_mtime_ns)
+    if _ARCHIVE_INDEX is None or _ARCHIVE_INDEX[0] != stat_key:
+        index = load_json(ARCHIVE_INDEX_PATH)
+        if not isinstance(index.get("segments"), list) or not isinstance(index.get("ids"), dict):
+            die(f"{ARCHIVE_INDEX_PATH.relative_to(ROOT)} must contain 'segments' (list) and 'ids' (object)")
+        _ARCHIVE_INDEX = (stat_key, index)
+    return _ARCHIVE_INDEX[1]
+
+
+def archived_task_ids() -> Dict[str, int]:
+    return load_archive_index()["ids"]
+
+
+def iter_archive_segment(entry: Dict) -> Iterator[Dict]:
+    """Tasks of one gzip JSONL segment, decompressed and decoded a line at a time."""
+    import gzip
+
+    path = ARCHIVE_DIR / str(entry.get("file") or "")
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    except FileNotFoundError:
+        die(f"Missing archive segment: {path.relative_to(ROOT)}")
+    except (OSError, EOFError, json.JSONDecodeError) as exc:
+        die(f"Invalid archive segment {path.relative_to(ROOT)}: {exc}")
+
+
+def iter_archived_tasks() -> Iterator[Dict]:
+    for entry in load_archive_index()["segments"]:
+        yield from iter_archive_segment(entry)
+
+
+def load_archived_task(task_id: str) -> Optional[Tuple[Dict, str]]:
+    """(task, segment file) for an archived id, reading only the segment that holds it."""
+    index = load_archive_index()
+    number = index["ids"].get(task_id)
+    if not isinstance(number, int) or not 0 <= number < len(index["segments"]):
+        return None
+    entry = index["segments"][number]
+    for task in iter_archive_segment(entry):
+        if str(task.get("id") or "").strip() == task_id:
+            return task, str(entry.get("file") or "")
+    return None
+
+
+def write_archive_segment(tasks: List[Dict]) -> Dict:
+    """Create the next gzip JSONL segment (never replacing a file) and return its entry; call under tasks_lock()."""
+    import gzip
+    import hashlib
+
+    number = len(load_archive_index()["segments"]) + 1
+    name = f"segment-{number:04d}.jsonl.gz"
+    payload = "".join(json.dumps(task, ensure_ascii=False) + "\n" for task in tasks).encode("utf-8")
+    blob = gzip.compress(payload, mtime=0)
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    path = ARCHIVE_DIR / name
+    try:
+        handle = path.open("xb")
+    except FileExistsError:
+        die(f"Archive segment already exists: {path.relative_to(ROOT)}")
+    try:
+        with handle:
+            handle.write(blob)
+    except BaseException:
+        path.unlink()
+        raise
+    return {"file": name, "tasks": len(tasks), "sha256": hashlib.sha256(blob).hexdigest()}
+
+
+def lint_archive(live_ids: Iterable[str]) -> List[str]:
+    """Check segment checksums and counts, and that no id is both archived and live."""
+    import hashlib
+
+    index = load_archive_index()
+    errors: List[str] = []
+    counts: Dict[int, int] = {}
+    for number in index["ids"].values():
+        counts[number] = counts.get(number, 0) + 1
+    for number, entry in enumerate(index["segments"]):
+        name = str(entry.get("file") or "")
+        try:
+            digest = hashlib.sha256((ARCHIVE_DIR / name).read_bytes()).hexdigest()
+        except OSError:
+            errors.append(f"tasks.archive/{name}: segment file is missing")
+            continue
+        if digest != entry.get("sha256"):
+            errors.append(f"tasks.archive/{name}: content does not match its sha256 in index.json (manual edit?)")
+        if counts.get(number, 0) != entry.get("tasks"):
+            errors.append(f"tasks.archive/{name}: index.json lists {counts.get(number, 0)} id(s), segment has {entry.get('tasks')}")
+    for task_id in sorted(set(live_ids) & set(index["ids"])):
+        errors.append(f"{task_id}: present both in tasks.json and tasks.archive")
+    return errors
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Pause the cyclic GC while decoding large documents (allocation-heavy, no cycles)."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def cache_enabled() -> bool:
+    return not os.environ.get("AGENTCTL_NO_CACHE")
+
+
+def change_stamp(stat: os.stat_result) -> int:
+    """Newest of mtime and ctime: an edit that restores the old mtime (os.utime, some sync tools) still moves ctime."""
+    return max(stat.st_mtime_ns, stat.st_ctime_ns)
+
+
+def cache_is_racy(signature: Tuple, cache_stat: os.stat_result) -> bool:
+    """True when the task source changed in the timestamp tick the cache file was written, or later."""
+    return signature[1] >= cache_stat.st_mtime_ns
+
+
+def read_meta_checksum(path: Path, size: int) -> str:
+    """Read meta.checksum from the tail of tasks.json without parsing the whole file."""
+    try:
+        with path.open("rb") as handle:
+            handle.seek(max(0, size - TASKS_META_TAIL_BYTES))
+            tail = handle.read().decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+    match = re.search(r'"checksum"\s*:\s*"([0-9a-fA-F]+)"', tail)
+    return match.group(1) if match else ""
+
+
+def tasks_file_signature(path: Path) -> Optional[Tuple[int, int, str]]:
+    """(size, change stamp, meta.checksum) of tasks.json; caches derived from it are keyed by this."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, change_stamp(stat), read_meta_checksum(path, stat.st_size)
+
+
+def task_summary(task: Dict) -> Dict:
+    return {key: task[key] for key in TASK_SUMMARY_FIELDS if key in task}
+
+
+def read_tasks_cache_index(
+    handle: BinaryIO, signature: Tuple[int, int, str], *, summaries: bool = True
+) -> Optional[Tuple[List[Dict], List[int]]]:
+    """Read the header and index records of tasks.cache; returns (summaries, blob offsets)."""
+    if not cache_enabled() or not signature[2]:
+        return None
+    try:
+        header = marshal.load(handle)
+        cache_stat = os.fstat(handle.fileno())
+        if header != (TASKS_CACHE_VERSION, str(TASKS_PATH), *signature) or cache_is_racy(signature, cache_stat):
+            return None
+        offsets, summaries_size = marshal.loads(marshal.load(handle))
+        decoded = None
+        if summaries:
+            with gc_paused():
+                decoded = marshal.loads(marshal.load(handle))
+        else:
+            handle.seek(summaries_size, os.SEEK_CUR)
+        region = cache_stat.st_size - handle.tell()
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(offsets, list) or not offsets or offsets[-1] != region:
+        return None
+    if decoded is None:
+        return [], offsets
+    if not isinstance(decoded, list) or len(offsets) != len(decoded) + 1:
+        return None
+    return decoded, offsets
+
+
+def load_tasks_cache(
+    signature: Tuple[int, int, str], *, blobs: bool = True
+) -> Optional[Tuple[List[Dict], List[memoryview]]]:
+    """Return (summaries, per-task marshal blobs) when the sidecar cache matches tasks.json."""
+    try:
+        with trace_span("read", path=TASKS_CACHE_PATH.name) as span, TASKS_CACHE_PATH.open("rb") as handle:
+            index = read_tasks_cache_index(handle, signature)
+            if index is None:
+                span.set(hit=False)
+                return None
+            summaries, offsets = index
+            span.set(hit=True, tasks=len(summaries), bytes=handle.tell())
+            if not blobs:
+                return summaries, []
+            region = memoryview(handle.read())
+            span.set(bytes=handle.tell())
+    except OSError:
+        return None
+    if len(region) != offsets[-1]:
+        return None
+    return summaries, [region[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def store_tasks_cache(signature: Tuple[int, int, str], tasks: Iterable[Dict], *, recheck: bool = False) -> List[Dict]:
+    """Write the sidecar cache for tasks and return their summaries."""
+    import shutil
+    import tempfile
+
+    summaries: List[Dict] = []
+    offsets = [0]
+    remaining = iter(tasks)
+    enabled = cache_enabled() and bool(signature[2])
+    tmp_path = TASKS_CACHE_PATH.with_name(f"{TASKS_CACHE_PATH.name}.{os.getpid()}.tmp")
+    with trace_span("store_tasks_cache") as span:
+        try:
+            with tempfile.TemporaryFile() as spool:
+                for task in remaining:
+                    summaries.append(task_summary(task))
+                    if enabled:
+                        blob = marshal.dumps(task)
+                        spool.write(blob)
+                        offsets.append(offsets[-1] + len(blob))
+                span.set(tasks=len(summaries))
+                if not enabled or (recheck and tasks_signature() != signature):
+                    return summaries
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                with tmp_path.open("wb") as handle:
+                    marshal.dump((TASKS_CACHE_VERSION, str(TASKS_PATH), *signature), handle)
+                    summary_record = marshal.dumps(marshal.dumps(summaries))
+                    marshal.dump(marshal.dumps((offsets, len(summary_record))), handle)
+                    handle.write(summary_record)
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, handle)
+                    span.set(bytes=handle.tell())
+                os.replace(tmp_path, TASKS_CACHE_PATH)
+        except (OSError, ValueError):
+            summaries.extend(task_summary(task) for task in remaining)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    return summaries
+
+
+def load_cached_tasks(signature: Tuple[int, int, str], positions: Iterable[int]) -> Optional[Dict[int, Dict]]:
+    """Decode only the tasks at the given positions from tasks.cache (None unless it matches signature)."""
+    tasks: Dict[int, Dict] = {}
+    try:
+        with trace_span("read", path=TASKS_CACHE_PATH.name) as span, TASKS_CACHE_PATH.open("rb") as handle:
+            index = read_tasks_cache_index(handle, signature, summaries=False)
+            span.set(hit=index is not None)
+            if index is None:
+                return None
+            offsets = index[1]
+            base = handle.tell()
+            for position in sorted(set(positions)):
+                if not 0 <= position < len(offsets) - 1:
+                    return None
+                handle.seek(base + offsets[position])
+                tasks[position] = marshal.loads(handle.read(offsets[position + 1] - offsets[position]))
+            span.set(tasks=len(tasks))
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return tasks
+
+
+def load_shards_cache(signature: Tuple[int, int, str]) -> Optional[Tuple[List[Dict], List[str]]]:
+    """(tasks, recorded shard checksums) when both sidecars match the shard signature."""
+    if not cache_enabled():
+        return None
+    try:
+        header, hashes = marshal.loads(SHARDS_CACHE_PATH.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    cached = load_tasks_cache(signature) if header == (TASKS_CACHE_VERSION, *signature) else None
+    if cached is None or not isinstance(hashes, list) or len(hashes) != len(cached[1]):
+        return None
+    with gc_paused():
+        return [marshal.loads(blob) for blob in cached[1]], hashes
+
+
+def store_shards_cache(signature: Tuple[int, int, str], tasks: List[Dict], hashes: List[str]) -> None:
+    """Cache the shard document (tasks in shard order plus their recorded checksums)."""
+    store_tasks_cache(signature, tasks)
+    if not cache_enabled():
+        return
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        SHARDS_CACHE_PATH.write_bytes(marshal.dumps(((TASKS_CACHE_VERSION, *signature), hashes)))
+    except OSError:
+        pass
+
+
+def record_verified_signature(
+    signature: Tuple[int, int, str], meta: Optional[Dict] = None, *, verified: bool = True
+) -> None:
+    """Record tasks.json's meta and per-task hashes for this file state in .agentctl/tasks.verified."""
+    if not cache_enabled() or not signature[2]:
+        return
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        payload = marshal.dumps((TASKS_CACHE_VERSION, str(TASKS_PATH), *(signature if verified else (None,))))
+        if meta is not None:
+            payload += marshal.dumps(meta)
+        TASKS_VERIFIED_PATH.write_bytes(payload)
+    except (OSError, ValueError):
+        pass
+
+
+def is_verified_signature(signature: Optional[Tuple[int, int, str]]) -> bool:
+    return load_verified_meta(signature, meta=False) is not None
+
+
+def load_recorded_hashes(signature: Optional[Tuple[int, int, str]]) -> Tuple[Optional[List[str]], bool]:
+    """(per-task hashes recorded for the current meta.checksum or None, whether this file state is verified)."""
+    if signature is None or not signature[2]:
+        return None, False
+    try:
+        with TASKS_VERIFIED_PATH.open("rb") as handle:
+            header = marshal.load(handle)
+            # Without the cache the hashes are still read (lint checks each one) but never trusted as verified.
+            verified = cache_enabled() and header == (TASKS_CACHE_VERSION, str(TASKS_PATH), *signature)
+            verified = verified and not cache_is_racy(signature, os.fstat(handle.fileno()))
+            payload = handle.read()
+        with gc_paused():
+            recorded = marshal.loads(payload) if payload else None
+    except (OSError, EOFError, ValueError, TypeError):
+        return None, False
+    if not isinstance(recorded, dict) or recorded.get("checksum") != signature[2]:
+        return None, verified
+    hashes = recorded.get("task_hashes")
+    return (hashes if isinstance(hashes, list) else None), verified
+
+
+def load_verified_meta(signature: Optional[Tuple[int, int, str]], *, meta: bool = True) -> Optional[Dict]:
+    """The meta recorded with a verified signature ({} when meta=False or none was recorded); None if unverified."""
+    if signature is None or not cache_enabled() or not signature[2]:
+        return None
+    try:
+        with TASKS_VERIFIED_PATH.open("rb") as handle:
+            if marshal.load(handle) != (TASKS_CACHE_VERSION, str(TASKS_PATH), *signature):
+                return None
+            if cache_is_racy(signature, os.fstat(handle.fileno())):
+                return None
+            if not meta:
+                return {}
+            payload = handle.read()
+            if not payload:
+                return {}
+            with gc_paused():
+                recorded = marshal.loads(payload)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return recorded if isinstance(recorded, dict) else {}
+
+
+def journal_enabled() -> bool:
+    return bool(os.environ.get("AGENTCTL_JOURNAL"))
+
+
+def journal_max_records() -> int:
+    try:
+        return int(os.environ.get("AGENTCTL_JOURNAL_MAX_RECORDS") or JOURNAL_MAX_RECORDS)
+    except ValueError:
+        return JOURNAL_MAX_RECORDS
+
+
+def journal_size() -> int:
+    try:
+        return JOURNAL_PATH.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def read_journal() -> List[Dict]:
+    """Read tasks.journal.jsonl records; an unterminated last line (torn append) is ignored."""
+    try:
+        text = JOURNAL_PATH.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    lines = text.split("\n")
+    records: List[Dict] = []
+    for lineno, line in enumerate(lines[:-1], start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            die(f"Invalid JSON in {JOURNAL_PATH}:{lineno}: {exc}")
+        if not isinstance(record, dict) or not isinstance(record.get("ops"), list):
+            die(f"Invalid journal record in {JOURNAL_PATH}:{lineno}")
+        records.append(record)
+    return records
+
+
+def append_journal(records: List[Dict]) -> None:
+    payload = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records)
+    with trace_span("write", path=JOURNAL_PATH.name, bytes=len(payload), records=len(records)):
+        with JOURNAL_PATH.open("a", encoding="utf-8") as handle:
+            handle.write(payload)
+
+
+def clear_journal() -> None:
+    try:
+        JOURNAL_PATH.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def apply_task_op(tasks: List[Dict], tasks_by_id: Dict[str, Dict], op: Dict) -> Dict:
+    """Apply one mutation op (set/comment/add) in place and return the affected task."""
+    kind = op.get("op")
+    if kind == "add":
+        task = op.get("task")
+        if not isinstance(task, dict):
+            die("add op must carry a task object")
+        task_id = str(task.get("id") or "").strip()
+        if task_id in tasks_by_id:
+            die(f"Task already exists: {task_id}")
+        tasks.append(task)
+        tasks_by_id[task_id] = task
+        return task
+    task_id = str(op.get("id") or "")
+    task = tasks_by_id.get(task_id)
+    if task is None:
+        die(f"Unknown task id: {task_id}")
+    if kind == "set":
+        fields = op.get("fields")
+        if not isinstance(fields, dict):
+            die("set op must carry a fields object")
+        task.update(fields)
+    elif kind == "comment":
+        comments = task.get("comments")
+        if not isinstance(comments, list):
+            comments = []
+        comments.append({"author": op.get("author"), "body": op.get("body")})
+        task["comments"] = comments
+    else:
+        die(f"Unknown task op: {kind!r}")
+    return task
+
+
+def replay_journal(
+    tasks: List[Dict], tasks_by_id: Dict[str, Dict], records: List[Dict], base: Optional[str]
+) -> Tuple[List[Tuple[Dict, str]], int]:
+    """Apply journal records written against snapshot `base`; returns (applied (task, hash) pairs, stale count)."""
+    applied: List[Tuple[Dict, str]] = []
+    stale = 0
+    for record in records:
+        if not base or record.get("base") != base:
+            stale += 1
+            continue
+        task: Optional[Dict] = None
+        for op in record["ops"]:
+            task = apply_task_op(tasks, tasks_by_id, op)
+        if task is not None:
+            applied.append((task, str(record.get("hash") or "")))
+    return applied, stale
+
+
+def load_tasks(*, summary: bool = False) -> List[Dict]:
+    """Load the task list, preferring the sidecar cache keyed by size/change stamp/meta.checksum."""
+    if summary and _RESIDENT is not None:
+        return resident_memo("summaries", tasks_state_key(), lambda: _load_tasks(summary=True))
+    with trace_span("load_tasks", summary=summary) as span:
+        tasks = _load_tasks(summary=summary)
+        span.set(tasks=len(tasks))
+    return tasks
+
+
+def _load_tasks(*, summary: bool) -> List[Dict]:
+    signature = tasks_signature()
+    if signature is not None:
+        cached = load_tasks_cache(signature, blobs=not summary)
+        if cached is not None:
+            summaries, blobs = cached
+            if summary:
+                tasks = summaries
+            else:
+                with trace_span("marshal.loads", tasks=len(blobs)), gc_paused():
+                    tasks = [marshal.loads(blob) for blob in blobs]
+            return replay_journal_for_read(tasks, signature)
+
+    if summary and not shards_enabled():
+        # Stream tasks.json: only summaries stay in memory, full records are spooled into the cache.
+        with trace_span("stream", path=TASKS_PATH.name, bytes=signature[0] if signature else None):
+            if signature is None:
+                return replay_journal_for_read([task_summary(task) for task in iter_tasks_json(TASKS_PATH)], signature)
+            with gc_paused():
+                summaries = store_tasks_cache(signature, iter_tasks_json(TASKS_PATH), recheck=True)
+        return replay_journal_for_read(summaries, signature)
+
+    data = load_tasks_document(signature)
+    tasks = data.get("tasks", [])
+    if not isinstance(tasks, list):
+        die("tasks.json must contain a top-level 'tasks' list")
+    for index, task in enumerate(tasks):
+        if not isinstance(task, dict):
+            die(f"tasks.json tasks[{index}] must be an object")
+    if signature is not None and not shards_enabled() and tasks_signature() == signature:
+        store_tasks_cache(signature, tasks)
+    return replay_journal_for_read(tasks, signature)
+
+
+def replay_journal_for_read(tasks: List[Dict], signature: Optional[Tuple[int, int, str]]) -> List[Dict]:
+    records = read_journal()
+    if records:
+        tasks_by_id, _ = index_tasks_by_id(tasks)
+        replay_journal(tasks, tasks_by_id, records, signature[2] if signature is not None else None)
+    return tasks
+
+
+def load_task(task_id: str) -> Optional[Dict]:
+    """Load a single full task record, decoding only its cached blob (or its shard) when possible."""
+    if shards_enabled():
+        loaded = load_task_shard(task_id) if re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9._-]*", task_id) else None
+        return loaded[0] if loaded is not None else None
+    signature = tasks_file_signature(TASKS_PATH)
+    tasks: List[Dict] = []
+    try:
+        with TASKS_CACHE_PATH.open("rb") as handle:
+            index = read_tasks_cache_index(handle, signature) if signature is not None else None
+            if index is not None:
+                summaries, offsets = index
+                base = handle.tell()
+                for position, summary in enumerate(summaries):
+                    if (summary.get("id") or "").strip() == task_id:
+                        handle.seek(base + offsets[position])
+                        tasks.append(marshal.loads(handle.read(offsets[position + 1] - offsets[position])))
+                        break
+    except OSError:
+        index = None
+    if index is None:
+        tasks_by_id, _ = index_tasks_by_id(load_tasks())
+        return tasks_by_id.get(task_id)
+    records = [record for record in read_journal() if record.get("id") == task_id]
+    if records:
+        tasks_by_id = {task_id: tasks[0]} if tasks else {}
+        replay_journal(tasks, tasks_by_id, records, signature[2] if signature is not None else None)
+    return tasks[0] if tasks else None
+
+
+def iter_tasks() -> Iterator[Dict]:
+    """Full task records one at a time, for read-only scans that keep only what they match."""
+    if journal_size():
+        yield from load_tasks()
+        return
+    if shards_enabled():
+        for task, _ in iter_task_shards():
+            yield task
+        return
+    signature = tasks_file_signature(TASKS_PATH)
+    try:
+        handle = TASKS_CACHE_PATH.open("rb")
+    except OSError:
+        handle = None
+    if handle is not None:
+        with handle:
+            index = read_tasks_cache_index(handle, signature, summaries=False) if signature is not None else None
+            if index is not None:
+                offsets = index[1]
+                for start, end in zip(offsets, offsets[1:]):
+                    yield marshal.loads(handle.read(end - start))
+                return
+    yield from iter_tasks_json(TASKS_PATH)
+
+
+def format_task_line(task: Dict) -> str:
+    task_id = str(task.get("id") or "").strip()
+    title = str(task.get("title") or "").strip() or "(untitled task)"
+    status = str(task.get("status") or "TODO").strip().upper()
+    return f"{task_id} [{status}] {title}"
+
+
+def cmd_task_list(args: argparse.Namespace) -> None:
+    if task_db_enabled():
+        with closing(open_task_db()) as conn:
+            if not args.quiet:
+                for warning in _task_db_meta(conn, "index_warnings") or []:
+                    print(f"⚠️ {warning}")
+            for task in query_task_db(conn, statuses=args.status, owners=args.owner, tags=args.tag):
+                print(format_task_line(task))
+        return
+    tasks = load_tasks(summary=True)
+    tasks_by_id, warnings = index_tasks_by_id(tasks)
+    if warnings and not args.quiet:
+        for warning in warnings:
+            print(f"⚠️ {warning}")
+    tasks_sorted = sorted(tasks_by_id.values(), key=lambda t: str(t.get("id") or ""))
+    if args.status:
+        want = {s.strip().upper() for s in args.status}
+        tasks_sorted = [t for t in tasks_sorted if str(t.get("status") or "TODO").strip().upper() in want]
+    if args.owner:
+        want_owner = {o.strip().upper() for o in args.owner}
+        tasks_sorted = [t for t in tasks_sorted if str(t.get("owner") or "").strip().upper() in want_owner]
+    if args.tag:
+        want_tag = {t.strip() for t in args.tag}
+        filtered: List[Dict] = []
+        for task in tasks_sorted:
+            tags = task.get("tags") or []
+            if any(tag in want_tag for tag in tags if isinstance(tag, str)):
+                filtered.append(task)
+        tasks_sorted = filtered
+    for task in tasks_sorted:
+        print(format_task_line(task))
+
+
+def cmd_task_next(args: argparse.Namespace) -> None:
+    if task_db_enabled():
+        with closing(open_task_db()) as conn:
+            if not args.quiet:
+                for key in ("index_warnings", "dep_warnings"):
+                    for warning in _task_db_meta(conn, key) or []:
+                        print(f"⚠️ {warning}")
+            statuses = args.status or ["TODO"]
+            for task in query_task_db(conn, statuses=statuses, owners=args.owner, tags=args.tag, ready=True, limit=args.limit):
+                print(format_task_line(task))
+        return
+    store = TaskStore.load_summaries()
+    tasks_by_id, warnings = store.index()
+    dep_state, dep_warnings = store.dependency_state()
+    warnings = warnings + dep_warnings
+    if warnings and not args.quiet:
+        for warning in warnings:
+            print(f"⚠️ {warning}")
+
+    statuses = {s.strip().upper() for s in (args.status or ["TODO"])}
+    tasks_sorted = [t for t in tasks_by_id.values() if str(t.get("status") or "TODO").strip().upper() in statuses]
+    tasks_sorted.sort(key=lambda t: str(t.get("id") or ""))
+
+    if args.owner:
+        want_owner = {o.strip().upper() for o in args.owner}
+        tasks_sorted = [t for t in tasks_sorted if str(t.get("owner") or "").strip().upper() in want_owner]
+    if args.tag:
+        want_tag = {t.strip() for t in args.tag}
+        filtered: List[Dict] = []
+        for task in tasks_sorted:
+            tags = task.get("tags") or []
+            if any(tag in want_tag for tag in tags if isinstance(tag, str)):
+                filtered.append(task)
+        tasks_sorted = filtered
+
+    ready_tasks: List[Dict] = []
+    for task in tasks_sorted:
+        task_id = str(task.get("id") or "").strip()
+        info = dep_state.get(task_id) or {}
+        missing = info.get("missing") or []
+        incomplete = info.get("incomplete") or []
+        if missing or incomplete:
+            continue
+        ready_tasks.append(task)
+
+    if args.limit is not None and args.limit >= 0:
+        ready_tasks = ready_tasks[: args.limit]
+    for task in ready_tasks:
+        print(format_task_line(task))
+
+
+def _task_text_blob(task: Dict) -> str:
+    parts: List[str] = []
+    for key in ("id", "title", "description", "status", "priority", "owner"):
+        value = task.get(key)
+        if isinstance(value, str) and value.strip():
+            parts.append(value.strip())
+    tags = task.get("tags")
+    if isinstance(tags, list):
+        parts.extend(t for t in tags if isinstance(t, str) and t.strip())
+    comments = task.get("comments")
+    if isinstance(comments, list):
+        for comment in comments:
+            if not isinstance(comment, dict):
+                continue
+            author = comment.get("author")
+            body = comment.get("body")
+            if isinstance(author, str) and author.strip():
+                parts.append(author.strip())
+            if isinstance(body, str) and body.strip():
+                parts.append(body.strip())
+    commit = task.get("commit")
+    if isinstance(commit, dict):
+        for key in ("hash", "message"):
+            value = commit.get(key)
+            if isinstance(value, str) and value.strip():
+                parts.append(value.strip())
+    return "\n".join(parts)
+
+
+def search_tokens(text: str, *, split_compounds: bool = True) -> List[str]:
+    """Tokenize for the search index: Unicode words (Cyrillic included), casefolded, ё -> е."""
+    tokens: List[str] = []
+    for match in re.finditer(r"\w+(?:-\w+)*", text.casefold().replace("ё", "е")):
+        word = match.group(0)
+        tokens.append(word)
+        if split_compounds and "-" in word:
+            tokens.extend(part for part in word.split("-") if part)
+    return tokens
+
+
+def search_document_terms(task: Dict) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    # Title tokens are counted twice so title hits outrank comment chatter.
+    for token in search_tokens(_task_text_blob(task)) + search_tokens(str(task.get("title") or "")):
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def token_grams(token: str) -> Set[str]:
+    return {token[start : start + SEARCH_GRAM] for start in range(len(token) - SEARCH_GRAM + 1)}
+
+
+def search_query_terms(query: str) -> List[Tuple[str, bool, bool]]:
+    """(term, must start a token, must end a token) per query word."""
+    text = query.casefold().replace("ё", "е")
+    terms: Dict[Tuple[str, bool, bool], None] = {}
+    for match in re.finditer(r"\w+(?:-\w+)*", text):
+        begin, end = match.span()
+        at_start = begin > 0 and not text[begin - 1].isspace()
+        at_end = end < len(text) and not text[end].isspace()
+        terms[(match.group(0), at_start, at_end)] = None
+    return list(terms)
+
+
+def search_term_matches(token: str, term: str, at_start: bool, at_end: bool) -> bool:
+    if at_start and at_end:
+        return token == term
+    if at_start:
+        return token.startswith(term)
+    if at_end:
+        return token.endswith(term)
+    return term in token
+
+
+def update_search_index(index: Dict, store: TaskStore) -> None:
+    """Re-tokenize only tasks whose per-task hash changed since they were indexed."""
+    docs: Dict[str, Tuple[str, Tuple[str, ...]]] = index["docs"]
+    postings: Dict[str, Dict[str, int]] = index["postings"]
+    lengths: Dict[str, int] = index["lengths"]
+    gone: Set[str] = set()
+    new: Set[str] = set()
+    tasks_by_id, _ = store.index()
+    current: Dict[str, Tuple[Dict, str]] = {}
+    for task, task_hash in zip(store.tasks, store.task_hashes()):
+        task_id = str(task.get("id") or "").strip() if isinstance(task, dict) else ""
+        if task_id and tasks_by_id.get(task_id) is task:
+            current[task_id] = (task, task_hash)
+
+    def drop(task_id: str) -> None:
+        lengths.pop(task_id, None)
+        for token in docs.pop(task_id)[1]:
+            bucket = postings.get(token)
+            if bucket is not None:
+                bucket.pop(task_id, None)
+                if not bucket:
+                    del postings[token]
+                    gone.add(token)
+
+    changed = False
+    for task_id in [task_id for task_id in docs if task_id not in current]:
+        drop(task_id)
+        changed = True
+    for task_id, (task, task_hash) in current.items():
+        old = docs.get(task_id)
+        if old is not None and old[0] == task_hash:
+            continue
+        if old is not None:
+            drop(task_id)
+        terms = search_document_terms(task)
+        for token, tf in terms.items():
+            if token not in postings:
+                new.add(token)
+                postings[token] = {}
+            postings[token][task_id] = tf
+        docs[task_id] = (task_hash, tuple(terms))
+        lengths[task_id] = sum(terms.values())
+        changed = True
+    if changed or "vocab" not in index:
+        index["vocab"] = sorted(postings)
+    update_search_grams(index, gone - set(postings), new - gone)
+
+
+def update_search_grams(index: Dict, removed: Set[str], added: Set[str]) -> None:
+    """Keep the n-gram -> token id map in step with the vocabulary."""
+    tokens: List[Optional[str]] = index.setdefault("tokens", [])
+    grams: Dict[str, Set[int]] = index.setdefault("grams", {})
+    ids = {token: number for number, token in enumerate(tokens) if token is not None}
+    if not removed <= ids.keys() or len(ids) - len(removed) + len(added) != len(index["postings"]):
+        tokens.clear()
+        grams.clear()
+        ids.clear()
+        removed, added = set(), set(index["postings"])
+    for token in removed:
+        number = ids.pop(token)
+        tokens[number] = None
+        for gram in token_grams(token):
+            bucket = grams.get(gram)
+            if bucket is not None:
+                bucket.discard(number)
+                if not bucket:
+                    del grams[gram]
+    free = [number for number, token in enumerate(tokens) if token is None]
+    for token in sorted(added):
+        if free:
+            number = free.pop()
+            tokens[number] = token
+        else:
+            number = len(tokens)
+            tokens.append(token)
+        for gram in token_grams(token):
+            grams.setdefault(gram, set()).add(number)
+
+
+def search_index_part(index: Dict, name: str):
+    """Decode a lazily stored part of the index (vocab, tokens, grams) on first use."""
+    value = index[name]
+    if isinstance(value, bytes):
+        value = index[name] = marshal.loads(value)
+    return value
+
+
+def load_search_index() -> Dict:
+    """Load the token index from .agentctl/search.index, refreshing it incrementally if stale."""
+    signature = tasks_signature()
+    key = (SEARCH_INDEX_VERSION, str(TASKS_PATH), *signature, journal_size()) if signature else None
+    index: Dict = {"docs": {}, "postings": {}, "lengths": {}}
+    try:
+        with trace_span("read", path=SEARCH_INDEX_PATH.name) as span, SEARCH_INDEX_PATH.open("rb") as handle:
+            header = marshal.load(handle)
+            query_blob, docs_blob = marshal.loads(handle.read())
+            span.set(bytes=handle.tell())
+            if signature is not None and cache_is_racy(signature, os.fstat(handle.fileno())):
+                key = None
+        with gc_paused():
+            encoded, index["lengths"], index["vocab"], index["tokens"], index["grams"] = marshal.loads(query_blob)
+            if key is not None and header == key and cache_enabled():
+                index["postings"] = encoded
+                return index
+            index["postings"] = {token: marshal.loads(blob) for token, blob in encoded.items()}
+            grams = search_index_part(index, "grams")
+            index["grams"] = {gram: marshal.loads(blob) for gram, blob in grams.items()}
+            index["tokens"] = search_index_part(index, "tokens")
+            index["vocab"] = search_index_part(index, "vocab")
+            index["docs"] = marshal.loads(docs_blob)
+    except (OSError, EOFError, ValueError, TypeError):
+        index = {"docs": {}, "postings": {}, "lengths": {}}
+
+    store = TaskStore.load()
+    with trace_span("update_search_index"):
+        update_search_index(index, store)
+    if store.signature is not None and cache_enabled():
+        tmp_path = SEARCH_INDEX_PATH.with_name(f"{SEARCH_INDEX_PATH.name}.{os.getpid()}.tmp")
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            encoded = {token: marshal.dumps(bucket) for token, bucket in index["postings"].items()}
+            grams = marshal.dumps({gram: marshal.dumps(bucket) for gram, bucket in index["grams"].items()})
+            parts = (encoded, index["lengths"], marshal.dumps(index["vocab"]), marshal.dumps(index["tokens"]), grams)
+            with trace_span("write", path=SEARCH_INDEX_PATH.name) as span, tmp_path.open("wb") as handle:
+                marshal.dump((SEARCH_INDEX_VERSION, str(TASKS_PATH), *store.signature, store.journal_size), handle)
+                handle.write(marshal.dumps((marshal.dumps(parts), marshal.dumps(index["docs"]))))
+                span.set(bytes=handle.tell())
+            os.replace(tmp_path, SEARCH_INDEX_PATH)
+        except (OSError, ValueError):
+            if tmp_path.exists():
+                tmp_path.unlink()
+    return index
+
+
+def search_index_tokens(index: Dict, term: str, at_start: bool, at_end: bool) -> List[str]:
+    """Vocabulary tokens a query term matches: postings for whole tokens, bisect for prefixes, n-grams otherwise."""
+    import bisect
+
+    if at_start and at_end:
+        return [term] if term in index["postings"] else []
+    if at_start:
+        vocab: List[str] = search_index_part(index, "vocab")
+        matched = []
+        for position in range(bisect.bisect_left(vocab, term), len(vocab)):
+            if not vocab[position].startswith(term):
+                break
+            matched.append(vocab[position])
+        return matched
+    if len(term) < SEARCH_GRAM:
+        candidates: Iterable[str] = search_index_part(index, "vocab")  # shorter than an n-gram: nothing to look up
+    else:
+        grams = search_index_part(index, "grams")
+        buckets = []
+        for gram in token_grams(term):
+            bucket = grams.get(gram)
+            if bucket is None:
+                return []
+            if isinstance(bucket, bytes):
+                bucket = grams[gram] = marshal.loads(bucket)
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        tokens: List[Optional[str]] = search_index_part(index, "tokens")
+        candidates = [tokens[number] for number in buckets[0].intersection(*buckets[1:])]
+    return [token for token in candidates if search_term_matches(token, term, at_start, at_end)]
+
+
+def search_index_query(index: Dict, query: str, candidates: Set[str]) -> Optional[List[str]]:
+    """Rank candidate task ids by BM25 (None when the query has no indexable tokens)."""
+    terms = search_query_terms(query)
+    if not terms:
+        return None
+    lengths: Dict[str, int] = index["lengths"]
+    postings: Dict[str, Dict[str, int]] = index["postings"]  # values may still be encoded (bytes)
+    total = len(lengths) or 1
+    avg_len = (sum(lengths.values()) / total) or 1.0
+
+    scores: Optional[Dict[str, float]] = None
+    for term in terms:
+        term_scores: Dict[str, float] = {}
+        for token in search_index_tokens(index, *term):
+            bucket = postings[token]
+            if isinstance(bucket, bytes):
+                bucket = postings[token] = marshal.loads(bucket)
+            idf = math.log(1 + (total - len(bucket) + 0.5) / (len(bucket) + 0.5))
+            for task_id, tf in bucket.items():
+                if task_id not in candidates:
+                    continue
+                norm = SEARCH_BM25_K1 * (1 - SEARCH_BM25_B + SEARCH_BM25_B * lengths[task_id] / avg_len)
+                term_scores[task_id] = term_scores.get(task_id, 0.0) + idf * tf * (SEARCH_BM25_K1 + 1) / (tf + norm)
+        if scores is None:
+            scores = term_scores
+        else:
+            scores = {task_id: score + term_scores[task_id] for task_id, score in scores.items() if task_id in term_scores}
+        if not scores:
+            return []
+    return [task_id for task_id, _ in sorted((scores or {}).items(), key=lambda item: (-item[1], item[0]))]
+
+
+def task_matches_filters(task: Dict, args: argparse.Namespace) -> bool:
+    """--status/--owner/--tag filters shared by search over live and archived tasks."""
+    if args.status and str(task.get("status") or "TODO").strip().upper() not in {s.strip().upper() for s in args.status}:
+        return False
+    if args.owner and str(task.get("owner") or "").strip().upper() not in {o.strip().upper() for o in args.owner}:
+        return False
+    if args.tag:
+        want_tag = {t.strip() for t in args.tag}
+        if not any(tag in want_tag for tag in task.get("tags") or [] if isinstance(tag, str)):
+            return False
+    return True
+
+
+def search_text_matcher(query: str) -> Callable[[Dict], bool]:
+    """Unranked equivalent of search_index_query for tasks outside the index."""
+    terms = search_query_terms(query)
+    if not terms:
+        q = query.lower()
+        return lambda task: q in (_task_text_blob(task) or "").lower()
+
+    def match(task: Dict) -> bool:
+        tokens = set(search_tokens(_task_text_blob(task)))
+        return all(any(search_term_matches(token, *term) for token in tokens) for term in terms)
+
+    return match
+
+
+def scan_task_texts(match: Callable[[str], bool]) -> Set[str]:
+    """Ids whose searchable text matches, streaming full records (first entry wins for duplicate ids)."""
+    seen: Set[str] = set()
+    hits: Set[str] = set()
+    for task in iter_tasks():
+        task_id = str(task.get("id") or "").strip()
+        if task_id in seen:
+            continue
+        seen.add(task_id)
+        if match(_task_text_blob(task) or ""):
+            hits.add(task_id)
+    return hits
+
+
+def cmd_task_search(args: argparse.Namespace) -> None:
+    query = args.query.strip()
+    if not query:
+        die("Query must be non-empty", code=2)
+
+    tasks = load_tasks(summary=True)
+    tasks_by_id, warnings = index_tasks_by_id(tasks)
+    if warnings and not args.quiet:
+        for warning in warnings:
+            print(f"⚠️ {warning}")
+
+    tasks_sorted = sorted(tasks_by_id.values(), key=lambda t: str(t.get("id") or ""))
+    tasks_sorted = [t for t in tasks_sorted if task_matches_filters(t, args)]
+
+    if args.regex:
+        try:
+            pattern = re.compile(query, flags=re.IGNORECASE)
+        except re.error as exc:
+            die(f"Invalid regex: {exc}", code=2)
+        hits = scan_task_texts(lambda text: bool(pattern.search(text)))
+        matches = [t for t in tasks_sorted if str(t.get("id") or "").strip() in hits]
+    else:
+        candidates = {str(t.get("id") or "").strip() for t in tasks_sorted}
+        ranked = search_index_query(load_search_index(), query, candidates)
+        if ranked is None:
+            q = query.lower()
+            hits = scan_task_texts(lambda text: q in text.lower())
+            matches = [t for t in tasks_sorted if str(t.get("id") or "").strip() in hits]
+        else:
+            matches = [tasks_by_id[task_id] for task_id in ranked]
+
+    if args.archived and not (args.limit is not None and 0 <= args.limit <= len(matches)):
+        if args.regex:
+            archived_match: Callable[[Dict], bool] = lambda task: bool(pattern.search(_task_text_blob(task) or ""))
+        else:
+            archived_match = search_text_matcher(query)
+        archived = [
+            task
+            for task in iter_archived_tasks()
+            if str(task.get("id") or "").strip() not in tasks_by_id and task_matches_filters(task, args) and archived_match(task)
+        ]
+        matches.extend(sorted(archived, key=lambda t: str(t.get("id") or "")))
+
+    if args.limit is not None and args.limit >= 0:
+        matches = matches[: args.limit]
+    for task in matches:
+        print(format_task_line(task))
+
+
+def cmd_task_scaffold(args: argparse.Namespace) -> None:
+    task_id = args.task_id.strip()
+    if not task_id:
+        die("task_id must be non-empty", code=2)
+
+    title = args.title
+    if not title and not args.force:
+        task = TaskStore.load().get(task_id)
+        title = str(task.get("title") or "").strip()
+
+    WORKFLOW_DIR.mkdir(parents=True, exist_ok=True)
+    target = WORKFLOW_DIR / f"{task_id}.md"
+    if target.exists() and not args.overwrite:
+        die(f"File already exists: {target}", code=2)
+
+    heading = f"# {task_id}: {title.strip()}" if title and title.strip() else f"# {task_id}"
+    content = "\n".join(
+        [
+            heading,
+            "",
+            "## Goal",
+            "",
+            "- ...",
+            "",
+            "## Scope",
+            "",
+            "- ...",
+            "",
+            "## Verification",
+            "",
+            "- ...",
+            "",
+        ]
+    )
+    target.write_text(content, encoding="utf-8")
+    if not args.quiet:
+        print(f"✅ wrote {target.relative_to(ROOT)}")
+
+
+def cmd_task_show(args: argparse.Namespace) -> None:
+    tasks = load_tasks(summary=True)
+    tasks_by_id, warnings = index_tasks_by_id(tasks)
+    if warnings and not args.quiet:
+        for warning in warnings:
+            print(f"⚠️ {warning}")
+    task = load_task(args.task_id) if args.task_id in tasks_by_id else None
+    segment = None
+    if not task:
+        archived = load_archived_task(args.task_id)
+        if archived is None:
+            die(f"Unknown task id: {args.task_id}")
+        task, segment = archived
+
+    task_id = str(task.get("id") or "").strip()
+    print(f"ID: {task_id}")
+    if segment:
+        print(f"Archived: {ARCHIVE_DIR.name}/{segment}")
+    print(f"Title: {str(task.get('title') or '').strip()}")
+    print(f"Status: {str(task.get('status') or 'TODO').strip().upper()}")
+    print(f"Priority: {str(task.get('priority') or '-').strip()}")
+    owner = str(task.get("owner") or "-").strip()
+    print(f"Owner: {owner if owner else '-'}")
+    depends_on, _ = normalize_depends_on(task.get("depends_on"))
+    print(f"Depends on: {', '.join(depends_on) if depends_on else '-'}")
+    tags = task.get("tags") or []
+    tags_str = ", ".join(t for t in tags if isinstance(t, str))
+    print(f"Tags: {tags_str if tags_str else '-'}")
+    description = str(task.get("description") or "").strip()
+    if description:
+        print("")
+        print("Description:")
+        print(description)
+    commit = task.get("commit") or {}
+    if isinstance(commit, dict) and commit.get("hash"):
+        print("")
+        print("Commit:")
+        print(f"{commit.get('hash')} {commit.get('message') or ''}".rstrip())
+    comments = task.get("comments") or []
+    if isinstance(comments, list) and comments:
+        print("")
+        print("Comments:")
+        for comment in comments[-args.last_comments :]:
+            if not isinstance(comment, dict):
+                continue
+            author = str(comment.get("author") or "unknown")
+            body = str(comment.get("body") or "").strip()
+            print(f"- {author}: {body}")
+
+
+def index_tasks_by_id(tasks: List[Dict]) -> Tuple[Dict[str, Dict], List[str]]:
+    warnings: List[str] = []
+    tasks_by_id: Dict[str, Dict] = {}
+    for index, task in enumerate(tasks):
+        task_id = (task.get("id") or "").strip()
+        if not task_id:
+            warnings.append(f"tasks[{index}] is missing a non-empty id")
+            continue
+        if task_id in tasks_by_id:
+            warnings.append(f"Duplicate task id found: {task_id} (keeping first, ignoring later entries)")
+            continue
+        tasks_by_id[task_id] = task
+    return tasks_by_id, warnings
+
+
+def normalize_depends_on(value: object) -> Tuple[List[str], List[str]]:
+    if value is None:
+        return [], []
+    if not isinstance(value, list):
+        return [], ["depends_on must be a list of task IDs"]
+    errors: List[str] = []
+    normalized: List[str] = []
+    seen: Set[str] = set()
+    for raw in value:
+        if not isinstance(raw, str):
+            errors.append("depends_on entries must be strings")
+            continue
+        task_id = raw.strip()
+        if not task_id or task_id in seen:
+            continue
+        seen.add(task_id)
+        normalized.append(task_id)
+    return normalized, errors
+
+
+def strongly_connected_components(edges: Dict[str, List[str]]) -> List[List[str]]:
+    """Iterative Tarjan SCC over edges (node -> deps); deps outside `edges` are ignored. O(V+E)."""
+    order: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+
+    for root in edges:
+        if root in order:
+            continue
+        order[root] = low[root] = len(order)
+        stack.append(root)
+        on_stack.add(root)
+        work: List[Tuple[str, Iterator[str]]] = [(root, iter(edges[root]))]
+        while work:
+            node, deps = work[-1]
+            descended = False
+            for dep in deps:
+                if dep not in edges:
+                    continue
+                if dep not in order:
+                    order[dep] = low[dep] = len(order)
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(edges[dep])))
+                    descended = True
+                    break
+                if dep in on_stack:
+                    low[node] = min(low[node], order[dep])
+            if descended:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == order[node]:
+                component: List[str] = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def shortest_cycle(edges: Dict[str, List[str]], members: Set[str], start: str) -> List[str]:
+    """BFS for the shortest cycle start -> ... -> start using only edges inside `members`."""
+    parents: Dict[str, str] = {}
+    queue = [start]
+    for node in queue:
+        for dep in edges.get(node, []):
+            if dep == start:
+                path = [node]
+                while path[-1] != start:
+                    path.append(parents[path[-1]])
+                return list(reversed(path)) + [start]
+            if dep in members and dep not in parents:
+                parents[dep] = node
+                queue.append(dep)
+    return [start, start]
+
+
+def dependency_cycle_groups(edges: Dict[str, List[str]]) -> List[Tuple[List[str], List[str]]]:
+    """Return (shortest cycle as a closed path, sorted group members) per cyclic SCC."""
+    groups: List[Tuple[List[str], List[str]]] = []
+    for component in strongly_connected_components(edges):
+        start = min(component)
+        if len(component) == 1 and start not in edges.get(start, []):
+            continue
+        groups.append((shortest_cycle(edges, set(component), start), sorted(component)))
+    return sorted(groups)
+
+
+def detect_cycles(edges: Dict[str, List[str]]) -> List[List[str]]:
+    return [cycle for cycle, _ in dependency_cycle_groups(edges)]
+
+
+def compute_dependency_state(tasks_by_id: Dict[str, Dict]) -> Tuple[Dict[str, Dict[str, List[str]]], List[str]]:
+    warnings: List[str] = []
+    state: Dict[str, Dict[str, List[str]]] = {}
+    edges: Dict[str, List[str]] = {}
+    archived = archived_task_ids()
+
+    for task_id, task in tasks_by_id.items():
+        depends_on, dep_errors = normalize_depends_on(task.get("depends_on"))
+        if dep_errors:
+            warnings.append(f"{task_id}: " + "; ".join(sorted(set(dep_errors))))
+        if task_id in depends_on:
+            warnings.append(f"{task_id}: depends_on contains itself")
+        missing: List[str] = []
+        incomplete: List[str] = []
+        for dep_id in depends_on:
+            dep_task = tasks_by_id.get(dep_id)
+            if not dep_task:
+                if dep_id not in archived:  # archived tasks are DONE
+                    missing.append(dep_id)
+                continue
+            if dep_task.get("status") != "DONE":
+                incomplete.append(dep_id)
+        state[task_id] = {
+            "depends_on": depends_on,
+            "missing": sorted(set(missing)),
+            "incomplete": sorted(set(incomplete)),
+        }
+        edges[task_id] = depends_on
+
+    for cycle, members in dependency_cycle_groups(edges):
+        message = "Dependency cycle detected: " + " -> ".join(cycle)
+        if len(members) > len(cycle) - 1:
+            message += f" (cycle group: {', '.join(members)})"
+        warnings.append(message)
+
+    return state, warnings
+
+
+def build_dependents(dep_state: Dict[str, Dict[str, List[str]]]) -> Dict[str, List[str]]:
+    """Reverse dependency index: dep id -> ids of the tasks that list it in depends_on."""
+    dependents: Dict[str, List[str]] = {}
+    for task_id, info in dep_state.items():
+        for dep_id in info["depends_on"]:
+            dependents.setdefault(dep_id, []).append(task_id)
+    return dependents
+
+
+def tasks_state_key() -> Optional[Tuple[int, int, str, int]]:
+    """tasks.json signature plus journal size; None when the file has no meta.checksum."""
+    signature = tasks_signature()
+    if signature is None or not signature[2]:
+        return None
+    return (*signature, journal_size())
+
+
+def read_deps_cache() -> Optional[Tuple]:
+    if not cache_enabled():
+        return None
+    try:
+        with trace_span("read", path=DEPS_CACHE_PATH.name) as span, DEPS_CACHE_PATH.open("rb") as handle:
+            header = marshal.load(handle)
+            if header != (DEPS_CACHE_VERSION, str(TASKS_PATH)):
+                return None
+            with gc_paused():
+                cached = marshal.loads(handle.read())
+            span.set(bytes=handle.tell())
+            cache_stat = os.fstat(handle.fileno())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, tuple) or len(cached) != 6:
+        return None
+    if isinstance(cached[0], tuple) and cache_is_racy(cached[0], cache_stat):
+        # Not an exact hit; statuses and edges are still compared against the fresh tasks.
+        cached = (None, *cached[1:])
+    return cached
+
+
+def store_deps_cache(payload: Tuple) -> None:
+    tmp_path = DEPS_CACHE_PATH.with_name(f"{DEPS_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        data = marshal.dumps(payload)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with trace_span("write", path=DEPS_CACHE_PATH.name, bytes=len(data)):
+            with tmp_path.open("wb") as handle:
+                marshal.dump((DEPS_CACHE_VERSION, str(TASKS_PATH)), handle)
+                handle.write(data)
+            os.replace(tmp_path, DEPS_CACHE_PATH)
+    except (OSError, ValueError):
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def load_dependency_state(
+    tasks_by_id: Dict[str, Dict], key: Optional[Tuple[int, int, str, int]]
+) -> Tuple[Dict[str, Dict[str, List[str]]], List[str]]:
+    """compute_dependency_state for read-only commands, backed by .agentctl/deps.cache."""
+    if key is None or not cache_enabled():
+        return compute_dependency_state(tasks_by_id)
+    cached = read_deps_cache()
+    if cached is not None and cached[0] == key:
+        return cached[3], cached[4]
+
+    statuses = {task_id: task.get("status") for task_id, task in tasks_by_id.items()}
+    raw_deps = {task_id: task.get("depends_on") for task_id, task in tasks_by_id.items()}
+    if cached is not None and cached[2] == raw_deps:
+        _, cached_statuses, _, state, warnings, dependents = cached
+        for task_id, status in statuses.items():
+            if cached_statuses.get(task_id) == status:
+                continue
+            for dependent_id in dependents.get(task_id, ()):
+                info = state[dependent_id]
+                info["incomplete"] = sorted(
+                    dep_id for dep_id in set(info["depends_on"]) if dep_id in statuses and statuses[dep_id] != "DONE"
+                )
+    else:
+        state, warnings = compute_dependency_state(tasks_by_id)
+        dependents = build_dependents(state)
+    if tasks_state_key() == key:
+        store_deps_cache((key, statuses, raw_deps, state, warnings, dependents))
+    return state, warnings
+
+
+class TaskStore:
+    """Single-load view of tasks.json (plus replayed journal) for one agentctl invocation."""
+
+    def __init__(
+        self,
+        data: Dict,
+        *,
+        signature: Optional[Tuple[int, int, str]] = None,
+        hashes: Optional[List[str]] = None,
+        verified: bool = False,
+    ) -> None:
+        if not isinstance(data.get("tasks"), list):
+            die("tasks.json must contain a top-level 'tasks' list")
+        self.data = data
+        self.signature = signature
+        if hashes is not None and (len(hashes) != len(data["tasks"]) or not all(isinstance(value, str) for value in hashes)):
+            hashes = None
+        self._hashes = hashes
+        # True when every stored per-task hash is known to match its task content.
+        self.verified = verified and self._hashes is not None
+        self._dirty: Set[int] = set()
+        self._ops: List[Dict] = []
+        self._full_write = False
+        self.journal_records = 0
+        self.journal_stale = 0
+        self.journal_size = 0
+        self.journal_hashes: Dict[int, str] = {}
+        self._index: Optional[Tuple[Dict[str, Dict], List[str]]] = None
+        self._dep_state: Optional[Tuple[Dict[str, Dict[str, List[str]]], List[str]]] = None
+        self._dependents: Optional[Dict[str, List[str]]] = None
+        # Malformed shards left out of data: reads go on without them, save() refuses.
+        self.skipped_shards: List[str] = []
+
+    @classmethod
+    def load(cls) -> "TaskStore":
+        with trace_span("TaskStore.load") as span:
+            signature = tasks_signature()
+            skipped: List[str] = []
+            shard_hashes: List[str] = []
+            data = load_tasks_document(signature, skipped=skipped, hashes=shard_hashes)
+            report_skipped_shards(skipped)
+            if signature is not None and tasks_signature() != signature:
+                signature = None
+            store = cls.from_snapshot(data, signature, shard_hashes)
+            store.skipped_shards = skipped
+            store.replay_journal()
+            span.set(tasks=len(store.tasks), journal_records=store.journal_records)
+        return store
+
+    @classmethod
+    def from_snapshot(
+        cls, data: Dict, signature: Optional[Tuple[int, int, str]], shard_hashes: Optional[List[str]] = None
+    ) -> "TaskStore":
+        """Store over a freshly read document, with the per-task hashes behind its checksum."""
+        if shards_enabled():
+            return cls(data, signature=signature, hashes=shard_hashes, verified=is_verified_signature(signature))
+        hashes, verified = load_recorded_hashes(signature)
+        store = cls(data, signature=signature, hashes=hashes, verified=verified)
+        meta = data.get(TASKS_META_KEY)
+        if (
+            store._hashes is None
+            and isinstance(meta, dict)
+            and meta.get("checksum_algo") == TASKS_CHECKSUM_ALGO
+            and all(isinstance(task, dict) for task in store.tasks)
+        ):
+            with trace_span("compute_task_hashes", tasks=len(store.tasks)):
+                derived = [compute_task_hash(task) for task in store.tasks]
+            if compute_root_checksum(derived) == meta.get("checksum"):
+                store._hashes = derived
+                store.verified = True
+                if signature is not None:
+                    record_verified_signature(signature, dict(meta, task_hashes=derived))
+        return store
+
+    @classmethod
+    def load_summaries(cls) -> "TaskStore":
+        """Read-only store over task summaries; dependency state comes from deps.cache."""
+        key = tasks_state_key()
+
+        def build() -> "TaskStore":
+            store = cls({"tasks": load_tasks(summary=True)})
+            tasks_by_id, _ = store.index()
+            with trace_span("load_dependency_state"):
+                store._dep_state = load_dependency_state(tasks_by_id, key)
+            return store
+
+        return resident_memo("summary_store", key, build)
+
+    @property
+    def tasks(self) -> List[Dict]:
+        return self.data["tasks"]
+
+    @property
+    def snapshot_hashes(self) -> Optional[List[str]]:
+        return self._hashes
+
+    def index(self) -> Tuple[Dict[str, Dict], List[str]]:
+        if self._index is None:
+            self._index = index_tasks_by_id(self.tasks)
+        return self._index
+
+    def dependency_state(self) -> Tuple[Dict[str, Dict[str, List[str]]], List[str]]:
+        if self._dep_state is None:
+            tasks_by_id, _ = self.index()
+            with trace_span("compute_dependency_state", tasks=len(tasks_by_id)):
+                self._dep_state = compute_dependency_state(tasks_by_id)
+            if self._dependents is None:
+                self._dependents = build_dependents(self._dep_state[0])
+        return self._dep_state
+
+    def dependents(self) -> Dict[str, List[str]]:
+        """Reverse dependency index (dep id -> dependent ids); survives status-only changes."""
+        if self._dependents is None:
+            dep_state, _ = self.dependency_state()
+            self._dependents = build_dependents(dep_state)
+        return self._dependents
+
+    def unblocked_by(self, task_id: str) -> List[str]:
+        """TODO dependents of task_id whose dependencies are now all DONE (O(degree))."""
+        tasks_by_id, _ = self.index()
+        ready: List[str] = []
+        for dependent_id in self.dependents().get(task_id, ()):
+            task = tasks_by_id.get(dependent_id)
+            if task is None or str(task.get("status") or "TODO").strip().upper() != "TODO":
+                continue
+            depends_on, _ = normalize_depends_on(task.get("depends_on"))
+            if all((tasks_by_id.get(dep_id) or {}).get("status") == "DONE" for dep_id in depends_on):
+                ready.append(dependent_id)
+        return sorted(ready)
+
+    def replay_journal(self) -> None:
+        self.journal_size = journal_size()
+        records = read_journal()
+        if not records:
+            return
+        base = self.signature[2] if self.signature is not None else None
+        tasks_by_id, _ = self.index()
+        applied, self.journal_stale = replay_journal(self.tasks, tasks_by_id, records, base)
+        for task, task_hash in applied:
+            self._dirty.add(id(task))
+            self.journal_hashes[id(task)] = task_hash
+        self.journal_records = len(records)
+        self._dep_state = None
+        self._dependents = None
+
+    def get(self, task_id: str) -> Dict:
+        tasks_by_id, _ = self.index()
+        task = tasks_by_id.get(task_id)
+        if task is None:
+            die(f"Unknown task id: {task_id}")
+        return task
+
+    def edit(self, task_id: str) -> Dict:
+        """Return a task for arbitrary in-place mutation (forces a full tasks.json write)."""
+        task = self.get(task_id)
+        self._dirty.add(id(task))
+        self._full_write = True
+        self._dep_state = None
+        self._dependents = None
+        return task
+
+    def apply(self, op: Dict) -> Dict:
+        tasks_by_id, _ = self.index()
+        task = apply_task_op(self.tasks, tasks_by_id, op)
+        self._dirty.add(id(task))
+        self._ops.append(op)
+        if op.get("op") != "comment":
+            self._dep_state = None
+        if op.get("op") == "add" or "depends_on" in (op.get("fields") or {}):
+            self._dependents = None
+        return task
+
+    def set_fields(self, task_id: str, fields: Dict) -> Dict:
+        return self.apply({"op": "set", "id": task_id, "fields": fields})
+
+    def comment(self, task_id: str, author: str, body: str) -> Dict:
+        return self.apply({"op": "comment", "id": task_id, "author": author, "body": body})
+
+    def add(self, task: Dict) -> Dict:
+        return self.apply({"op": "add", "task": task})
+
+    def replace_tasks(self, tasks: List[Dict]) -> None:
+        self.data["tasks"] = tasks
+        self._hashes = None
+        self._full_write = True
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self._index = None
+        self._dep_state = None
+        self._dependents = None
+
+    def task_hashes(self) -> List[str]:
+        """Per-task hashes, recomputing only tasks touched since the snapshot was written."""
+        stored = self._hashes or []
+        hashes: List[str] = []
+        for index, task in enumerate(self.tasks):
+            if index < len(stored) and id(task) not in self._dirty:
+                hashes.append(stored[index])
+            else:
+                hashes.append(compute_task_hash(task))
+        return hashes
+
+    def can_journal(self) -> bool:
+        if not journal_enabled() or self._full_write or self._hashes is None or self.signature is None:
+            return False
+        if shards_enabled():
+            return False  # shard writes are already per task
+        return self.journal_stale == 0 and self.journal_records + len(self._ops) <= journal_max_records()
+
+    def save(self, *, compact: bool = False) -> None:
+        """Persist pending changes under the writer lock, replayed on a fresh load if another writer got there first."""
+        if self.skipped_shards:
+            die(
+                f"Refusing to write while {len(self.skipped_shards)} malformed shard(s) are skipped "
+                f"(see above or `task lint`); fix or restore them first",
+                code=2,
+            )
+        with trace_span("TaskStore.save", ops=len(self._ops)) as span, tasks_lock():
+            if self._is_stale():
+                with trace_span("rebase"):
+                    self._rebase()
+            base_key = self.state_key()
+            changed = [pos for pos, task in enumerate(self.tasks) if id(task) in self._dirty]
+            full = self._full_write or self._hashes is None
+            edges = any(op.get("op") == "add" or "depends_on" in (op.get("fields") or {}) for op in self._ops)
+            span.set(changed=len(changed))
+            if not compact and self.can_journal():
+                span.set(mode="journal")
+                self._append_journal()
+            else:
+                span.set(mode="shards" if shards_enabled() else "full")
+                self._write_full()
+            if task_db_enabled() and TASKS_DB_PATH.exists():
+                sync_task_db(self, base_key, None if full else changed, edges_changed=edges)
+        self._ops.clear()
+
+    def state_key(self) -> Optional[Tuple[int, int, str, int]]:
+        """Like tasks_state_key(), for the snapshot + journal this store was loaded from (or last wrote)."""
+        if self.signature is None or not self.signature[2]:
+            return None
+        return (*self.signature, self.journal_size)
+
+    def _is_stale(self) -> bool:
+        current = tasks_signature()
+        if current is None or self.signature is None:
+            return True
+        return current[2] != self.signature[2] or journal_size() != self.journal_size
+
+    def _rebase(self) -> None:
+        if self._full_write:
+            die("tasks.json changed while this command was running; re-run it", code=3)
+        fresh = TaskStore.load()
+        for op in self._ops:
+            fresh.apply(op)
+        vars(self).update(vars(fresh))
+
+    def _write_full(self) -> None:
+        """Write the full document (snapshot + journal + pending changes) and drop the journal."""
+        hashes = self.task_hashes()
+        if shards_enabled():
+            self.signature = self._write_shards(hashes)
+        else:
+            write_tasks_json(self.data, task_hashes=hashes, verified=self.verified or not self._hashes)
+            self.signature = tasks_file_signature(TASKS_PATH)
+        clear_journal()
+        self.journal_size = 0
+        self._hashes = hashes
+        self._dirty.clear()
+        self.journal_hashes.clear()
+        self.journal_records = 0
+        self.journal_stale = 0
+        self._full_write = False
+        self.invalidate()
+
+    def _write_shards(self, hashes: List[str]) -> Optional[Tuple[int, int, str]]:
+        """Sharded layout: rewrite only the shards of changed tasks (all of them after replace_tasks)."""
+        rewrite_all = self._hashes is None
+        # Loaded tasks are already in shard order; only adds and arbitrary edits can change it.
+        reorder = self._full_write or rewrite_all or len(self.tasks) != len(self._hashes or [])
+        live: Set[str] = set()
+        for task, task_hash in zip(self.tasks, hashes):
+            task_id = str(task.get("id") or "").strip()
+            live.add(task_id)
+            if rewrite_all or id(task) in self._dirty:
+                write_task_shard(task, task_hash)
+        if self._full_write:
+            for path in TASKS_SHARD_DIR.glob("*.json"):
+                if path.stem not in live:
+                    path.unlink()
+        signature = shards_signature()
+        if signature is not None:
+            pairs = list(zip(self.tasks, hashes))
+            if reorder:
+                pairs.sort(key=lambda pair: task_sort_key(str(pair[0].get("id") or "")))
+            store_shards_cache(signature, [task for task, _ in pairs], [task_hash for _, task_hash in pairs])
+            if self.verified or not self._hashes:
+                record_verified_signature(signature)
+        return signature
+
+    def _append_journal(self) -> None:
+        tasks_by_id, _ = self.index()
+        grouped: Dict[str, List[Dict]] = {}
+        for op in self._ops:
+            task_id = str(op["task"].get("id") if op.get("op") == "add" else op.get("id"))
+            grouped.setdefault(task_id, []).append(op)
+        base = self.signature[2] if self.signature is not None else ""
+        records = [
+            {"base": base, "id": task_id, "ops": ops, "hash": compute_task_hash(tasks_by_id[task_id])}
+            for task_id, ops in grouped.items()
+        ]
+        append_journal(records)
+        self.journal_records += len(records)
+        self.journal_size = journal_size()
+
+
+TASKS_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS tasks (
+    pos INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    dup INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    done INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    title TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_id ON tasks (id);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+CREATE INDEX IF NOT EXISTS tasks_owner ON tasks (owner);
+CREATE TABLE IF NOT EXISTS task_tags (pos INTEGER NOT NULL, tag TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS task_tags_tag ON task_tags (tag);
+CREATE INDEX IF NOT EXISTS task_tags_pos ON task_tags (pos);
+CREATE TABLE IF NOT EXISTS task_deps (pos INTEGER NOT NULL, dep_id TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS task_deps_pos ON task_deps (pos);
+CREATE INDEX IF NOT EXISTS task_deps_dep ON task_deps (dep_id);
+CREATE TABLE IF NOT EXISTS archived (id TEXT PRIMARY KEY);
+"""
+
+
+def task_db_enabled() -> bool:
+    """Opt-in SQLite index (AGENTCTL_SQLITE=1) answering list/next/ready filters; tasks.json stays canonical."""
+    return bool(os.environ.get("AGENTCTL_SQLITE")) and cache_enabled()
+
+
+def _task_db_meta(conn: "sqlite3.Connection", key: str) -> Optional[object]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _task_db_write_rows(conn: "sqlite3.Connection", store: TaskStore, hashes: List[str], positions: Iterable[int]) -> None:
+    tasks_by_id, _ = store.index()
+    primary = {id(task) for task in tasks_by_id.values()}
+    rows = []
+    tags = []
+    deps = []
+    for pos in positions:
+        task = store.tasks[pos]
+        task_id = str(task.get("id") or "").strip()
+        status = task.get("status")
+        rows.append(
+            (
+                pos,
+                task_id,
+                int(id(task) not in primary),
+                str(status or "TODO").strip().upper(),
+                int(status == "DONE"),
+                str(task.get("owner") or "").strip().upper(),
+                str(task.get("title") or ""),
+                hashes[pos],
+                json.dumps(task, ensure_ascii=False),
+            )
+        )
+        if id(task) not in primary:
+            continue
+        task_tags = task.get("tags")
+        if isinstance(task_tags, list):
+            tags.extend((pos, tag) for tag in set(task_tags) if isinstance(tag, str))
+        depends_on, _ = normalize_depends_on(task.get("depends_on"))
+        deps.extend((pos, dep_id) for dep_id in set(depends_on))
+    conn.executemany("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.executemany("INSERT INTO task_tags VALUES (?, ?)", tags)
+    conn.executemany("INSERT INTO task_deps VALUES (?, ?)", deps)
+
+
+def _task_db_write_meta(conn: "sqlite3.Connection", store: TaskStore, *, warnings: bool) -> None:
+    meta = {key: value for key, value in (store.data.get(TASKS_META_KEY) or {}).items() if key != "checksum"}
+    values = {"version": TASKS_DB_VERSION, "state_key": list(store.state_key() or ()), "meta": meta}
+    if warnings:
+        # Duplicate/missing ids, malformed depends_on and cycles: these only change with ids and edges.
+        values["index_warnings"] = store.index()[1]
+        values["dep_warnings"] = store.dependency_state()[1]
+    conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(key, json.dumps(value)) for key, value in values.items()])
+
+
+def sync_task_db(
+    store: TaskStore,
+    base_key: Optional[Tuple],
+    changed: Optional[List[int]],
+    *,
+    edges_changed: bool = True,
+) -> None:
+    """Bring tasks.sqlite up to date after store wrote its changes."""
+    import sqlite3
+
+    try:
+        conn = sqlite3.connect(TASKS_DB_PATH)
+        with trace_span("sync_task_db") as span, conn:
+            conn.executescript(TASKS_DB_SCHEMA)
+            recorded = _task_db_meta(conn, "state_key")
+            current = _task_db_meta(conn, "version") == TASKS_DB_VERSION
+            if changed is None or base_key is None or not current or recorded != list(base_key):
+                conn.execute("DELETE FROM tasks")
+                conn.execute("DELETE FROM task_tags")
+                conn.execute("DELETE FROM task_deps")
+                conn.execute("DELETE FROM archived")
+                conn.executemany("INSERT INTO archived VALUES (?)", [(task_id,) for task_id in archived_task_ids()])
+                changed = list(range(len(store.tasks)))
+                edges_changed = True
+            else:
+                conn.executemany("DELETE FROM task_tags WHERE pos = ?", [(pos,) for pos in changed])
+                conn.executemany("DELETE FROM task_deps WHERE pos = ?", [(pos,) for pos in changed])
+            span.set(rows=len(changed))
+            _task_db_write_rows(conn, store, store.task_hashes(), changed)
+            _task_db_write_meta(conn, store, warnings=edges_changed)
+        conn.close()
+    except sqlite3.Error as exc:
+        die(f"{TASKS_DB_PATH}: {exc}")
+
+
+def open_task_db() -> "sqlite3.Connection":
+    """Connection to tasks.sqlite, (re)built from tasks.json (+ journal) when it is out of date."""
+    import sqlite3
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        conn = sqlite3.connect(TASKS_DB_PATH)
+        conn.executescript(TASKS_DB_SCHEMA)
+        key = tasks_state_key()
+        if (
+            key is None
+            or _task_db_meta(conn, "version") != TASKS_DB_VERSION
+            or _task_db_meta(conn, "state_key") != list(key)
+            or cache_is_racy(key, TASKS_DB_PATH.stat())
+        ):
+            conn.close()
+            with tasks_lock():
+                sync_task_db(TaskStore.load(), None, None)
+            conn = sqlite3.connect(TASKS_DB_PATH)
+    except sqlite3.Error as exc:
+        die(f"{TASKS_DB_PATH}: {exc}")
+    return conn
+
+
+def query_task_db(
+    conn: "sqlite3.Connection",
+    *,
+    statuses: Optional[Iterable[str]] = None,
+    owners: Optional[Iterable[str]] = None,
+    tags: Optional[Iterable[str]] = None,
+    ready: bool = False,
+    limit: Optional[int] = None,
+) -> List[Dict]:
+    """Id-ordered {id, status, title} rows matching the filters (same semantics as the in-memory filters)."""
+    clauses = ["t.dup = 0"]
+    params: List[object] = []
+    for column, values in (("t.status", statuses), ("t.owner", owners)):
+        if values:
+            wanted = sorted({value.strip().upper() for value in values})
+            clauses.append(f"{column} IN ({', '.join('?' * len(wanted))})")
+            params.extend(wanted)
+    if tags:
+        wanted = sorted({tag.strip() for tag in tags})
+        clauses.append(f"t.pos IN (SELECT pos FROM task_tags WHERE tag IN ({', '.join('?' * len(wanted))}))")
+        params.extend(wanted)
+    if ready:
+        clauses.append(
+            "NOT EXISTS (SELECT 1 FROM task_deps d LEFT JOIN tasks p ON p.id = d.dep_id AND p.dup = 0 "
+            "WHERE d.pos = t.pos AND (p.done = 0 OR (p.done IS NULL AND d.dep_id NOT IN (SELECT id FROM archived))))"
+        )
+    sql = f"SELECT t.id, t.status, t.title FROM tasks t WHERE {' AND '.join(clauses)} ORDER BY t.id"
+    if limit is not None and limit >= 0:
+        sql += f" LIMIT {int(limit)}"
+    with trace_span("query_task_db") as span:
+        rows = [{"id": task_id, "status": status, "title": title} for task_id, status, title in conn.execute(sql, params)]
+        span.set(rows=len(rows))
+    return rows
+
+
+def task_db_readiness(conn: "sqlite3.Connection", task_id: str) -> Tuple[bool, List[str]]:
+    warnings = list(_task_db_meta(conn, "index_warnings") or []) + list(_task_db_meta(conn, "dep_warnings") or [])
+    row = conn.execute("SELECT pos FROM tasks WHERE id = ? AND dup = 0", (task_id,)).fetchone()
+    if row is None:
+        return False, warnings + [f"Unknown task id: {task_id}"]
+    sql = (
+        "SELECT DISTINCT d.dep_id FROM task_deps d LEFT JOIN tasks p ON p.id = d.dep_id AND p.dup = 0 "
+        "WHERE d.pos = ? AND {} ORDER BY d.dep_id"
+    )
+    missing = [dep for (dep,) in conn.execute(sql.format("p.pos IS NULL AND d.dep_id NOT IN (SELECT id FROM archived)"), row)]
+    incomplete = [dep for (dep,) in conn.execute(sql.format("p.done = 0"), row)]
+    if missing:
+        warnings.append(f"{task_id}: missing deps: {', '.join(missing)}")
+    if incomplete:
+        warnings.append(f"{task_id}: incomplete deps: {', '.join(incomplete)}")
+    return (not missing and not incomplete), warnings
+
+
+def export_task_db(conn: "sqlite3.Connection") -> str:
+    """tasks.json text rebuilt from the database (byte-identical to what agentctl writes for that state)."""
+    tasks: List[Dict] = []
+    hashes: List[str] = []
+    for body, task_hash in conn.execute("SELECT body, hash FROM tasks ORDER BY pos"):
+        tasks.append(json.loads(body))
+        hashes.append(task_hash)
+    data = {"tasks": tasks, TASKS_META_KEY: dict(_task_db_meta(conn, "meta") or {})}
+    if data[TASKS_META_KEY].get("checksum_algo") == LEGACY_TASKS_CHECKSUM_ALGO:
+        data[TASKS_META_KEY]["checksum"] = compute_tasks_checksum(tasks)
+    else:
+        update_tasks_meta(data, hashes)
+    return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+
+def readiness(task_id: str, store: Optional[TaskStore] = None) -> Tuple[bool, List[str]]:
+    if store is None and task_db_enabled():
+        with closing(open_task_db()) as conn:
+            return task_db_readiness(conn, task_id)
+    if store is None:
+        store = TaskStore.load_summaries()
+    tasks_by_id, index_warnings = store.index()
+    dep_state, dep_warnings = store.dependency_state()
+    warnings = index_warnings + dep_warnings
+
+    task = tasks_by_id.get(task_id)
+    if not task:
+        return False, warnings + [f"Unknown task id: {task_id}"]
+
+    info = dep_state.get(task_id) or {}
+    missing = info.get("missing") or []
+    incomplete = info.get("incomplete") or []
+
+    if missing:
+        warnings.append(f"{task_id}: missing deps: {', '.join(missing)}")
+    if incomplete:
+        warnings.append(f"{task_id}: incomplete deps: {', '.join(incomplete)}")
+
+    return (not missing and not incomplete), warnings
+
+
+class GitCatFile:
+    """A `git cat-file --batch` process shared by every object lookup in this process."""
+
+    def __init__(self) -> None:
+        self.proc: Optional[subprocess.Popen] = None
+
+    def read(self, rev: str) -> Optional[Tuple[str, str, bytes]]:
+        """(object id, type, content) for rev, or None when it does not name exactly one object."""
+        import subprocess
+
+        if not rev.strip() or "\n" in rev or "\r" in rev:
+            return None
+        with trace_span("cat-file", rev=rev) as span:
+            for attempt in (1, 2):
+                if self.proc is None or self.proc.poll() is not None:
+                    self.proc = subprocess.Popen(
+                        ["git", "cat-file", "--batch"],
+                        cwd=str(ROOT),
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                    )
+                try:
+                    self.proc.stdin.write(rev.encode("utf-8") + b"\n")
+                    self.proc.stdin.flush()
+                    header = self.proc.stdout.readline().split()
+                    if len(header) != 3:
+                        if header or attempt == 2:
+                            return None  # "<rev> missing" / "<rev> ambiguous", or git cannot run here
+                        self.close()  # the helper died (e.g. the repository was repacked away); retry once
+                        continue
+                    data = self.proc.stdout.read(int(header[2]) + 1)[:-1]
+                except (OSError, ValueError):
+                    self.close()
+                    if attempt == 2:
+                        return None
+                    continue
+                span.set(type=header[1].decode("ascii", "replace"), bytes=len(data))
+                return header[0].decode("ascii"), header[1].decode("ascii"), data
+        return None
+
+    def close(self) -> None:
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:  # noqa: BLE001 - best effort; the helper is disposable
+            proc.kill()
+
+
+_CAT_FILE: Optional[GitCatFile] = None
+
+
+def git_cat_file() -> GitCatFile:
+    global _CAT_FILE
+    if _CAT_FILE is None:
+        _CAT_FILE = GitCatFile()
+    return _CAT_FILE
+
+
+def commit_subject(message: str) -> str:
+    """The first paragraph of a commit message on one line (git's %s)."""
+    paragraph = message.lstrip("\n").split("\n\n", 1)[0]
+    return " ".join(line.rstrip() for line in paragraph.split("\n")).strip()
+
+
+def commit_object_subject(raw: bytes) -> str:
+    """Subject of a raw commit object, decoded per its encoding header (UTF-8 by default)."""
+    headers, _, body = raw.partition(b"\n\n")
+    encoding = "utf-8"
+    for line in headers.split(b"\n"):
+        if line.startswith(b"encoding "):
+            encoding = line[len(b"encoding ") :].decode("ascii", "replace").strip() or encoding
+    try:
+        message = body.decode(encoding, errors="replace")
+    except LookupError:
+        message = body.decode("utf-8", errors="replace")
+    return commit_subject(message)
+
+
+def get_commit_info(rev: str) -> Dict[str, str]:
+    found = git_cat_file().read(f"{rev}^{{commit}}")
+    if found is None:
+        die(f"Failed to resolve git revision: {rev}")
+    commit_hash, _, raw = found
+    return {"hash": commit_hash, "message": commit_object_subject(raw)}
+
+
+def lookup_commits(hashes: List[str]) -> Dict[str, Tuple[str, str]]:
+    """hash -> (full commit id, subject) for each of hashes that names a commit."""
+    import subprocess
+
+    payload = "".join(f"{value}^{{commit}}\n" for value in hashes).encode("ascii")
+    with trace_span("subprocess", cmd="git cat-file --batch", objects=len(hashes)) as span:
+        result = subprocess.run(["git", "cat-file", "--batch"], cwd=str(ROOT), input=payload, capture_output=True)
+        span.set(returncode=result.returncode, stdout_bytes=len(result.stdout))
+    out = result.stdout
+    found: Dict[str, Tuple[str, str]] = {}
+    position = 0
+    for value in hashes:
+        end = out.find(b"\n", position)
+        if end < 0:
+            break
+        header = out[position:end].split()
+        position = end + 1
+        if len(header) != 3:
+            continue
+        size = int(header[2])
+        found[value] = (header[0].decode("ascii"), commit_object_subject(out[position : position + size]))
+        position += size + 1
+    return found
+
+
+def unreachable_commits(commit_ids: Set[str]) -> Set[str]:
+    """The commit ids that no ref reaches (left behind by a rebase, squash or branch deletion)."""
+    import subprocess
+
+    pending = set(commit_ids)
+    if not pending:
+        return pending
+    with trace_span("subprocess", cmd="git rev-list --all", commits=len(pending)) as span:
+        proc = subprocess.Popen(
+            ["git", "rev-list", "--all"], cwd=str(ROOT), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        walked = 0
+        try:
+            for line in proc.stdout:
+                walked += 1
+                pending.discard(line.strip())
+                if not pending:
+                    break
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
+        span.set(walked=walked)
+    return pending
+
+
+def load_commits_cache() -> Dict[str, Tuple[str, str]]:
+    if not cache_enabled():
+        return {}
+    try:
+        header, entries = marshal.loads(COMMITS_CACHE_PATH.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if header != (COMMITS_CACHE_VERSION, str(ROOT)) or not isinstance(entries, dict):
+        return {}
+    return entries
+
+
+def store_commits_cache(entries: Dict[str, Tuple[str, str]]) -> None:
+    if not cache_enabled():
+        return
+    tmp_path = COMMITS_CACHE_PATH.with_name(f"{COMMITS_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(marshal.dumps(((COMMITS_CACHE_VERSION, str(ROOT)), entries)))
+        os.replace(tmp_path, COMMITS_CACHE_PATH)
+    except (OSError, ValueError):
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def verify_task_commits(tasks_by_id: Dict[str, Dict]) -> Tuple[List[str], List[str]]:
+    """(errors, warnings) for the commit.hash of every DONE task."""
+    recorded: List[Tuple[str, str, str]] = []
+    for task_id, task in tasks_by_id.items():
+        commit = task.get("commit")
+        if str(task.get("status") or "").strip().upper() != "DONE" or not isinstance(commit, dict):
+            continue
+        value = str(commit.get("hash") or "").strip()
+        if len(value) >= 7:
+            recorded.append((task_id, value, str(commit.get("message") or "").strip()))
+
+    cache = load_commits_cache()
+    wanted = sorted({value for _, value, _ in recorded if value not in cache and re.fullmatch(r"[0-9a-fA-F]{7,64}", value)})
+    found = lookup_commits(wanted) if wanted else {}
+    unreachable = unreachable_commits({full for full, _ in found.values()})
+    reachable = {value: entry for value, entry in found.items() if entry[0] not in unreachable}
+    if reachable:
+        cache.update(reachable)
+        store_commits_cache(cache)
+
+    errors: List[str] = []
+    warnings: List[str] = []
+    for task_id, value, message in recorded:
+        entry = cache.get(value) or found.get(value)
+        if entry is None:
+            errors.append(f"{task_id}: commit.hash {value} does not name a commit in this repository")
+        elif entry[0] in unreachable:
+            errors.append(f"{task_id}: commit {value} is not reachable from any branch or tag (rebased or squashed?)")
+        elif message and message != entry[1]:
+            warnings.append(f"{task_id}: commit {value} subject is {entry[1]!r}, task records {message!r}")
+    return errors, warnings
+
+
+def git_status() -> Tuple[List[str], List[str]]:
+    """(staged paths, paths with unstaged changes) from one `git status --porcelain=v2 -z`."""
+    import subprocess
+
+    try:
+        result = run(
+            ["git", "--no-optional-locks", "status", "--porcelain=v2", "-z", "--no-renames", "--untracked-files=no"],
+            check=True,
+        )
+    except subprocess.CalledProcessError as exc:
+        die(exc.stderr.strip() or "Failed to read git status")
+    staged: List[str] = []
+    unstaged: List[str] = []
+    for entry in (result.stdout or "").split("\0"):
+        kind = entry[:2]
+        if kind == "1 ":
+            fields = entry.split(" ", 8)
+        elif kind == "u ":
+            fields = entry.split(" ", 10)
+        else:
+            continue  # headers, ignored files, and "2 " entries which --no-renames rules out
+        if len(fields) < 3:
+            continue
+        xy, path = fields[1], fields[-1]
+        if xy[0] != "." or kind == "u ":
+            staged.append(path)
+        if xy[1] != "." or kind == "u ":
+            unstaged.append(path)
+    return staged, unstaged
+
+
+def git_staged_files() -> List[str]:
+    import subprocess
+
+    try:
+        result = run(["git", "diff", "--name-only", "--cached", "--no-renames", "-z"], check=True)
+    except subprocess.CalledProcessError as exc:
+        die(exc.stderr.strip() or "Failed to read staged files")
+    return [path for path in (result.stdout or "").split("\0") if path.strip()]
+
+
+def git_tracked_files() -> List[str]:
+    import subprocess
+
+    try:
+        result = run(["git", "ls-files", "-z"], check=True)
+    except subprocess.CalledProcessError as exc:
+        die(exc.stderr.strip() or "Failed to list tracked files")
+    return [path for path in (result.stdout or "").split("\0") if path]
+
+
+def suggest_allow_prefixes(paths: Iterable[str]) -> List[str]:
+    prefixes: List[str] = []
+    for raw in paths:
+        path = raw.strip().lstrip("./")
+        if not path:
+            continue
+        if "/" not in path:
+            prefixes.append(path)
+            continue
+        prefixes.append(path.rsplit("/", 1)[0])
+    return sorted(set(prefixes))
+
+
+def path_is_under(path: str, prefix: str) -> bool:
+    p = path.strip().lstrip("./")
+    root = prefix.strip().lstrip("./").rstrip("/")
+    if not root:
+        return False
+    return p == root or p.startswith(root + "/")
+
+
+class PrefixTrie:
+    """--allow style path prefixes, matched one path component at a time."""
+
+    def __init__(self, prefixes: Iterable[str] = ()) -> None:
+        self.root: Dict[Optional[str], Dict] = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str) -> None:
+        root = prefix.strip().lstrip("./").rstrip("/")
+        if not root:
+            return
+        node = self.root
+        for part in root.split("/"):
+            node = node.setdefault(part, {})
+        node[None] = {}  # a prefix ends here
+
+    def covers(self, path: str) -> bool:
+        node = self.root
+        for part in path.strip().lstrip("./").split("/"):
+            node = node.get(part)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
+
+def compact_allow_prefixes(staged: List[str], unstaged: Iterable[str], tracked: Iterable[str], limit: int) -> List[str]:
+    """At most `limit` prefixes covering every staged path and admitting the fewest tracked files."""
+    paths = sorted({path.strip().lstrip("./") for path in staged if path.strip().lstrip("./")})
+    staged_set = set(paths)
+    blocked: Set[str] = set()  # every prefix that would cover an unstaged-only path
+    for raw in unstaged:
+        path = raw.strip().lstrip("./")
+        if not path or path in staged_set:
+            continue
+        parts = path.split("/")
+        blocked.update("/".join(parts[: depth + 1]) for depth in range(len(parts)))
+
+    # Directory tree of the staged paths: node path -> child paths; "" is the repository root.
+    children: Dict[str, List[str]] = {"": []}
+    for path in paths:
+        parts = path.split("/")
+        for depth in range(len(parts)):
+            node = "/".join(parts[: depth + 1])
+            if node not in children:
+                children[node] = []
+                children["/".join(parts[:depth])].append(node)
+
+    # The smallest cover takes, for each staged path, its outermost prefix that is allowed.
+    needed: Set[str] = set()
+    for path in paths:
+        parts = path.split("/")
+        outer = ("/".join(parts[: depth + 1]) for depth in range(len(parts)))
+        needed.add(next((node for node in outer if node not in blocked), path))
+    if len(needed) > limit:
+        die(f"Staged files need at least {len(needed)} prefix(es) that do not also cover unstaged changes", code=2)
+    limit = min(limit, len(paths))
+
+    covered: Dict[str, int] = dict.fromkeys(children, 0)
+    for raw in tracked:
+        parts = raw.split("/")
+        for depth in range(len(parts)):
+            node = "/".join(parts[: depth + 1])
+            if node not in covered:
+                break
+            covered[node] += 1
+
+    # Per node, the Pareto frontier of covers built inside it: (prefixes used, files admitted, choice),
+    # fewer files for every extra prefix. A choice is a path, a list of paths or a pair of choices.
+    Frontier = List[Tuple[int, int, object]]
+
+    def pareto(points: Dict[int, Tuple[int, object]]) -> Frontier:
+        frontier: Frontier = []
+        for k in sorted(points):
+            cost, choice = points[k]
+            if not frontier or cost < frontier[-1][1]:
+                frontier.append((k, cost, choice))
+        return frontier
+
+    frontiers: Dict[str, Frontier] = {}
+    for node in sorted(children, key=lambda value: -(value.count("/") + 1) if value else 0):
+        leaves = [child for child in children[node] if not children[child]]
+        frontier: Frontier = [(0, 0, None)]
+        if leaves:
+            # Leaf paths allowed one by one: one prefix and one admitted file each.
+            frontier = [(len(leaves), len(leaves), leaves)] if len(leaves) <= limit else []
+        for child in children[node]:
+            if not children[child]:
+                continue
+            points: Dict[int, Tuple[int, object]] = {}
+            child_frontier = frontiers.pop(child)
+            for k, cost, choice in frontier:
+                for child_k, child_cost, child_choice in child_frontier:
+                    if k + child_k > limit:
+                        break
+                    best = points.get(k + child_k)
+                    if best is None or cost + child_cost < best[0]:
+                        points[k + child_k] = (cost + child_cost, (choice, child_choice))
+            frontier = pareto(points)
+        if node in staged_set:
+            frontier = []  # the node's own path is staged: only it (or an ancestor) covers it
+        if node and node not in blocked:
+            points = {k: (cost, choice) for k, cost, choice in frontier}
+            own = max(covered[node], 1)
+            if 1 not in points or own < points[1][0]:
+                points[1] = (own, node)
+            frontier = pareto(points)
+        frontiers[node] = frontier
+
+    result: List[str] = []
+    pending: List[object] = [frontiers[""][-1][2]]
+    while pending:
+        choice = pending.pop()
+        if isinstance(choice, str):
+            result.append(choice)
+        elif isinstance(choice, list):
+            result.extend(choice)
+        elif isinstance(choice, tuple):
+            pending.extend(choice)
+    return sorted(result)
+
+
+def guard_commit_check(
+    *,
+    task_id: str,
+    message: str,
+    allow: List[str],
+    allow_tasks: bool,
+    require_clean: bool,
+    quiet: bool,
+    status: Optional[Tuple[List[str], List[str]]] = None,
+) -> None:
+    if task_id not in message:
+        die(f"Commit message must include {task_id}", code=2)
+    if not commit_message_has_meaningful_summary(task_id, message):
+        die(
+            "Commit message is too generic; include a short summary (and constraints when relevant), "
+            'e.g. "✨ T-123 Add X (no network)"',
+            code=2,
+        )
+
+    if status is None:
+        # Unstaged changes only matter for --require-clean and the warning; skip the worktree scan otherwise.
+        status = git_status() if require_clean or not quiet else (git_staged_files(), [])
+    staged, unstaged = status
+    if not staged:
+        die("No staged files", code=2)
+
+    if not allow:
+        die("Provide at least one --allow <path> prefix", code=2)
+
+    if require_clean and unstaged:
+        for path in unstaged:
+            print(f"❌ unstaged: {path}", file=sys.stderr)
+        die("Working tree is dirty", code=2)
+    if unstaged and not quiet and not require_clean:
+        print(f"⚠️ working tree has {len(unstaged)} unstaged file(s); ignoring (multi-agent workspace)")
+
+    denied = set()
+    if not allow_tasks:
+        denied.update({"tasks.json"})
+
+    if allow_tasks and "tasks.json" in staged and read_journal():
+        die(
+            f"{JOURNAL_PATH.name} has pending records; run `python scripts/agentctl.py task compact` "
+            "before committing tasks.json",
+            code=2,
+        )
+
+    allowed = PrefixTrie(allow)
+    for path in staged:
+        if path in denied or (not allow_tasks and path_is_under(path, ARCHIVE_DIR.name)):
+            die(f"Staged file is forbidden by default: {path} (use --allow-tasks to override)", code=2)
+        if not allow_tasks and shards_enabled() and path_is_under(path, TASKS_SHARD_DIR.name):
+            die(f"Staged file is forbidden by default: {path} (use --allow-tasks to override)", code=2)
+        if not allowed.covers(path):
+            die(f"Staged file is outside allowlist: {path}", code=2)
+
+    if not quiet:
+        print("✅ guard passed")
+
+def load_agent_files() -> List[Tuple[str, Dict]]:
+    """(file name, parsed JSON) for .AGENTS/*.json; kept in memory by `serve` until a file changes."""
+    if not AGENTS_DIR.exists():
+        return []
+    paths = sorted(AGENTS_DIR.glob("*.json"))
+    stamps: List[Tuple[str, int, int]] = []
+    for path in paths:
+        stat = path.stat()
+        stamps.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return resident_memo("agents", tuple(stamps), lambda: [(path.name, load_json(path)) for path in paths])
+
+
+def cmd_agents(_: argparse.Namespace) -> None:
+    if not AGENTS_DIR.exists():
+        die(f"Missing directory: {AGENTS_DIR}")
+    agent_files = load_agent_files()
+    if not agent_files:
+        die(f"No agents found under {AGENTS_DIR}")
+
+    rows: List[Tuple[str, str, str]] = []
+    seen: Dict[str, str] = {}
+    duplicates: List[str] = []
+    for filename, data in agent_files:
+        agent_id = str(data.get("id") or "").strip()
+        role = str(data.get("role") or "").strip()
+        if not agent_id:
+            agent_id = "<missing-id>"
+        if agent_id in seen:
+            duplicates.append(agent_id)
+        else:
+            seen[agent_id] = filename
+        rows.append((agent_id, role or "-", filename))
+
+    width_id = max(len(r[0]) for r in rows + [("ID", "", "")])
+    width_file = max(len(r[2]) for r in rows + [("", "", "FILE")])
+    print(f"{'ID'.ljust(width_id)}  {'FILE'.ljust(width_file)}  ROLE")
+    print(f"{'-'*width_id}  {'-'*width_file}  {'-'*4}")
+    for agent_id, role, filename in rows:
+        print(f"{agent_id.ljust(width_id)}  {filename.ljust(width_file)}  {role}")
+
+    if duplicates:
+        die(f"Duplicate agent ids: {', '.join(sorted(set(duplicates)))}", code=2)
+
+
+def cmd_quickstart(_: argparse.Namespace) -> None:
+    if AGENTCTL_DOCS_PATH.exists():
+        print(AGENTCTL_DOCS_PATH.read_text(encoding="utf-8").rstrip())
+        return
+    print(
+        "\n".join(
+            [
+                "agentctl quickstart",
+                "",
+                "This repo uses python scripts/agentctl.py to manage tasks.json safely (no manual edits).",
+                "",
+                "Common commands:",
+                "  python scripts/agentctl.py task list",
+                "  python scripts/agentctl.py task show T-123",
+                "  python scripts/agentctl.py task lint",
+                "  python scripts/agentctl.py ready T-123",
+                "  python scripts/agentctl.py start T-123 --author CODER --body \"Start: ...\"",
+                "  python scripts/agentctl.py verify T-123",
+                "  python scripts/agentctl.py guard commit T-123 -m \"✨ T-123 ...\" --allow <path-prefix>",
+                "  python scripts/agentctl.py finish T-123 --commit <git-rev> --author REVIEWER --body \"Verified: ...\"",
+                "",
+                "Tip: create docs/agentctl.md to override this output.",
+            ]
+        )
+    )
+
+
+def load_agents_index() -> Set[str]:
+    ids: Set[str] = set()
+    with trace_span("load_agents_index") as span:
+        for _, data in load_agent_files():
+            agent_id = str(data.get("id") or "").strip().upper()
+            if agent_id:
+                ids.add(agent_id)
+        span.set(agents=len(ids))
+    return ids
+
+
+def lint_tasks_json(store: Optional[TaskStore] = None, *, verify_commits: bool = False) -> Dict[str, List[str]]:
+    """Schema/deps/checksum lint; verify_commits also checks DONE commits against git (verify_task_commits)."""
+    with trace_span("lint_tasks_json") as span:
+        result = _lint_tasks_json(store, verify_commits)
+        span.set(errors=len(result["errors"]), warnings=len(result["warnings"]))
+    return result
+
+
+def lint_task_fields(task_id: str, task: Dict, known_agents: Set[str]) -> Tuple[List[str], List[str]]:
+    """Checks that read only the task itself (and the agents index): lint caches them per content hash."""
+    errors: List[str] = []
+    warnings: List[str] = []
+    status = str(task.get("status") or "TODO").strip().upper()
+    if status not in ALLOWED_STATUSES:
+        errors.append(f"{task_id}: invalid status {status!r}")
+
+    title = task.get("title")
+    if not isinstance(title, str) or not title.strip():
+        errors.append(f"{task_id}: title must be a non-empty string")
+
+    description = task.get("description")
+    if description is not None and (not isinstance(description, str) or not description.strip()):
+        errors.append(f"{task_id}: description must be a non-empty string when present")
+
+    owner = task.get("owner")
+    if owner is not None and (not isinstance(owner, str) or not owner.strip()):
+        errors.append(f"{task_id}: owner must be a non-empty string when present")
+    owner_upper = str(owner or "").strip().upper()
+    if owner_upper and known_agents and owner_upper not in known_agents and owner_upper != "HUMAN":
+        warnings.append(f"{task_id}: owner {owner_upper!r} is not a known agent id")
+
+    tags = task.get("tags")
+    if tags is not None:
+        if not isinstance(tags, list) or any(not isinstance(tag, str) or not tag.strip() for tag in tags):
+            errors.append(f"{task_id}: tags must be a list of non-empty strings")
+
+    comments = task.get("comments")
+    if comments is not None:
+        if not isinstance(comments, list):
+            errors.append(f"{task_id}: comments must be a list")
+        else:
+            for idx, comment in enumerate(comments):
+                if not isinstance(comment, dict):
+                    errors.append(f"{task_id}: comments[{idx}] must be an object")
+                    continue
+                author = comment.get("author")
+                body = comment.get("body")
+                if not isinstance(author, str) or not author.strip():
+                    errors.append(f"{task_id}: comments[{idx}].author must be a non-empty string")
+                if not isinstance(body, str) or not body.strip():
+                    errors.append(f"{task_id}: comments[{idx}].body must be a non-empty string")
+
+    verify = task.get("verify")
+    if verify is not None:
+        if not isinstance(verify, list) or any(not isinstance(cmd, str) or not cmd.strip() for cmd in verify):
+            errors.append(f"{task_id}: verify must be a list of non-empty strings")
+
+    if status == "DONE":
+        commit = task.get("commit")
+        if not isinstance(commit, dict):
+            errors.append(f"{task_id}: DONE tasks must include commit metadata")
+        else:
+            chash = str(commit.get("hash") or "").strip()
+            msg = str(commit.get("message") or "").strip()
+            if len(chash) < 7:
+                errors.append(f"{task_id}: commit.hash must be a git hash")
+            if not msg:
+                errors.append(f"{task_id}: commit.message must be non-empty")
+    return errors, warnings
+
+
+def lint_meta_header(meta: Dict) -> List[str]:
+    errors: List[str] = []
+    if str(meta.get("managed_by") or "") != TASKS_META_MANAGED_BY:
+        errors.append("tasks.json meta.managed_by must be 'agentctl'")
+    if not str(meta.get("checksum") or ""):
+        errors.append("tasks.json meta.checksum is missing/empty")
+    return errors
+
+
+def unsatisfied_dependency_errors(ids: List[str], statuses: List[object], unsatisfied: Iterable[int]) -> List[str]:
+    errors: List[str] = []
+    for position in unsatisfied:
+        status = str(statuses[position] or "TODO").strip().upper()
+        if status in {"DOING", "DONE"}:
+            errors.append(f"{ids[position]}: status {status} but dependencies are not satisfied")
+    return errors
+
+
+def archive_index_key() -> Optional[Tuple[int, int]]:
+    try:
+        stat = ARCHIVE_INDEX_PATH.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def read_lint_cache() -> Optional[Dict]:
+    """Last lint's view of the backlog (.agentctl/lint.cache), the base incremental lint diffs against."""
+    if not cache_enabled():
+        return None
+    try:
+        with trace_span("read", path=LINT_CACHE_PATH.name) as span, LINT_CACHE_PATH.open("rb") as handle:
+            if marshal.load(handle) != (LINT_CACHE_VERSION, str(TASKS_PATH)):
+                return None
+            with gc_paused():
+                state = marshal.loads(handle.read())
+            span.set(bytes=handle.tell())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def store_lint_cache(state: Dict) -> None:
+    if not cache_enabled():
+        return
+    tmp_path = LINT_CACHE_PATH.with_name(f"{LINT_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        data = marshal.dumps(state)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with trace_span("write", path=LINT_CACHE_PATH.name, bytes=len(data)):
+            with tmp_path.open("wb") as handle:
+                marshal.dump((LINT_CACHE_VERSION, str(TASKS_PATH)), handle)
+                handle.write(data)
+            os.replace(tmp_path, LINT_CACHE_PATH)
+    except (OSError, ValueError):
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _lint_incremental() -> Optional[Dict[str, List[str]]]:
+    """Lint against .agentctl/lint.cache, re-validating only changed tasks (None when the full lint must run)."""
+    if shards_enabled() or journal_size():
+        return None
+    signature = tasks_signature()
+    meta = load_verified_meta(signature)
+    if not meta or signature is None or meta.get("checksum_algo") != TASKS_CHECKSUM_ALGO:
+        return None
+    hashes = meta.get("task_hashes")
+    cached = read_lint_cache()
+    known_agents = load_agents_index()
+    if not isinstance(hashes, list) or cached is None or cached.get("agents") != sorted(known_agents):
+        return None
+
+    # Hashes are compared as one string (64 hex digits per task), a block of 1024 tasks at a time.
+    joined = "".join(hashes)
+    base: str = cached["hashes"]
+    if len(joined) != 64 * len(hashes):
+        return None
+    ids: List[str] = cached["ids"]
+    statuses: List[object] = cached["statuses"]
+    deps: List[List[str]] = cached["deps"]
+    structural = len(joined) != len(base) or cached.get("archive") != archive_index_key()
+    if not structural:
+        changed = []
+        for start in range(0, len(joined), 64 * 1024):
+            if joined[start : start + 64 * 1024] != base[start : start + 64 * 1024]:
+                first = start // 64
+                changed.extend(
+                    position
+                    for position in range(first, min(first + 1024, len(hashes)))
+                    if hashes[position] != base[64 * position : 64 * position + 64]
+                )
+    else:
+        origin = {base[offset : offset + 64]: offset // 64 for offset in range(0, len(base), 64)}
+        sources = [origin.get(task_hash) for task_hash in hashes]
+        changed = [position for position, source in enumerate(sources) if source is None]
+        ids = [ids[source] if source is not None else "" for source in sources]
+        statuses = [statuses[source] if source is not None else None for source in sources]
+        deps = [deps[source] if source is not None else [] for source in sources]
+    if len(changed) > len(hashes) // 2:
+        return None
+    loaded = load_cached_tasks(signature, changed) if changed else {}
+    if loaded is None:
+        return None
+
+    messages: Dict[str, Tuple[List[str], List[str]]] = cached["messages"]
+    status_changed: Set[str] = set()
+    with trace_span("lint changed tasks", tasks=len(loaded)):
+        for position, task in loaded.items():
+            if not isinstance(task, dict) or not isinstance(task.get("id") or "", str):
+                return None
+            task_id = (task.get("id") or "").strip()
+            depends_on, dep_errors = normalize_depends_on(task.get("depends_on"))
+            if dep_errors:
+                return None
+            if ids[position] != task_id or deps[position] != depends_on:
+                structural = True
+            else:
+                # ids are unique, so no other task had the old content
+                messages.pop(base[64 * position : 64 * position + 64], None)
+                if statuses[position] != task.get("status"):
+                    status_changed.add(task_id)
+            ids[position] = task_id
+            statuses[position] = task.get("status")
+            deps[position] = depends_on
+            task_errors, task_warnings = lint_task_fields(task_id, task, known_agents)
+            if task_errors or task_warnings:
+                messages[hashes[position]] = (task_errors, task_warnings)
+    if structural and (not all(ids) or len(set(ids)) != len(ids)):
+        return None
+
+    errors = lint_meta_header(meta)
+    if meta.get("checksum") and meta.get("checksum") != compute_root_checksum(hashes):
+        errors.append("tasks.json meta.checksum does not match the recorded task hashes (manual edit?)")
+    if structural:
+        tasks_by_id = {
+            task_id: {"status": status, "depends_on": depends_on} for task_id, status, depends_on in zip(ids, statuses, deps)
+        }
+        with trace_span("compute_dependency_state", tasks=len(tasks_by_id)):
+            dep_state, dep_warnings = compute_dependency_state(tasks_by_id)
+        unsatisfied = [
+            position
+            for position, task_id in enumerate(ids)
+            if dep_state[task_id]["missing"] or dep_state[task_id]["incomplete"]
+        ]
+    else:
+        dep_warnings = cached["dep_warnings"]
+        unsatisfied = cached["unsatisfied"]
+        touched = set(loaded)
+        if status_changed:
+            touched.update(position for position, depends_on in enumerate(deps) if not status_changed.isdisjoint(depends_on))
+        if touched:
+            status_by_id = dict(zip(ids, statuses))
+            archived = archived_task_ids()
+            flagged = set(unsatisfied)
+            for position in touched:
+                if any(
+                    status_by_id.get(dep_id, "DONE" if dep_id in archived else None) != "DONE" for dep_id in deps[position]
+                ):
+                    flagged.add(position)
+                else:
+                    flagged.discard(position)
+            unsatisfied = sorted(flagged)
+    errors.extend(dep_warnings)
+    with trace_span("lint_archive"):
+        errors.extend(lint_archive(ids))
+
+    if structural:
+        live = set(hashes)
+        messages = {task_hash: entry for task_hash, entry in messages.items() if task_hash in live}
+    warnings: List[str] = []
+    for task_errors, task_warnings in messages.values():
+        errors.extend(task_errors)
+        warnings.extend(task_warnings)
+    errors.extend(unsatisfied_dependency_errors(ids, statuses, unsatisfied))
+
+    if structural or len(changed) >= LINT_CACHE_REWRITE_AFTER:
+        state = dict(cached, hashes=joined, ids=ids, statuses=statuses, deps=deps, messages=messages)
+        state.update(dep_warnings=dep_warnings, unsatisfied=unsatisfied, archive=archive_index_key())
+        store_lint_cache(state)
+    return {"errors": sorted(set(errors)), "warnings": sorted(set(warnings))}
+
+
+def _lint_tasks_json(store: Optional[TaskStore], verify_commits: bool) -> Dict[str, List[str]]:
+    errors: List[str] = []
+    warnings: List[str] = []
+
+    if store is None:
+        if not verify_commits:
+            result = _lint_incremental()
+            if result is not None:
+                return result
+        signature = tasks_signature()
+        skipped: List[str] = []
+        shard_hashes: List[str] = []
+        data = load_tasks_document(signature, skipped=skipped, hashes=shard_hashes)
+        if not isinstance(data.get("tasks"), list):
+            return {"errors": ["tasks.json must contain a top-level 'tasks' list"], "warnings": []}
+        if signature is not None and tasks_signature() != signature:
+            signature = None
+        store = TaskStore.from_snapshot(data, signature, shard_hashes)
+        store.skipped_shards = skipped
+        store.replay_journal()
+    data = store.data
+    tasks = store.tasks
+    errors.extend(store.skipped_shards)
+
+    meta = data.get(TASKS_META_KEY)
+    if not isinstance(meta, dict):
+        errors.append("tasks.json is missing a top-level 'meta' object (manual edits are not allowed)")
+    else:
+        errors.extend(lint_meta_header(meta))
+        checksum = str(meta.get("checksum") or "")
+        algo = str(meta.get("checksum_algo") or "")
+        if not checksum:
+            pass
+        elif algo == LEGACY_TASKS_CHECKSUM_ALGO:
+            if checksum != compute_tasks_checksum(tasks):
+                errors.append("tasks.json meta.checksum does not match tasks payload (manual edit?)")
+        elif algo != TASKS_CHECKSUM_ALGO:
+            errors.append(f"tasks.json meta.checksum_algo must be {TASKS_CHECKSUM_ALGO!r}")
+        else:
+            hashes = store.snapshot_hashes
+            if hashes is None:
+                # Neither recorded hashes for this checksum nor tasks that hash to it.
+                errors.append("tasks.json meta.checksum does not match its tasks (manual edit?)")
+            elif checksum != compute_root_checksum(hashes):
+                errors.append("tasks.json meta.checksum does not match the recorded task hashes (manual edit?)")
+            elif not store.verified:
+                with trace_span("verify task_hashes", tasks=len(hashes)):
+                    stale = [
+                        index
+                        for index, task in enumerate(tasks[: len(hashes)])
+                        if id(task) not in store.journal_hashes and compute_task_hash(task) != hashes[index]
+                    ]
+                for index in stale:
+                    task = tasks[index]
+                    label = str(task.get("id") or "").strip() if isinstance(task, dict) else ""
+                    errors.append(f"{label or f'tasks[{index}]'}: content does not match its recorded hash (manual edit?)")
+                if not stale and not store.skipped_shards:
+                    store.verified = True
+                    if store.signature is not None:
+                        record_verified_signature(store.signature, None if shards_enabled() else dict(meta, task_hashes=hashes))
+
+    if store.journal_stale:
+        errors.append(
+            f"{JOURNAL_PATH.name}: {store.journal_stale} record(s) were written against another tasks.json "
+            "snapshot and are ignored (run `python scripts/agentctl.py task compact` to drop them)"
+        )
+    for task in tasks:
+        recorded = store.journal_hashes.get(id(task))
+        if recorded is not None and compute_task_hash(task) != recorded:
+            task_id = str(task.get("id") or "").strip() or "<no-id>"
+            errors.append(f"{task_id}: content does not match {JOURNAL_PATH.name} (manual edit?)")
+
+    tasks_by_id, index_warnings = store.index()
+    for warning in index_warnings:
+        errors.append(warning)
+
+    dep_state, dep_warnings = store.dependency_state()
+    for warning in dep_warnings:
+        errors.append(warning)
+
+    with trace_span("lint_archive"):
+        errors.extend(lint_archive(tasks_by_id))
+
+    # Per-task results are reused by content hash when the hashes are trustworthy: verified
+    # against the snapshot, no journal replayed over it, one task per id.
+    known_agents = load_agents_index()
+    agents = sorted(known_agents)
+    cacheable = store.verified and not store.journal_records and not index_warnings
+    hashes = store.task_hashes() if cacheable else []
+    cached = read_lint_cache() if cacheable else None
+    if cached is None or cached.get("agents") != agents:
+        cached = {"hashes": "", "messages": {}}
+    validated = {cached["hashes"][offset : offset + 64] for offset in range(0, len(cached["hashes"]), 64)}
+    messages: Dict[str, Tuple[List[str], List[str]]] = {}
+    unsatisfied: List[int] = []
+    for position, (task_id, task) in enumerate(tasks_by_id.items()):
+        task_hash = hashes[position] if cacheable else ""
+        if task_hash in validated:
+            entry = cached["messages"].get(task_hash)
+        else:
+            entry = lint_task_fields(task_id, task, known_agents)
+        if entry is not None and (entry[0] or entry[1]):
+            errors.extend(entry[0])
+            warnings.extend(entry[1])
+            messages[task_hash] = entry
+
+        dep_info = dep_state.get(task_id) or {}
+        if dep_info.get("missing") or dep_info.get("incomplete"):
+            unsatisfied.append(position)
+
+    ids = list(tasks_by_id)
+    statuses = [task.get("status") for task in tasks_by_id.values()]
+    errors.extend(unsatisfied_dependency_errors(ids, statuses, unsatisfied))
+    well_formed = cacheable and all(
+        raw is None or (isinstance(raw, list) and all(isinstance(dep_id, str) for dep_id in raw))
+        for raw in (task.get("depends_on") for task in tasks_by_id.values())
+    )
+    joined = "".join(hashes)
+    if well_formed and (joined != cached["hashes"] or cached.get("archive") != archive_index_key()):
+        state = {"agents": agents, "archive": archive_index_key(), "hashes": joined, "ids": ids, "statuses": statuses}
+        state.update(deps=[dep_state[task_id]["depends_on"] for task_id in ids], messages=messages)
+        state.update(dep_warnings=dep_warnings, unsatisfied=unsatisfied)
+        store_lint_cache(state)
+
+    if verify_commits:
+        with trace_span("verify_task_commits"):
+            commit_errors, commit_warnings = verify_task_commits(tasks_by_id)
+        errors.extend(commit_errors)
+        warnings.extend(commit_warnings)
+
+    return {"errors": sorted(set(errors)), "warnings": sorted(set(warnings))}
+
+
+def cmd_task_lint(args: argparse.Namespace) -> None:
+    result = lint_tasks_json(verify_commits=args.verify_commits)
+    if not args.quiet:
+        for message in result["warnings"]:
+            print(f"⚠️ {message}")
+    if result["errors"]:
+        for message in result["errors"]:
+            print(f"❌ {message}", file=sys.stderr)
+        raise SystemExit(2)
+    print("✅ tasks.json OK")
+
+
+def cmd_ready(args: argparse.Namespace) -> None:
+    ok, warnings = readiness(args.task_id)
+    for warning in warnings:
+        print(f"⚠️ {warning}")
+    print("✅ ready" if ok else "⛔ not ready")
+    raise SystemExit(0 if ok else 2)
+
+
+def cmd_guard_clean(args: argparse.Namespace) -> None:
+    staged = git_staged_files()
+    if staged:
+        for path in staged:
+            print(f"❌ staged: {path}", file=sys.stderr)
+        raise SystemExit(2)
+    if not args.quiet:
+        print("✅ index clean (no staged files)")
+
+
+def cmd_guard_suggest_allow(args: argparse.Namespace) -> None:
+    if args.max_prefixes is None:
+        staged = git_staged_files()
+        unstaged: List[str] = []
+    else:
+        if args.max_prefixes < 1:
+            die("--max-prefixes must be at least 1", code=2)
+        staged, unstaged = git_status()
+    if not staged:
+        die("No staged files", code=2)
+    if args.max_prefixes is None:
+        prefixes = suggest_allow_prefixes(staged)
+    else:
+        prefixes = compact_allow_prefixes(staged, unstaged, git_tracked_files(), args.max_prefixes)
+    if args.format == "args":
+        print(" ".join(f"--allow {p}" for p in prefixes))
+        return
+    for prefix in prefixes:
+        print(prefix)
+
+
+def cmd_guard_commit(args: argparse.Namespace) -> None:
+    guard_commit_check(
+        task_id=args.task_id.strip(),
+        message=args.message,
+        allow=list(args.allow or []),
+        allow_tasks=bool(args.allow_tasks),
+        require_clean=bool(args.require_clean),
+        quiet=bool(args.quiet),
+    )
+
+
+def cmd_commit(args: argparse.Namespace) -> None:
+    import subprocess
+
+    task_id = args.task_id.strip()
+    message = args.message
+    allow = list(args.allow or [])
+    status = git_status() if args.require_clean or not args.quiet else (git_staged_files(), [])
+    if args.auto_allow:
+        allow = suggest_allow_prefixes(status[0])
+        if not allow:
+            die("No staged files", code=2)
+
+    guard_commit_check(
+        task_id=task_id,
+        message=message,
+        allow=allow,
+        allow_tasks=bool(args.allow_tasks),
+        require_clean=bool(args.require_clean),
+        quiet=bool(args.quiet),
+        status=status,
+    )
+
+    try:
+        with trace_span("subprocess", cmd="git commit"):
+            subprocess.run(
+                ["git", "commit", "-m", message],
+                cwd=str(ROOT),
+                text=True,
+                check=True,
+            )
+    except subprocess.CalledProcessError as exc:
+        die(exc.stderr.strip() or "git commit failed")
+    commit_info = get_commit_info("HEAD")
+    if not args.quiet:
+        print(f"✅ committed {commit_info['hash'][:12]} {commit_info['message']}")
+
+
+def apply_start(store: TaskStore, args: argparse.Namespace) -> None:
+    if not args.author or not args.body:
+        die("--author and --body are required", code=2)
+    if not args.force:
+        require_structured_comment(args.body, prefix="Start:", min_chars=40)
+    if not args.force:
+        ok, warnings = readiness(args.task_id, store)
+        if not ok:
+            for warning in warnings:
+                print(f"⚠️ {warning}")
+            die(f"Task is not ready: {args.task_id} (use --force to override)", code=2)
+
+    target = store.get(args.task_id)
+    current = str(target.get("status") or "").strip().upper() or "TODO"
+    if not is_transition_allowed(current, "DOING") and not args.force:
+        die(f"Refusing status transition {current} -> DOING (use --force to override)", code=2)
+
+    store.set_fields(args.task_id, {"status": "DOING"})
+    store.comment(args.task_id, args.author, args.body)
+
+
+def cmd_start(args: argparse.Namespace) -> None:
+    store = TaskStore.load()
+    apply_start(store, args)
+    store.save()
+    if not args.quiet:
+        print(f"✅ {args.task_id} is DOING")
+
+
+def apply_block(store: TaskStore, args: argparse.Namespace) -> None:
+    if not args.author or not args.body:
+        die("--author and --body are required", code=2)
+    if not args.force:
+        require_structured_comment(args.body, prefix="Blocked:", min_chars=40)
+    target = store.get(args.task_id)
+    current = str(target.get("status") or "").strip().upper() or "TODO"
+    if not is_transition_allowed(current, "BLOCKED") and not args.force:
+        die(f"Refusing status transition {current} -> BLOCKED (use --force to override)", code=2)
+    store.set_fields(args.task_id, {"status": "BLOCKED"})
+    store.comment(args.task_id, args.author, args.body)
+
+
+def cmd_block(args: argparse.Namespace) -> None:
+    store = TaskStore.load()
+    apply_block(store, args)
+    store.save()
+    if not args.quiet:
+        print(f"✅ {args.task_id} is BLOCKED")
+
+
+def apply_task_comment(store: TaskStore, args: argparse.Namespace) -> None:
+    store.comment(args.task_id, args.author, args.body)
+
+
+def cmd_task_comment(args: argparse.Namespace) -> None:
+    store = TaskStore.load()
+    apply_task_comment(store, args)
+    store.save()
+
+
+def apply_task_add(store: TaskStore, args: argparse.Namespace) -> None:
+    task_id = args.task_id.strip()
+    tasks_by_id, _ = store.index()
+    if task_id in tasks_by_id:
+        die(f"Task already exists: {task_id}")
+    if task_id in archived_task_ids():
+        die(f"Task already exists (archived): {task_id}")
+    status = (args.status or "TODO").strip().upper()
+    if status not in ALLOWED_STATUSES:
+        die(f"Invalid status: {status}")
+    task: Dict = {
+        "id": task_id,
+        "title": args.title,
+        "description": args.description,
+        "status": status,
+        "priority": args.priority,
+        "owner": args.owner,
+        "tags": list(dict.fromkeys((args.tag or []))),
+    }
+    if args.depends_on:
+        task["depends_on"] = list(dict.fromkeys(args.depends_on))
+    if args.verify:
+        task["verify"] = list(dict.fromkeys(args.verify))
+    if args.comment_author and args.comment_body:
+        task["comments"] = [{"author": args.comment_author, "body": args.comment_body}]
+    store.add(task)
+
+
+def cmd_task_add(args: argparse.Namespace) -> None:
+    store = TaskStore.load()
+    apply_task_add(store, args)
+    store.save()
+
+
+def apply_task_update(store: TaskStore, args: argparse.Namespace) -> None:
+    task = store.get(args.task_id)
+    fields: Dict = {}
+
+    if args.title is not None:
+        fields["title"] = args.title
+    if args.description is not None:
+        fields["description"] = args.description
+    if args.priority is not None:
+        fields["priority"] = args.priority
+    if args.owner is not None:
+        fields["owner"] = args.owner
+
+    if args.replace_tags:
+        fields["tags"] = []
+    if args.tag:
+        existing = [tag for tag in fields.get("tags", task.get("tags") or []) if isinstance(tag, str)]
+        merged = existing + args.tag
+        fields["tags"] = list(dict.fromkeys(tag.strip() for tag in merged if tag.strip()))
+
+    if args.replace_depends_on:
+        fields["depends_on"] = []
+    if args.depends_on:
+        existing = [dep for dep in fields.get("depends_on", task.get("depends_on") or []) if isinstance(dep, str)]
+        merged = existing + args.depends_on
+        fields["depends_on"] = list(dict.fromkeys(dep.strip() for dep in merged if dep.strip()))
+
+    if args.replace_verify:
+        fields["verify"] = []
+    if args.verify:
+        existing = [cmd for cmd in fields.get("verify", task.get("verify") or []) if isinstance(cmd, str)]
+        merged = existing + args.verify
+        fields["verify"] = list(dict.fromkeys(cmd.strip() for cmd in merged if cmd.strip()))
+
+    store.set_fields(args.task_id, fields)
+
+
+def cmd_task_update(args: argparse.Namespace) -> None:
+    store = TaskStore.load()
+    apply_task_update(store, args)
+    store.save()
+
+
+def cmd_task_compact(args: argparse.Namespace) -> None:
+    store = TaskStore.load()
+    tampered = [
+        str(task.get("id") or "").strip()
+        for task in store.tasks
+        if id(task) in store.journal_hashes and compute_task_hash(task) != store.journal_hashes[id(task)]
+    ]
+    if tampered and not args.force:
+        die(
+            f"{JOURNAL_PATH.name} does not match recorded hashes for: {', '.join(tampered)} "
+            "(manual edit? use --force to fold it anyway)",
+            code=2,
+        )
+    folded = store.journal_records
+    store.save(compact=True)
+    if not args.quiet:
+        print(f"✅ compacted {folded} journal record(s) into tasks.json")
+
+
+def cmd_task_shard(args: argparse.Namespace) -> None:
+    import shutil
+
+    if shards_enabled():
+        die(f"{TASKS_SHARD_DIR.name}/ already exists; the sharded layout is already enabled")
+    if TASKS_SHARD_DIR.exists():
+        die(f"{TASKS_SHARD_DIR.name}/ already exists and is not an agentctl shard directory; move it aside first")
+    with tasks_lock():
+        store = TaskStore.load()
+        errors = lint_tasks_json(store)["errors"]
+        if errors:
+            for message in errors:
+                print(f"❌ {message}", file=sys.stderr)
+            die("Fix tasks.json lint errors before sharding it", code=2)
+        hashes = store.task_hashes()
+        tmp_dir = TASKS_SHARD_DIR.with_name(f".{TASKS_SHARD_DIR.name}.{os.getpid()}.tmp")
+        tmp_dir.mkdir()
+        try:
+            for task, task_hash in zip(store.tasks, hashes):
+                write_task_shard(task, task_hash, directory=tmp_dir)
+            marker = {"managed_by": TASKS_META_MANAGED_BY, "layout": "shards", "checksum_algo": SHARD_CHECKSUM_ALGO}
+            write_json(tmp_dir / TASKS_SHARD_MARKER.name, marker)
+            os.replace(tmp_dir, TASKS_SHARD_DIR)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        # Fold any journal records into the rendered view; the journal is unused from now on.
+        write_tasks_json(store.data, task_hashes=hashes)
+        clear_journal()
+    if not args.quiet:
+        print(f"✅ wrote {len(store.tasks)} shard(s) to {TASKS_SHARD_DIR.name}/ (tasks.json is now rendered)")
+
+
+def commit_times(hashes: Iterable[str]) -> Dict[str, int]:
+    """Committer timestamps keyed by the (possibly abbreviated) hashes given; unknown commits are left out."""
+    wanted = sorted({value.strip().lower() for value in hashes if re.fullmatch(r"[0-9a-fA-F]{7,64}", value.strip())})
+    if not wanted:
+        return {}
+    result = run(
+        ["git", "log", "--no-walk=unsorted", "--ignore-missing", "--stdin", "--format=%H %ct"],
+        check=False,
+        input="\n".join(wanted) + "\n",
+    )
+    by_full: Dict[str, int] = {}
+    for line in (result.stdout or "").splitlines():
+        full, _, stamp = line.partition(" ")
+        if stamp.isdigit():
+            by_full[full] = int(stamp)
+    times: Dict[str, int] = {}
+    for value in wanted:
+        stamp = by_full.get(value)
+        if stamp is None:
+            stamp = next((when for full, when in by_full.items() if full.startswith(value)), None)
+        if stamp is not None:
+            times[value] = stamp
+    return times
+
+
+def cmd_task_archive(args: argparse.Namespace) -> None:
+    if not args.before and args.done_older_than is None:
+        die("Pass --before TASK_ID and/or --done-older-than DAYS", code=2)
+    with tasks_lock():
+        _archive_tasks(args)
+
+
+def _archive_tasks(args: argparse.Namespace) -> None:
+    store = TaskStore.load()
+    selected = [task for task in store.tasks if task.get("status") == "DONE"]
+    if args.before:
+        limit = task_sort_key(args.before.strip())
+        selected = [task for task in selected if task_sort_key(str(task.get("id") or "").strip()) < limit]
+    if args.done_older_than is not None:
+        cutoff = time.time() - args.done_older_than * 86400
+        hashes = {id(task): str((task.get("commit") or {}).get("hash") or "").strip().lower() for task in selected}
+        times = commit_times(hashes.values())
+        selected = [task for task in selected if times.get(hashes[id(task)], cutoff) < cutoff]
+    if not selected:
+        if not args.quiet:
+            print("✅ nothing to archive")
+        return
+    if args.dry_run:
+        for task in selected:
+            print(format_task_line(task))
+        return
+
+    index = load_archive_index()
+    previous = ARCHIVE_INDEX_PATH.read_bytes() if ARCHIVE_INDEX_PATH.exists() else None
+    entry = write_archive_segment(selected)
+    index_written = False
+    try:
+        number = len(index["segments"])
+        ids = dict(index["ids"])
+        ids.update((str(task.get("id") or "").strip(), number) for task in selected)
+        write_json(ARCHIVE_INDEX_PATH, {"segments": [*index["segments"], entry], "ids": ids})
+        index_written = True
+        archived = {id(task) for task in selected}
+        store.replace_tasks([task for task in store.tasks if id(task) not in archived])
+        store.save()
+    except BaseException:
+        # tasks.json was not rewritten: drop the new segment so the tasks are not in both places.
+        if index_written:
+            if previous is None:
+                ARCHIVE_INDEX_PATH.unlink()
+            else:
+                ARCHIVE_INDEX_PATH.write_bytes(previous)
+        (ARCHIVE_DIR / entry["file"]).unlink()
+        raise
+    if not args.quiet:
+        print(f"✅ archived {len(selected)} DONE task(s) into {ARCHIVE_DIR.name}/{entry['file']}")
+
+
+def cmd_task_export(args: argparse.Namespace) -> None:
+    with closing(open_task_db()) as conn:
+        text = export_task_db(conn)
+    if args.output == "-":
+        sys.stdout.write(text)
+        return
+    path = Path(args.output)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def cmd_task_render(args: argparse.Namespace) -> None:
+    if not shards_enabled():
+        die(f"{TASKS_PATH.name} is the source of truth; run `python scripts/agentctl.py task shard` first")
+    with tasks_lock():
+        store = TaskStore.load()
+        result = lint_tasks_json(store)
+        if result["errors"]:
+            for message in result["errors"]:
+                print(f"❌ {message}", file=sys.stderr)
+            if not args.force:
+                die("Refusing to render tasks.json from shards with lint errors (use --force)", code=2)
+        write_tasks_json(store.data, task_hashes=store.task_hashes(), verified=store.verified)
+    if not args.quiet:
+        print(f"✅ rendered {len(store.tasks)} task(s) into {TASKS_PATH.name}")
+
+
+def _scrub_value(value: object, find_text: str, replace_text: str) -> object:
+    if isinstance(value, str):
+        return value.replace(find_text, replace_text)
+    if isinstance(value, list):
+        return [_scrub_value(item, find_text, replace_text) for item in value]
+    if isinstance(value, dict):
+        return {key: _scrub_value(val, find_text, replace_text) for key, val in value.items()}
+    return value
+
+
+def cmd_task_scrub(args: argparse.Namespace) -> None:
+    find_text = args.find
+    replace_text = args.replace
+    if not find_text:
+        die("--find must be non-empty", code=2)
+
+    store = TaskStore.load()
+
+    updated_tasks: List[Dict] = []
+    changed_task_ids: List[str] = []
+    for task in store.tasks:
+        if not isinstance(task, dict):
+            updated_tasks.append(task)
+            continue
+        before = json.dumps(task, ensure_ascii=False, sort_keys=True)
+        after_obj = _scrub_value(task, find_text, replace_text)
+        if not isinstance(after_obj, dict):
+            updated_tasks.append(task)
+            continue
+        after = json.dumps(after_obj, ensure_ascii=False, sort_keys=True)
+        updated_tasks.append(after_obj)
+        if before != after:
+            changed_task_ids.append(str(after_obj.get("id") or "<no-id>"))
+
+    if args.dry_run:
+        if not args.quiet:
+            print(f"Would update {len(set(changed_task_ids))} task(s).")
+        if changed_task_ids and not args.quiet:
+            for task_id in sorted(set(changed_task_ids)):
+                print(task_id)
+        return
+
+    store.replace_tasks(updated_tasks)
+    store.save()
+    if not args.quiet:
+        print(f"Updated {len(set(changed_task_ids))} task(s).")
+
+
+class VerifyResult:
+    """Outcome of one verify command (output is only captured for parallel runs)."""
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.returncode: Optional[int] = None
+        self.output = ""
+        self.seconds = 0.0
+        self.cancelled = False
+
+
+def _kill_verify_process(proc: subprocess.Popen) -> bool:
+    """Terminate a still-running verify command (and its process group); False if it already exited."""
+    import signal
+
+    if proc.poll() is not None:
+        return False
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGTERM)
+        else:  # pragma: no cover - non-POSIX
+            proc.terminate()
+    except OSError:
+        return False
+    return True
+
+
+def _terminated_by_fail_fast(returncode: int) -> bool:
+    """Whether a signalled verify command's exit status is the SIGTERM we sent (directly or via its shell)."""
+    import signal
+
+    if not hasattr(os, "killpg"):  # pragma: no cover - non-POSIX: terminate() leaves no distinct status
+        return returncode != 0
+    return returncode in (-signal.SIGTERM, 128 + signal.SIGTERM)
+
+
+def _run_verify_captured(
+    result: VerifyResult,
+    cancel: threading.Event,
+    running: Dict[int, subprocess.Popen],
+    killed: Set[int],
+    lock: threading.Lock,
+    fail_fast: bool,
+) -> VerifyResult:
+    import subprocess
+
+    with lock:
+        if cancel.is_set():
+            result.cancelled = True
+            return result
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            result.command,
+            cwd=str(ROOT),
+            shell=True,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=hasattr(os, "killpg"),
+        )
+        running[proc.pid] = proc
+    with trace_span("verify", command=result.command) as span:
+        output, _ = proc.communicate()
+        span.set(returncode=proc.returncode, output_bytes=len(output or ""))
+    result.seconds = time.perf_counter() - started
+    result.output = output or ""
+    result.returncode = proc.returncode
+    with lock:
+        running.pop(proc.pid, None)
+        if proc.pid in killed and _terminated_by_fail_fast(proc.returncode):
+            result.cancelled = True
+        elif proc.returncode != 0 and fail_fast and not cancel.is_set():
+            cancel.set()
+            for pid, other in running.items():
+                if _kill_verify_process(other):
+                    killed.add(pid)
+    return result
+
+
+def _report_verify_result(result: VerifyResult, *, quiet: bool) -> None:
+    if result.returncode is None and result.cancelled:
+        if not quiet:
+            print(f"⏭️ skipped (fail-fast): {result.command}")
+        return
+    if not quiet:
+        print(f"$ {result.command}")
+    if result.output:
+        sys.stdout.write(result.output if result.output.endswith("\n") else result.output + "\n")
+    if result.cancelled:
+        if not quiet:
+            print(f"⏹️ cancelled after {result.seconds:.2f}s (fail-fast)")
+    elif result.returncode != 0:
+        print(f"❌ exit {result.returncode} after {result.seconds:.2f}s: {result.command}", file=sys.stderr)
+    elif not quiet:
+        print(f"✅ {result.seconds:.2f}s")
+    sys.stdout.flush()
+
+
+def verify_cache_context() -> Optional[str]:
+    """Hash of (index entries, untracked files, relevant env) for verify result caching."""
+    import hashlib
+    import subprocess
+
+    if not cache_enabled():
+        return None
+    # tasks.json (and its shards) are rewritten by start/comment between verify and finish.
+    excludes = [f":(exclude){TASKS_PATH.name}", f":(exclude){TASKS_SHARD_DIR.name}"]
+    try:
+        staged = run(["git", "ls-files", "--stage", "-z", "--", ".", *excludes], check=True).stdout
+        untracked = run(["git", "ls-files", "--others", "--exclude-standard", "-z", "--", ".", *excludes], check=True).stdout
+    except subprocess.CalledProcessError:
+        return None
+    if run(["git", "diff", "--quiet", "--", ".", *excludes], check=False).returncode != 0:
+        return None
+    digest = hashlib.sha256(staged.encode("utf-8", "surrogateescape"))
+    for name in sorted(filter(None, untracked.split("\0"))):
+        digest.update(b"\0" + name.encode("utf-8", "surrogateescape") + b"\0")
+        path = ROOT / name
+        try:
+            if path.is_symlink():
+                digest.update(os.readlink(path).encode("utf-8", "surrogateescape"))
+            else:
+                with path.open("rb") as handle:
+                    for chunk in iter(lambda: handle.read(1 << 20), b""):
+                        digest.update(chunk)
+        except OSError:
+            return None
+    names = list(VERIFY_CACHE_ENV)
+    names.extend(name.strip() for name in os.environ.get("AGENTCTL_VERIFY_CACHE_ENV", "").split(",") if name.strip())
+    for entry in sorted(f"{name}={os.environ.get(name, '')}" for name in set(names)):
+        digest.update(b"\0" + entry.encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def verify_cache_key(context: str, command: str) -> str:
+    import hashlib
+
+    return hashlib.sha256(f"{context}\0{command}".encode("utf-8")).hexdigest()
+
+
+def load_verify_cache() -> Dict[str, Tuple[bool, float]]:
+    """Verify results (key -> (passed, seconds)), least recently used first."""
+    try:
+        version, entries = marshal.loads(VERIFY_CACHE_PATH.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if version != VERIFY_CACHE_VERSION or not isinstance(entries, dict):
+        return {}
+    return entries
+
+
+def store_verify_cache(entries: Dict[str, Tuple[bool, float]]) -> None:
+    while len(entries) > VERIFY_CACHE_MAX_ENTRIES:
+        del entries[next(iter(entries))]
+    tmp_path = VERIFY_CACHE_PATH.with_name(f"{VERIFY_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(marshal.dumps((VERIFY_CACHE_VERSION, entries)))
+        os.replace(tmp_path, VERIFY_CACHE_PATH)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def run_verify_commands(
+    task_id: str,
+    commands: List[str],
+    *,
+    quiet: bool,
+    jobs: int = 1,
+    fail_fast: bool = False,
+    cache: bool = True,
+    reuse: bool = False,
+) -> None:
+    """Run a task's verify commands and exit with the first failing command's code."""
+    import subprocess
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    context = verify_cache_context() if cache else None
+    entries = load_verify_cache() if context else {}
+    results: List[VerifyResult] = []
+    for command in commands:
+        key = verify_cache_key(context, command) if context else ""
+        entry = entries.pop(key, None) if reuse and context else None
+        if entry is not None:
+            entries[key] = entry
+            if entry[0]:
+                if not quiet:
+                    print(f"✅ cached pass ({entry[1]:.2f}s, same files): {command}")
+                continue
+        results.append(VerifyResult(command))
+
+    try:
+        if jobs <= 1 or len(results) <= 1:
+            for result in results:
+                if not quiet:
+                    print(f"$ {result.command}")
+                    sys.stdout.flush()
+                started = time.perf_counter()
+                with trace_span("verify", command=result.command) as span:
+                    proc = subprocess.run(result.command, cwd=str(ROOT), shell=True, text=True)
+                    span.set(returncode=proc.returncode)
+                result.seconds = time.perf_counter() - started
+                result.returncode = proc.returncode
+                if proc.returncode != 0:
+                    print(f"❌ exit {proc.returncode} after {result.seconds:.2f}s: {result.command}", file=sys.stderr)
+                    break
+                if not quiet:
+                    print(f"✅ {result.seconds:.2f}s")
+        else:
+            cancel = threading.Event()
+            running: Dict[int, subprocess.Popen] = {}
+            killed: Set[int] = set()
+            lock = threading.Lock()
+            with ThreadPoolExecutor(max_workers=min(jobs, len(results))) as pool:
+                futures = [
+                    pool.submit(_run_verify_captured, result, cancel, running, killed, lock, fail_fast)
+                    for result in results
+                ]
+                for future in futures:
+                    _report_verify_result(future.result(), quiet=quiet)
+    finally:
+        if context:
+            for result in results:
+                if result.returncode is not None and not result.cancelled:
+                    key = verify_cache_key(context, result.command)
+                    entries.pop(key, None)
+                    entries[key] = (result.returncode == 0, round(result.seconds, 3))
+            store_verify_cache(entries)
+
+    failed = [result for result in results if result.returncode not in (None, 0) and not result.cancelled]
+    if failed:
+        raise SystemExit(failed[0].returncode)
+    if not quiet:
+        print(f"✅ verify passed for {task_id}")
+
+
+def cmd_verify(args: argparse.Namespace) -> None:
+    task = TaskStore.load().get(args.task_id)
+    verify = task.get("verify")
+    if verify is None:
+        commands: List[str] = []
+    elif isinstance(verify, list):
+        commands = [cmd.strip() for cmd in verify if isinstance(cmd, str) and cmd.strip()]
+    else:
+        die(f"{args.task_id}: verify must be a list of strings", code=2)
+
+    if not commands:
+        if args.require:
+            die(f"{args.task_id}: no verify commands configured", code=2)
+        if not args.quiet:
+            print(f"ℹ️ {args.task_id}: no verify commands configured")
+        return
+
+    run_verify_commands(
+        args.task_id,
+        commands,
+        quiet=args.quiet,
+        jobs=args.jobs,
+        fail_fast=args.fail_fast,
+        cache=not args.no_cache,
+    )
+
+
+def is_transition_allowed(current: str, nxt: str) -> bool:
+    if current == nxt:
+        return True
+    if current == "TODO":
+        return nxt in {"DOING", "BLOCKED"}
+    if current == "DOING":
+        return nxt in {"DONE", "BLOCKED"}
+    if current == "BLOCKED":
+        return nxt in {"TODO", "DOING"}
+    if current == "DONE":
+        return False
+    return False
+
+
+def apply_task_set_status(store: TaskStore, args: argparse.Namespace) -> None:
+    nxt = args.status.strip().upper()
+    if nxt not in ALLOWED_STATUSES:
+        die(f"Invalid status: {args.status} (allowed: {', '.join(sorted(ALLOWED_STATUSES))})")
+    if nxt == "DONE" and not args.force:
+        die("Use `python scripts/agentctl.py finish T-123` to mark DONE (use --force to override)", code=2)
+    if (args.author and not args.body) or (args.body and not args.author):
+        die("--author and --body must be provided together", code=2)
+
+    target = store.get(args.task_id)
+
+    current = str(target.get("status") or "").strip().upper() or "TODO"
+    if not is_transition_allowed(current, nxt) and not args.force:
+        die(f"Refusing status transition {current} -> {nxt} (use --force to override)")
+
+    if nxt in {"DOING", "DONE"} and not args.force:
+        ok, warnings = readiness(args.task_id, store)
+        if not ok:
+            for warning in warnings:
+                print(f"⚠️ {warning}")
+            die(f"Task is not ready: {args.task_id} (use --force to override)", code=2)
+
+    store.set_fields(args.task_id, {"status": nxt})
+
+    if args.author and args.body:
+        store.comment(args.task_id, args.author, args.body)
+
+    if args.commit:
+        commit_info = get_commit_info(args.commit)
+        store.set_fields(args.task_id, {"commit": commit_info})
+
+
+def cmd_task_set_status(args: argparse.Namespace) -> None:
+    store = TaskStore.load()
+    apply_task_set_status(store, args)
+    store.save()
+
+
+def cmd_finish(args: argparse.Namespace) -> None:
+    if (args.author and not args.body) or (args.body and not args.author):
+        die("--author and --body must be provided together", code=2)
+    if args.author and args.body and not args.force:
+        require_structured_comment(args.body, prefix="Verified:", min_chars=60)
+
+    store = TaskStore.load()
+    lint = lint_tasks_json(store)
+    if lint["warnings"] and not args.quiet:
+        for message in lint["warnings"]:
+            print(f"⚠️ {message}")
+    if lint["errors"] and not args.force:
+        for message in lint["errors"]:
+            print(f"❌ {message}", file=sys.stderr)
+        die("tasks.json failed lint (use --force to override)", code=2)
+
+    ok, warnings = readiness(args.task_id, store)
+    if not ok and not args.force:
+        for warning in warnings:
+            print(f"⚠️ {warning}")
+        die(f"Task is not ready: {args.task_id} (use --force to override)", code=2)
+
+    commit_info = get_commit_info(args.commit)
+    if args.require_task_id_in_commit and args.task_id not in commit_info.get("message", "") and not args.force:
+        die(
+            f"Commit subject does not mention {args.task_id}: {commit_info.get('message')!r} "
+            "(use --force or --no-require-task-id-in-commit)"
+        )
+
+    target = store.get(args.task_id)
+
+    verify = target.get("verify")
+    if verify is None:
+        commands: List[str] = []
+    elif isinstance(verify, list):
+        commands = [cmd.strip() for cmd in verify if isinstance(cmd, str) and cmd.strip()]
+    else:
+        if not args.force:
+            die(f"{args.task_id}: verify must be a list of strings (use --force to override)", code=2)
+        commands = []
+    if commands and not args.skip_verify and not args.force:
+        run_verify_commands(
+            args.task_id,
+            commands,
+            quiet=args.quiet,
+            jobs=args.jobs,
+            fail_fast=args.fail_fast,
+            cache=not args.no_cache,
+            reuse=True,
+        )
+
+    store.set_fields(args.task_id, {"status": "DONE", "commit": commit_info})
+    unblocked = store.unblocked_by(args.task_id)
+
+    if args.author and args.body:
+        store.comment(args.task_id, args.author, args.body)
+
+    store.save()
+    if unblocked and not args.quiet:
+        print(f"🔓 now ready: {', '.join(unblocked)}")
+
+
+BATCH_OPS = {
+    # op -> (agentctl argv prefix, positional keys, applier)
+    "add": (("task", "add"), ("id",), apply_task_add),
+    "update": (("task", "update"), ("id",), apply_task_update),
+    "comment": (("task", "comment"), ("id",), apply_task_comment),
+    "start": (("start",), ("id",), apply_start),
+    "block": (("block",), ("id",), apply_block),
+    "set-status": (("task", "set-status"), ("id", "status"), apply_task_set_status),
+}
+
+
+def subcommand_options(parser: argparse.ArgumentParser, command: Iterable[str]) -> Set[str]:
+    """Exact option strings (without --help) of the subcommand parser reached by command."""
+    for name in command:
+        subparsers = next(action for action in parser._actions if isinstance(action, argparse._SubParsersAction))
+        parser = subparsers.choices[name]
+    return {option for action in parser._actions if action.dest != "help" for option in action.option_strings}
+
+
+def batch_op_argv(op: Dict, parser: argparse.ArgumentParser) -> List[str]:
+    """Translate a batch op into the equivalent CLI argv (keys are flag names, `_` or `-`)."""
+    kind = op.get("op")
+    spec = BATCH_OPS.get(kind) if isinstance(kind, str) else None
+    if spec is None:
+        die(f"unknown op {kind!r} (expected one of: {', '.join(BATCH_OPS)})", code=2)
+    command, positionals, _ = spec
+    # Keys must name a flag exactly: argparse would otherwise accept prefixes ("auth" for --author).
+    options = subcommand_options(parser, command)
+    argv = list(command)
+    for name in positionals:
+        value = op.get(name)
+        if not isinstance(value, str) or not value.strip():
+            die(f"{kind}: {name!r} must be a non-empty string", code=2)
+        argv.append(value)
+    for key, value in op.items():
+        if key == "op" or key in positionals or value is None or value is False:
+            continue
+        flag = "--" + key.replace("_", "-")
+        if flag not in options:
+            die(f"{kind}: unsupported key {key!r}", code=2)
+        if value is True:
+            argv.append(flag)
+        elif isinstance(value, list):
+            argv.extend(f"{flag}={item}" for item in value)
+        else:
+            argv.append(f"{flag}={value}")
+    return argv
+
+
+def cmd_batch(args: argparse.Namespace) -> None:
+    if args.file == "-":
+        text = sys.stdin.read()
+    else:
+        try:
+            text = Path(args.file).read_text(encoding="utf-8")
+        except OSError as exc:
+            die(f"Cannot read {args.file}: {exc}")
+
+    parser = build_parser()
+    store = TaskStore.load()
+    applied = 0
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        label = f"#{lineno}"
+        try:
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError as exc:
+                die(f"invalid JSON: {exc}", code=2)
+            if not isinstance(op, dict):
+                die("operation must be a JSON object", code=2)
+            label = " ".join(str(part) for part in (f"#{lineno}", op.get("op"), op.get("id")) if part)
+            op_args = parser.parse_args(batch_op_argv(op, parser))
+            BATCH_OPS[op["op"]][2](store, op_args)
+        except SystemExit as exc:
+            print(f"❌ {label}: failed; batch rolled back, tasks.json unchanged", file=sys.stderr)
+            raise SystemExit(exc.code or 2)
+        applied += 1
+        if not args.quiet:
+            print(f"✅ {label}")
+
+    if not applied:
+        if not args.quiet:
+            print("ℹ️ no operations")
+        return
+    store.save()
+    if not args.quiet:
+        print(f"✅ applied {applied} operation(s) in one write")
+
+
+def server_socket_path() -> Path:
+    override = os.environ.get("AGENTCTL_SOCKET")
+    return Path(override) if override else SERVER_SOCKET_PATH
+
+
+def server_timeout() -> float:
+    try:
+        return float(os.environ.get("AGENTCTL_SERVER_TIMEOUT") or SERVER_TIMEOUT)
+    except ValueError:
+        return SERVER_TIMEOUT
+
+
+def _recv_line(conn) -> bytes:
+    """One newline-terminated message (b"" when the peer closes first)."""
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = conn.recv(1 << 16)
+        if not chunk:
+            return b""
+        data += chunk
+    return data
+
+
+def serve_request(conn) -> None:
+    """Handle one forwarded command: run main() in-process with the client's cwd and AGENTCTL_* env."""
+    import traceback
+
+    data = _recv_line(conn)
+    if not data:
+        return
+    try:
+        request = json.loads(data)
+        argv = [str(arg) for arg in request["argv"]]
+        env = {str(key): str(value) for key, value in (request.get("env") or {}).items()}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        conn.sendall(json.dumps({"code": 2, "stdout": "", "stderr": "invalid request\n"}).encode("utf-8") + b"\n")
+        return
+    conn.sendall(SERVER_READY)
+    if _recv_line(conn) != SERVER_GO:
+        return  # the client gave up waiting and runs the command itself
+
+    saved_cwd = os.getcwd()
+    saved_env = {key: value for key, value in os.environ.items() if key.startswith("AGENTCTL_")}
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    try:
+        os.chdir(request.get("cwd") or str(ROOT))
+        for key in saved_env:
+            del os.environ[key]
+        os.environ.update(env)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                main(argv)
+            except SystemExit as exc:
+                if isinstance(exc.code, int) or exc.code is None:
+                    code = exc.code or 0
+                else:
+                    print(exc.code, file=sys.stderr)
+                    code = 1
+            except Exception:  # noqa: BLE001 - report to the client, keep serving
+                traceback.print_exc()
+                code = 1
+    except OSError as exc:
+        stderr.write(f"{exc}\n")
+        code = 1
+    finally:
+        os.chdir(saved_cwd)
+        for key in [key for key in os.environ if key.startswith("AGENTCTL_")]:
+            del os.environ[key]
+        os.environ.update(saved_env)
+    reply = {"code": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+    conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    global _RESIDENT
+    import signal
+    import socket
+
+    if _RESIDENT is not None:
+        die("already running inside agentctl serve", code=2)
+    path = Path(args.socket) if args.socket else server_socket_path()
+    if path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(path))
+            die(f"agentctl serve is already running on {path}", code=2)
+        except OSError:
+            path.unlink()
+        finally:
+            probe.close()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(str(path))
+    except OSError as exc:
+        die(f"Cannot bind {path}: {exc}")
+    os.chmod(path, 0o600)
+    server.listen(16)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    _RESIDENT = {}
+    if not args.quiet:
+        print(f"✅ agentctl serving on {path} (Ctrl-C to stop)", flush=True)
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    conn.settimeout(server_timeout())
+                    serve_request(conn)
+                except OSError as exc:  # the client went away or stalled; keep serving the others
+                    print(f"⚠️ dropped a client connection: {exc!r}", file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _RESIDENT = None
+        server.close()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def verify_jobs(value: str) -> int:
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid job count: {value!r}")
+    if jobs < 0:
+        raise argparse.ArgumentTypeError("--jobs must be >= 0")
+    return jobs or (os.cpu_count() or 1)
+
+
+def add_verify_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=verify_jobs,
+        default=1,
+        help="Run verify commands concurrently (0 = one per CPU; default: 1, sequential)",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="With --jobs > 1, stop remaining verify commands after the first failure",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither reuse nor record verify results in .agentctl/verify.cache",
+    )
+
+
+def build_parser(argv: Optional[List[str]] = None) -> argparse.ArgumentParser:
+    """Build the CLI parser (only the selected (sub)command when argv is given)."""
+    path = list(argv[:2]) if argv else None
+    matched = False
+
+    def selects(*names: str) -> bool:
+        return path is None or path[: len(names)] == list(names)
+
+    def wants(*names: str) -> bool:
+        nonlocal matched
+        if path is None:
+            return True
+        if path[: len(names)] == list(names):
+            matched = True
+            return True
+        return False
+
+    parser = argparse.ArgumentParser(prog="agentctl", description="TokenSpot agent workflow helper")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a timing breakdown (nested spans with durations and sizes) to stderr; "
+        "AGENTCTL_TRACE=FILE writes the spans to FILE instead",
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    if wants("quickstart"):
+        p_quickstart = sub.add_parser("quickstart", help="Print agentctl usage quick reference (docs/agentctl.md)")
+        p_quickstart.set_defaults(func=cmd_quickstart)
+
+    if wants("agents"):
+        p_agents = sub.add_parser("agents", help="List registered agents under .AGENTS/")
+        p_agents.set_defaults(func=cmd_agents)
+
+    if wants("ready"):
+        p_ready = sub.add_parser("ready", help="Check if a task is ready to start (dependencies DONE)")
+        p_ready.add_argument("task_id")
+        p_ready.set_defaults(func=cmd_ready)
+
+    if wants("verify"):
+        p_verify = sub.add_parser("verify", help="Run verify commands declared on a task (tasks.json)")
+        p_verify.add_argument("task_id")
+        p_verify.add_argument("--quiet", action="store_true", help="Minimal output")
+        p_verify.add_argument("--require", action="store_true", help="Fail if no verify commands exist")
+        add_verify_args(p_verify)
+        p_verify.set_defaults(func=cmd_verify)
+
+    if selects("guard"):
+        p_guard = sub.add_parser("guard", help="Guardrails for git staging/commit hygiene")
+        guard_sub = p_guard.add_subparsers(dest="guard_cmd", required=True)
+
+        if wants("guard", "clean"):
+            p_guard_clean = guard_sub.add_parser("clean", help="Fail if there are staged files")
+            p_guard_clean.add_argument("--quiet", action="store_true", help="Minimal output")
+            p_guard_clean.set_defaults(func=cmd_guard_clean)
+
+        if wants("guard", "suggest-allow"):
+            p_guard_suggest = guard_sub.add_parser("suggest-allow", help="Suggest minimal --allow prefixes for staged files")
+            p_guard_suggest.add_argument("--format", choices=["lines", "args"], default="lines", help="Output format")
+            p_guard_suggest.add_argument(
+                "--max-prefixes",
+                type=int,
+                metavar="K",
+                help="Merge into at most K prefixes (tightest cover that admits no file with unstaged-only changes)",
+            )
+            p_guard_suggest.set_defaults(func=cmd_guard_suggest_allow)
+
+        if wants("guard", "commit"):
+            p_guard_commit = guard_sub.add_parser("commit", help="Validate staged files and planned commit message")
+            p_guard_commit.add_argument("task_id", help="Active task id (must appear in --message)")
+            p_guard_commit.add_argument("--message", "-m", required=True, help="Planned commit message")
+            p_guard_commit.add_argument("--allow", action="append", help="Allowed path prefix (repeatable)")
+            p_guard_commit.add_argument("--allow-tasks", action="store_true", help="Allow staging tasks.json")
+            p_guard_commit.add_argument("--allow-dirty", action="store_true", help="Deprecated (unstaged changes are allowed by default)")
+            p_guard_commit.add_argument("--require-clean", action="store_true", help="Fail if there are unstaged changes")
+            p_guard_commit.add_argument("--quiet", action="store_true", help="Minimal output")
+            p_guard_commit.set_defaults(func=cmd_guard_commit)
+
+    if wants("commit"):
+        p_commit = sub.add_parser("commit", help="Run guard commit checks, then `git commit`")
+        p_commit.add_argument("task_id", help="Active task id (must appear in --message)")
+        p_commit.add_argument("--message", "-m", required=True, help="Commit message")
+        p_commit.add_argument("--allow", action="append", help="Allowed path prefix (repeatable)")
+        p_commit.add_argument("--auto-allow", action="store_true", help="Derive --allow prefixes from staged files")
+        p_commit.add_argument("--allow-tasks", action="store_true", help="Allow staging tasks.json")
+        p_commit.add_argument("--require-clean", action="store_true", help="Fail if there are unstaged changes")
+        p_commit.add_argument("--quiet", action="store_true", help="Minimal output")
+        p_commit.set_defaults(func=cmd_commit)
+
+    if wants("start"):
+        p_start = sub.add_parser("start", help="Mark task DOING with a mandatory comment")
+        p_start.add_argument("task_id")
+        p_start.add_argument("--author", required=True)
+        p_start.add_argument("--body", required=True)
+        p_start.add_argument("--quiet", action="store_true", help="Minimal output")
+        p_start.add_argument("--force", action="store_true", help="Bypass readiness/transition checks")
+        p_start.set_defaults(func=cmd_start)
+
+    if wants("block"):
+        p_block = sub.add_parser("block", help="Mark task BLOCKED with a mandatory comment")
+        p_block.add_argument("task_id")
+        p_block.add_argument("--author", required=True)
+        p_block.add_argument("--body", required=True)
+        p_block.add_argument("--quiet", action="store_true", help="Minimal output")
+        p_block.add_argument("--force", action="store_true", help="Bypass transition checks")
+        p_block.set_defaults(func=cmd_block)
+
+    if selects("task"):
+        p_task = sub.add_parser("task", help="Operate on tasks.json")
+        task_sub = p_task.add_subparsers(dest="task_cmd", required=True)
+
+        if wants("task", "lint"):
+            p_lint = task_sub.add_parser("lint", help="Validate tasks.json (schema, deps, checksum)")
+            p_lint.add_argument("--quiet", action="store_true", help="Suppress warnings")
+            p_lint.add_argument(
+                "--verify-commits",
+                action="store_true",
+                help="Also check that DONE tasks' commit.hash exists, is reachable from a ref and matches commit.message",
+            )
+            p_lint.set_defaults(func=cmd_task_lint)
+
+        if wants("task", "add"):
+            p_add = task_sub.add_parser("add", help="Add a new task to tasks.json (no manual edits)")
+            p_add.add_argument("task_id")
+            p_add.add_argument("--title", required=True)
+            p_add.add_argument("--description", required=True)
+            p_add.add_argument("--status", default="TODO", help="Default: TODO")
+            p_add.add_argument("--priority", required=True)
+            p_add.add_argument("--owner", required=True)
+            p_add.add_argument("--tag", action="append", help="Repeatable")
+            p_add.add_argument("--depends-on", action="append", dest="depends_on", help="Repeatable")
+            p_add.add_argument("--verify", action="append", help="Repeatable: shell command")
+            p_add.add_argument("--comment-author", dest="comment_author")
+            p_add.add_argument("--comment-body", dest="comment_body")
+            p_add.set_defaults(func=cmd_task_add)
+
+        if wants("task", "update"):
+            p_update = task_sub.add_parser("update", help="Update a task in tasks.json (no manual edits)")
+            p_update.add_argument("task_id")
+            p_update.add_argument("--title")
+            p_update.add_argument("--description")
+            p_update.add_argument("--priority")
+            p_update.add_argument("--owner")
+            p_update.add_argument("--tag", action="append", help="Repeatable (append)")
+            p_update.add_argument("--replace-tags", action="store_true")
+            p_update.add_argument("--depends-on", action="append", dest="depends_on", help="Repeatable (append)")
+            p_update.add_argument("--replace-depends-on", action="store_true")
+            p_update.add_argument("--verify", action="append", help="Repeatable (append)")
+            p_update.add_argument("--replace-verify", action="store_true")
+            p_update.set_defaults(func=cmd_task_update)
+
+        if wants("task", "compact"):
+            p_compact = task_sub.add_parser("compact", help="Fold tasks.journal.jsonl into tasks.json and recompute the checksum")
+            p_compact.add_argument("--quiet", action="store_true", help="Minimal output")
+            p_compact.add_argument("--force", action="store_true", help="Fold the journal even if record hashes mismatch")
+            p_compact.set_defaults(func=cmd_task_compact)
+
+        if wants("task", "shard"):
+            p_shard = task_sub.add_parser("shard", help="Switch to the sharded layout: one tasks/<id>.json file per task")
+            p_shard.add_argument("--quiet", action="store_true", help="Minimal output")
+            p_shard.set_defaults(func=cmd_task_shard)
+
+        if wants("task", "archive"):
+            p_archive = task_sub.add_parser("archive", help="Move DONE tasks into a gzip JSONL segment under tasks.archive/")
+            p_archive.add_argument("--before", help="Archive DONE tasks whose id sorts before this one (e.g. T-100)")
+            p_archive.add_argument(
+                "--done-older-than", type=int, metavar="DAYS", help="Archive DONE tasks whose recorded commit is older than DAYS"
+            )
+            p_archive.add_argument("--dry-run", action="store_true", help="List the tasks that would be archived")
+            p_archive.add_argument("--quiet", action="store_true", help="Minimal output")
+            p_archive.set_defaults(func=cmd_task_archive)
+
+        if wants("task", "export"):
+            p_export = task_sub.add_parser("export", help="Write tasks.json content rebuilt from the SQLite index")
+            p_export.add_argument("--output", default="-", help="Output path (default: stdout)")
+            p_export.set_defaults(func=cmd_task_export)
+
+        if wants("task", "render"):
+            p_render = task_sub.add_parser("render", help="Regenerate tasks.json from tasks/<id>.json shards")
+            p_render.add_argument("--quiet", action="store_true", help="Minimal output")
+            p_render.add_argument("--force", action="store_true", help="Render even if lint reports errors")
+            p_render.set_defaults(func=cmd_task_render)
+
+        if wants("task", "scrub"):
+            p_scrub = task_sub.add_parser("scrub", help="Replace text across tasks.json task fields")
+            p_scrub.add_argument("--find", required=True, help="Substring to replace (required)")
+            p_scrub.add_argument("--replace", default="", help="Replacement (default: empty)")
+            p_scrub.add_argument("--dry-run", action="store_true", help="Print affected task ids without writing")
+            p_scrub.add_argument("--quiet", action="store_true", help="Minimal output")
+            p_scrub.set_defaults(func=cmd_task_scrub)
+
+        if wants("task", "list"):
+            p_list = task_sub.add_parser("list", help="List tasks from tasks.json")
+            p_list.add_argument("--status", action="append", help="Filter by status (repeatable)")
+            p_list.add_argument("--owner", action="append", help="Filter by owner (repeatable)")
+            p_list.add_argument("--tag", action="append", help="Filter by tag (repeatable)")
+            p_list.add_argument("--quiet", action="store_true", help="Suppress warnings")
+            p_list.set_defaults(func=cmd_task_list)
+
+        if wants("task", "next"):
+            p_next = task_sub.add_parser("next", help="List tasks ready to start (dependencies DONE)")
+            p_next.add_argument("--status", action="append", help="Filter by status (repeatable, default: TODO)")
+            p_next.add_argument("--owner", action="append", help="Filter by owner (repeatable)")
+            p_next.add_argument("--tag", action="append", help="Filter by tag (repeatable)")
+            p_next.add_argument("--limit", type=int, help="Limit number of results")
+            p_next.add_argument("--quiet", action="store_true", help="Suppress warnings")
+            p_next.set_defaults(func=cmd_task_next)
+
+        if wants("task", "show"):
+            p_show = task_sub.add_parser("show", help="Show a single task from tasks.json")
+            p_show.add_argument("task_id")
+            p_show.add_argument("--last-comments", type=int, default=5, help="How many latest comments to print")
+            p_show.add_argument("--quiet", action="store_true", help="Suppress warnings")
+            p_show.set_defaults(func=cmd_task_show)
+
+        if wants("task", "search"):
+            p_search = task_sub.add_parser("search", help="Search tasks by text (title/description/tags/comments)")
+            p_search.add_argument("query")
+            p_search.add_argument("--regex", action="store_true", help="Treat query as a case-insensitive regex")
+            p_search.add_argument("--status", action="append", help="Filter by status (repeatable)")
+            p_search.add_argument("--owner", action="append", help="Filter by owner (repeatable)")
+            p_search.add_argument("--tag", action="append", help="Filter by tag (repeatable)")
+            p_search.add_argument("--limit", type=int, help="Limit number of results")
+            p_search.add_argument("--archived", action="store_true", help="Also search archived tasks (tasks.archive/)")
+            p_search.add_argument("--quiet", action="store_true", help="Suppress warnings")
+            p_search.set_defaults(func=cmd_task_search)
+
+        if wants("task", "scaffold"):
+            p_scaffold = task_sub.add_parser("scaffold", help="Create docs/workflow/T-###.md skeleton for a task")
+            p_scaffold.add_argument("task_id")
+            p_scaffold.add_argument("--title", help="Optional title override")
+            p_scaffold.add_argument("--overwrite", action="store_true", help="Overwrite if the file exists")
+            p_scaffold.add_argument("--force", action="store_true", help="Allow scaffolding even if task id is unknown")
+            p_scaffold.add_argument("--quiet", action="store_true", help="Minimal output")
+            p_scaffold.set_defaults(func=cmd_task_scaffold)
+
+        if wants("task", "comment"):
+            p_comment = task_sub.add_parser("comment", help="Append a comment to a task")
+            p_comment.add_argument("task_id")
+            p_comment.add_argument("--author", required=True)
+            p_comment.add_argument("--body", required=True)
+            p_comment.set_defaults(func=cmd_task_comment)
+
+        if wants("task", "set-status"):
+            p_status = task_sub.add_parser("set-status", help="Update task status with readiness checks")
+            p_status.add_argument("task_id")
+            p_status.add_argument("status", help="TODO|DOING|BLOCKED|DONE")
+            p_status.add_argument("--author", help="Optional comment author (requires --body)")
+            p_status.add_argument("--body", help="Optional comment body (requires --author)")
+            p_status.add_argument("--commit", help="Attach commit metadata from a git rev (e.g., HEAD)")
+            p_status.add_argument("--force", action="store_true", help="Bypass transition and readiness checks")
+            p_status.set_defaults(func=cmd_task_set_status)
+
+    if wants("serve"):
+        p_serve = sub.add_parser(
+            "serve",
+            help="Keep tasks/dependency state in memory and answer agentctl calls over a Unix socket",
+        )
+        p_serve.add_argument(
+            "--socket",
+            help="Socket path (default: $AGENTCTL_SOCKET or .agentctl/agentctl.sock; clients use the same lookup)",
+        )
+        p_serve.add_argument("--quiet", action="store_true", help="Minimal output")
+        p_serve.set_defaults(func=cmd_serve)
+
+    if wants("batch"):
+        p_batch = sub.add_parser(
+            "batch",
+            help="Apply a JSONL stream of task ops (add/update/comment/start/block/set-status) in one atomic write",
+        )
+        p_batch.add_argument("file", nargs="?", default="-", help="JSONL file (default: stdin)")
+        p_batch.add_argument("--quiet", action="store_true", help="Minimal output")
+        p_batch.set_defaults(func=cmd_batch)
+
+    if wants("finish"):
+        p_finish = sub.add_parser(
+            "finish",
+            help="Mark task DONE + attach commit metadata (typically after a code commit)",
+        )
+        p_finish.add_argument("task_id")
+        p_finish.add_argument("--commit", default="HEAD", help="Git rev to attach as task commit metadata (default: HEAD)")
+        p_finish.add_argument("--author", help="Optional comment author (requires --body)")
+        p_finish.add_argument("--body", help="Optional comment body (requires --author)")
+        p_finish.add_argument("--skip-verify", action="store_true", help="Do not run verify even if configured")
+        add_verify_args(p_finish)
+        p_finish.add_argument("--quiet", action="store_true", help="Minimal output")
+        p_finish.add_argument("--force", action="store_true", help="Bypass readiness and commit-subject checks")
+        p_finish.add_argument(
+            "--no-require-task-id-in-commit",
+            dest="require_task_id_in_commit",
+            action="store_false",
+            help="Allow finishing even if commit subject does not mention the task id",
+        )
+        p_finish.set_defaults(require_task_id_in_commit=True, func=cmd_finish)
+
+    if path is not None and not matched:
+        return build_parser()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    global _TRACE
+    if argv is None:
+        argv = sys.argv[1:]
+    # --profile is a global option: only recognised before the command (agentctl --profile task list).
+    profile = bool(argv) and argv[0] == "--profile"
+    if profile:
+        argv = argv[1:]
+    trace_path = os.environ.get("AGENTCTL_TRACE")
+    if not trace_path and not profile:
+        _run(argv)
+        return
+    outer = _TRACE
+    _TRACE = Tracer(trace_path, profile=profile)
+    try:
+        with trace_span("agentctl", argv=" ".join(argv[:3])):
+            _run(argv)
+    finally:
+        tracer, _TRACE = _TRACE, outer
+        tracer.emit()
+
+
+def _run(argv: List[str]) -> None:
+    parser = build_parser(argv)
+    try:
+        with redirect_stderr(io.StringIO()):
+            args = parser.parse_args(argv)
+    except SystemExit as exc:
+        if not exc.code:
+            raise
+        # Usage error: report it from the full parser so the message lists every command.
+        parser = build_parser()
+        args = parser.parse_args(argv)
+    func = getattr(args, "func", None)
+    if not func:
+        parser.print_help()
+        raise SystemExit(2)
+    func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""A minimal in-process stand-in for the GitHub REST and GraphQL APIs used by .github/scripts/sync_tasks.py.
+
+It serves the issue listing with Link-header pagination, issue create/update,
+and the ProjectV2 queries and mutations (cursor-paged items), and records every
+request so tests can assert on the exact calls a sync made.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+OWNER = "octo-org"
+REPO = "octo-repo"
+TOKEN = "test-token"
+PROJECT_NUMBER = 7
+PROJECT_ID = "PVT_project"
+STATUS_FIELD_ID = "PVTSSF_status"
+STATUS_OPTIONS = {name: f"option-{name}" for name in ("TODO", "DOING", "BLOCKED", "DONE")}
+
+
+class FakeGitHub:
+    """Issues and project items of one repo; start() serves them on 127.0.0.1."""
+
+    def __init__(self) -> None:
+        self.issues: Dict[int, Dict[str, Any]] = {}
+        self.items: List[Dict[str, Any]] = []  # {"id", "number", "repo", "status"}; "number" None for drafts
+        self.moved: Dict[int, str] = {}  # issue number -> "owner/repo" it was transferred to
+        self.requests: List[Tuple[str, str]] = []  # (method, kind) in arrival order
+        self.item_cursors: List[Optional[str]] = []
+        self.issue_pages: List[int] = []
+        self.lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # ---------- seeding ----------
+
+    def add_issue(self, task_id: Optional[str], *, pull_request: bool = False) -> Dict[str, Any]:
+        number = max(self.issues, default=0) + 1
+        issue = {
+            "number": number,
+            "node_id": f"I_{number}",
+            "title": f"[{task_id}] old title" if task_id else "Unrelated issue",
+            "body": "",
+            "state": "open",
+            "labels": [{"name": f"task-id:{task_id}"}] if task_id else [{"name": "bug"}],
+        }
+        if pull_request:
+            issue["pull_request"] = {"url": f"https://example.invalid/pulls/{number}"}
+        self.issues[number] = issue
+        return issue
+
+    def add_item(self, number: Optional[int], *, repo: str = f"{OWNER}/{REPO}") -> Dict[str, Any]:
+        item = {"id": f"PVTI_{len(self.items) + 1}", "number": number, "repo": repo, "status": None}
+        self.items.append(item)
+        return item
+
+    def item_for(self, number: int) -> Optional[Dict[str, Any]]:
+        return next((item for item in self.items if item["number"] == number and item["repo"] == f"{OWNER}/{REPO}"), None)
+
+    def kinds(self) -> List[str]:
+        return [kind for _, kind in self.requests]
+
+    def reset_log(self) -> None:
+        self.requests.clear()
+        self.item_cursors.clear()
+        self.issue_pages.clear()
+
+    # ---------- server ----------
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        return {
+            "GITHUB_TOKEN": TOKEN,
+            "GITHUB_OWNER": OWNER,
+            "GITHUB_REPO": REPO,
+            "GITHUB_PROJECT_NUMBER": str(PROJECT_NUMBER),
+            "GITHUB_API_URL": self.url,
+            "GITHUB_GRAPHQL_URL": f"{self.url}/graphql",
+        }
+
+    def start(self) -> None:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def reply(self, status: int, payload: Any, headers: Tuple[Tuple[str, str], ...] = ()) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def payload(self) -> Dict[str, Any]:
+                return json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+
+            def authorized(self) -> bool:
+                if self.headers.get("Authorization") == f"Bearer {TOKEN}":
+                    return True
+                self.reply(401, {"message": "Bad credentials"})
+                return False
+
+            def do_GET(self) -> None:
+                if self.authorized():
+                    with fake.lock:
+                        fake.handle_get(self)
+
+            def do_POST(self) -> None:
+                if self.authorized():
+                    with fake.lock:
+                        fake.handle_post(self, self.payload())
+
+            def do_PATCH(self) -> None:
+                if self.authorized():
+                    with fake.lock:
+                        fake.handle_patch(self, self.payload())
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ---------- REST ----------
+
+    def issues_path(self) -> str:
+        return f"/repos/{OWNER}/{REPO}/issues"
+
+    def handle_get(self, handler: Any) -> None:
+        url = urlparse(handler.path)
+        if url.path != self.issues_path():
+            handler.reply(404, {"message": "Not Found"})
+            return
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        self.requests.append(("GET", "list issues"))
+        self.issue_pages.append(page)
+        ordered = sorted(self.issues.values(), key=lambda issue: -issue["number"])
+        last = max(1, -(-len(ordered) // per_page))
+        links = []
+        if page < last:
+            links.append(f'<{self.url}{url.path}?{urlencode(dict(query, page=page + 1))}>; rel="next"')
+            links.append(f'<{self.url}{url.path}?{urlencode(dict(query, page=last))}>; rel="last"')
+        headers = (("Link", ", ".join(links)),) if links else ()
+        handler.reply(200, ordered[(page - 1) * per_page : page * per_page], headers)
+
+    def handle_post(self, handler: Any, payload: Dict[str, Any]) -> None:
+        if handler.path == "/graphql":
+            self.handle_graphql(handler, payload)
+            return
+        if handler.path != self.issues_path():
+            handler.reply(404, {"message": "Not Found"})
+            return
+        self.requests.append(("POST", "create issue"))
+        issue = self.add_issue(None)
+        issue.update(title=payload["title"], body=payload["body"], labels=[{"name": name} for name in payload["labels"]])
+        handler.reply(201, issue)
+
+    def handle_patch(self, handler: Any, payload: Dict[str, Any]) -> None:
+        prefix = self.issues_path() + "/"
+        number = int(handler.path[len(prefix) :]) if handler.path.startswith(prefix) else 0
+        self.requests.append(("PATCH", "update issue"))
+        if number in self.moved:
+            location = f"{self.url}/repos/{self.moved[number]}/issues/{number}"
+            handler.reply(301, {"message": "Moved Permanently", "url": location}, (("Location", location),))
+            return
+        issue = self.issues.get(number)
+        if issue is None:
+            handler.reply(404, {"message": "Not Found"})
+            return
+        issue.update(
+            title=payload["title"],
+            body=payload["body"],
+            state=payload["state"],
+            labels=[{"name": name} for name in payload["labels"]],
+        )
+        handler.reply(200, issue)
+
+    # ---------- GraphQL ----------
+
+    def handle_graphql(self, handler: Any, payload: Dict[str, Any]) -> None:
+        query, variables = payload["query"], payload.get("variables") or {}
+        if "projectV2(number:" in query:
+            self.requests.append(("POST", "project fields"))
+            assert variables == {"org": OWNER, "number": PROJECT_NUMBER}, variables
+            options = [{"id": option, "name": name} for name, option in STATUS_OPTIONS.items()]
+            fields = [{}, {"id": "PVTF_title", "name": "Title"}, {"id": STATUS_FIELD_ID, "name": "Status", "options": options}]
+            handler.reply(200, {"data": {"organization": {"projectV2": {"id": PROJECT_ID, "fields": {"nodes": fields}}}}})
+        elif "addProjectV2ItemById" in query:
+            self.requests.append(("POST", "add item"))
+            number = int(variables["contentId"][len("I_") :])
+            item = self.add_item(number)
+            handler.reply(200, {"data": {"addProjectV2ItemById": {"item": {"id": item["id"]}}}})
+        elif "updateProjectV2ItemFieldValue" in query:
+            self.requests.append(("POST", "set status"))
+            assert variables["fieldId"] == STATUS_FIELD_ID, variables
+            item = next(item for item in self.items if item["id"] == variables["itemId"])
+            item["status"] = next(name for name, option in STATUS_OPTIONS.items() if option == variables["optionId"])
+            handler.reply(200, {"data": {"updateProjectV2ItemFieldValue": {"projectV2Item": {"id": item["id"]}}}})
+        elif "items(first: 100" in query:
+            self.requests.append(("POST", "list items"))
+            cursor = variables.get("cursor")
+            self.item_cursors.append(cursor)
+            start = int(cursor[len("cursor-") :]) if cursor else 0
+            page = self.items[start : start + 100]
+            nodes = []
+            for item in page:
+                if item["number"] is None:
+                    content = None  # draft issue
+                else:
+                    content = {"number": item["number"], "repository": {"nameWithOwner": item["repo"]}}
+                nodes.append({"id": item["id"], "content": content})
+            page_info = {"hasNextPage": start + 100 < len(self.items), "endCursor": f"cursor-{start + len(page)}"}
+            handler.reply(200, {"data": {"node": {"items": {"pageInfo": page_info, "nodes": nodes}}}})
+        else:
+            handler.reply(200, {"errors": [{"message": "unexpected query"}]})
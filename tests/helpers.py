@@ -0,0 +1,59 @@
+"""Shared helpers for the agentctl tests: scratch git workspaces and CLI runs.
+
+Every test works in its own temporary workspace holding a copy of the current
+scripts (agentctl resolves tasks.json relative to its own location), built with
+the benchmark harness' synthetic backlog generator.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import agentctl_bench  # noqa: E402
+
+
+class WorkspaceTestCase(unittest.TestCase):
+    """A fresh workspace per test with `tasks` synthetic tasks (ids T-000001...)."""
+
+    tasks = 50
+
+    def setUp(self) -> None:
+        scratch = tempfile.TemporaryDirectory(prefix="agentctl-test-")
+        self.addCleanup(scratch.cleanup)
+        self.root = Path(scratch.name)
+        agentctl_bench.make_workspace(self.root, self.make_tasks())
+        self.tasks_path = self.root / "tasks.json"
+
+    def make_tasks(self) -> List[Dict]:
+        return agentctl_bench.generate_tasks(self.tasks)
+
+    def env(self, **extra: str) -> Dict[str, str]:
+        env = agentctl_bench.bench_env()
+        env.update(extra)
+        return env
+
+    def agentctl(self, *argv: str, check: bool = True, env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+        proc = subprocess.run(
+            [sys.executable, "scripts/agentctl.py", *argv],
+            cwd=self.root,
+            env=env or self.env(),
+            capture_output=True,
+            text=True,
+        )
+        if check and proc.returncode != 0:
+            self.fail(f"agentctl {' '.join(argv)} exited with {proc.returncode}:\n{proc.stdout}{proc.stderr}")
+        return proc
+
+    def load_tasks_json(self) -> Dict:
+        return json.loads(self.tasks_path.read_text(encoding="utf-8"))
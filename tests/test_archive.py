@@ -0,0 +1,107 @@
+"""`task archive`: archived tasks leave tasks.json, stay reachable, and count as DONE for dependencies."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import unittest
+from typing import Dict, List
+
+from helpers import WorkspaceTestCase
+
+
+def make_task(number: int, status: str, depends_on: List[int] = ()) -> Dict:
+    task_id = f"T-{number:06d}"
+    task: Dict = {
+        "id": task_id,
+        "title": f"Task {number} {'zebrafish' if number == 2 else 'routine'} work",
+        "description": f"Description of task {number}.",
+        "status": status,
+        "priority": "med",
+        "owner": "CODER",
+        "depends_on": [f"T-{dep:06d}" for dep in depends_on],
+        "tags": ["archive"],
+        "comments": [],
+    }
+    if status == "DONE":
+        task["commit"] = {"hash": f"{number:040x}", "message": f"✨ {task_id} done"}
+    return task
+
+
+class ArchiveTest(WorkspaceTestCase):
+    def make_tasks(self) -> List[Dict]:
+        done = [make_task(number, "DONE", [number - 1] if number > 1 else []) for number in range(1, 11)]
+        return done + [make_task(11, "TODO", [2, 10]), make_task(12, "TODO", [11])]
+
+    def archive_index(self) -> Dict:
+        return json.loads((self.root / "tasks.archive" / "index.json").read_text(encoding="utf-8"))
+
+    def live_ids(self) -> List[str]:
+        return [task["id"] for task in self.load_tasks_json()["tasks"]]
+
+    def test_archive_moves_done_tasks_out(self) -> None:
+        self.agentctl("task", "archive", "--before", "T-000006")
+        self.assertEqual(self.live_ids(), [f"T-{number:06d}" for number in range(6, 13)])
+        index = self.archive_index()
+        self.assertEqual([entry["file"] for entry in index["segments"]], ["segment-0001.jsonl.gz"])
+        self.assertEqual(sorted(index["ids"]), [f"T-{number:06d}" for number in range(1, 6)])
+        self.assertIn("OK", self.agentctl("task", "lint").stdout)
+
+        self.agentctl("task", "archive", "--before", "T-000011")
+        self.assertEqual(self.live_ids(), ["T-000011", "T-000012"])
+        self.assertEqual(len(self.archive_index()["segments"]), 2)
+        self.assertIn("OK", self.agentctl("task", "lint").stdout)
+
+    def test_archived_dependencies_count_as_done(self) -> None:
+        self.agentctl("task", "archive", "--before", "T-000011")
+        self.assertIn("✅ ready", self.agentctl("ready", "T-000011").stdout)
+        self.assertEqual(self.agentctl("ready", "T-000012", check=False).returncode, 2)
+        self.assertIn("T-000011", self.agentctl("task", "next").stdout)
+
+    def test_show_and_search_reach_archived_tasks(self) -> None:
+        self.agentctl("task", "archive", "--before", "T-000006")
+        shown = self.agentctl("task", "show", "T-000002").stdout
+        self.assertIn("Archived: tasks.archive/segment-0001.jsonl.gz", shown)
+        self.assertIn("Title: Task 2 zebrafish work", shown)
+        self.assertEqual(self.agentctl("task", "show", "T-000099", check=False).returncode, 1)
+
+        self.assertNotIn("T-000002", self.agentctl("task", "search", "zebrafish").stdout)
+        self.assertIn("T-000002", self.agentctl("task", "search", "zebrafish", "--archived").stdout)
+
+    def test_existing_segment_is_never_replaced(self) -> None:
+        before = self.tasks_path.read_bytes()
+        (self.root / "tasks.archive").mkdir()
+        stray = self.root / "tasks.archive" / "segment-0001.jsonl.gz"
+        stray.write_bytes(b"not ours")
+        refused = self.agentctl("task", "archive", "--before", "T-000006", check=False)
+        self.assertEqual(refused.returncode, 1)
+        self.assertIn("already exists", refused.stderr)
+        self.assertEqual(stray.read_bytes(), b"not ours")
+        self.assertEqual(self.tasks_path.read_bytes(), before)
+        self.assertFalse((self.root / "tasks.archive" / "index.json").exists())
+
+    def test_concurrent_archives_do_not_lose_tasks(self) -> None:
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "scripts/agentctl.py", "task", "archive", "--before", before],
+                cwd=self.root,
+                env=self.env(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            for before in ("T-000006", "T-000011", "T-000008", "T-000004")
+        ]
+        for proc in procs:
+            _, stderr = proc.communicate(timeout=60)
+            self.assertEqual(proc.returncode, 0, stderr)
+        archived = self.archive_index()["ids"]
+        self.assertEqual(sorted(archived), [f"T-{number:06d}" for number in range(1, 11)])
+        self.assertEqual(self.live_ids(), ["T-000011", "T-000012"])
+        self.assertIn("OK", self.agentctl("task", "lint").stdout)
+        for number in range(1, 11):
+            self.assertIn("Archived:", self.agentctl("task", "show", f"T-{number:06d}").stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""`batch`: one result line per op, all-or-nothing writes, and keys must name a flag exactly."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import unittest
+from typing import Dict, List
+
+from helpers import WorkspaceTestCase
+
+
+class BatchTest(WorkspaceTestCase):
+    tasks = 20
+
+    def batch(self, ops: List[Dict]) -> subprocess.CompletedProcess:
+        path = self.root / "ops.jsonl"
+        path.write_text("".join(json.dumps(op) + "\n" for op in ops), encoding="utf-8")
+        return self.agentctl("batch", str(path), check=False)
+
+    def task(self, task_id: str) -> Dict:
+        return next(task for task in self.load_tasks_json()["tasks"] if task["id"] == task_id)
+
+    def test_ops_apply_in_one_write_with_a_result_each(self) -> None:
+        comments = len(self.task("T-000020")["comments"])
+        proc = self.batch(
+            [
+                {
+                    "op": "add",
+                    "id": "T-000021",
+                    "title": "Batch added",
+                    "description": "Added by batch.",
+                    "priority": "med",
+                    "owner": "CODER",
+                    "depends_on": ["T-000020"],
+                },
+                {"op": "comment", "id": "T-000020", "author": "CODER", "body": "from batch"},
+                {"op": "update", "id": "T-000021", "tag": ["batch", "api"]},
+            ]
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(
+            proc.stdout.splitlines(),
+            ["✅ #1 add T-000021", "✅ #2 comment T-000020", "✅ #3 update T-000021", "✅ applied 3 operation(s) in one write"],
+        )
+        added = self.task("T-000021")
+        self.assertEqual((added["depends_on"], added["tags"]), (["T-000020"], ["batch", "api"]))
+        self.assertEqual(len(self.task("T-000020")["comments"]), comments + 1)
+        self.assertIn("OK", self.agentctl("task", "lint").stdout)
+
+    def test_failing_op_leaves_tasks_json_unchanged(self) -> None:
+        before = self.tasks_path.read_bytes()
+        proc = self.batch(
+            [
+                {"op": "comment", "id": "T-000001", "author": "CODER", "body": "first"},
+                {"op": "update", "id": "T-000002", "title": "Renamed"},
+                {"op": "comment", "id": "T-999999", "author": "CODER", "body": "unknown task"},
+                {"op": "comment", "id": "T-000003", "author": "CODER", "body": "never reached"},
+            ]
+        )
+        self.assertNotEqual(proc.returncode, 0)
+        self.assertEqual(proc.stdout.splitlines(), ["✅ #1 comment T-000001", "✅ #2 update T-000002"])
+        self.assertIn("❌ #3 comment T-999999: failed; batch rolled back, tasks.json unchanged", proc.stderr)
+        self.assertEqual(self.tasks_path.read_bytes(), before)
+
+    def test_keys_must_match_a_flag_exactly(self) -> None:
+        before = self.tasks_path.read_bytes()
+        for op in (
+            {"op": "comment", "id": "T-000001", "auth": "CODER", "bo": "abbreviated"},
+            {"op": "comment", "id": "T-000001", "author": "CODER", "body": "x", "he": True},
+            {"op": "comment", "id": "T-000001", "author": "CODER", "body": "x", "help": True},
+            {"op": "update", "id": "T-000001", "replace_tag": True},
+        ):
+            with self.subTest(op=op):
+                proc = self.batch([op])
+                self.assertEqual(proc.returncode, 2)
+                self.assertIn("unsupported key", proc.stderr)
+                self.assertNotIn("usage:", proc.stdout + proc.stderr)
+                self.assertEqual(self.tasks_path.read_bytes(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
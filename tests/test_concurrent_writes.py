@@ -0,0 +1,76 @@
+"""Concurrent agentctl writers must not lose each other's updates (tasks lock + rebase on a changed checksum)."""
+
+from __future__ import annotations
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from helpers import WorkspaceTestCase
+
+WRITERS = 8
+OPS_PER_WRITER = 6
+COMMENT_TARGETS = ("T-000010", "T-000020")
+
+
+class ConcurrentWritersTest(WorkspaceTestCase):
+    tasks = 30
+
+    def writer_ops(self, writer: int) -> List[List[str]]:
+        ops: List[List[str]] = []
+        for step in range(OPS_PER_WRITER):
+            if step % 2 == 0:
+                ops.append(
+                    [
+                        "task", "add", f"W-{writer}-{step}",
+                        "--title", f"Added by writer {writer} step {step}",
+                        "--description", "Stress test task.",
+                        "--priority", "med",
+                        "--owner", "CODER",
+                    ]
+                )
+            else:
+                target = COMMENT_TARGETS[(writer + step) % len(COMMENT_TARGETS)]
+                ops.append(["task", "comment", target, "--author", "CODER", "--body", f"writer {writer} step {step}"])
+        return ops
+
+    def run_writers(self, **env: str) -> None:
+        environment = self.env(**env)
+
+        def run_writer(writer: int) -> None:
+            for argv in self.writer_ops(writer):
+                self.agentctl(*argv, env=environment)
+
+        with ThreadPoolExecutor(max_workers=WRITERS) as pool:
+            for future in [pool.submit(run_writer, writer) for writer in range(WRITERS)]:
+                future.result()
+
+    def assert_no_lost_updates(self) -> None:
+        tasks = self.load_tasks_json()["tasks"]
+        ids = [task["id"] for task in tasks]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(tasks), self.tasks + WRITERS * len(range(0, OPS_PER_WRITER, 2)))
+        by_id = {task["id"]: task for task in tasks}
+        bodies = [comment["body"] for target in COMMENT_TARGETS for comment in by_id[target].get("comments", [])]
+        for writer in range(WRITERS):
+            for step in range(OPS_PER_WRITER):
+                if step % 2 == 0:
+                    self.assertIn(f"W-{writer}-{step}", by_id)
+                else:
+                    self.assertEqual(bodies.count(f"writer {writer} step {step}"), 1)
+        lint = self.agentctl("task", "lint")
+        self.assertIn("OK", lint.stdout)
+
+    def test_full_writes(self) -> None:
+        self.run_writers()
+        self.assert_no_lost_updates()
+
+    def test_journal_writes(self) -> None:
+        # Few records per compaction, so compactions race with appends too.
+        self.run_writers(AGENTCTL_JOURNAL="1", AGENTCTL_JOURNAL_MAX_RECORDS="5")
+        self.agentctl("task", "compact", env=self.env(AGENTCTL_JOURNAL="1"))
+        self.assert_no_lost_updates()
+
+
+if __name__ == "__main__":
+    unittest.main()
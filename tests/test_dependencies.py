@@ -0,0 +1,95 @@
+"""Dependency analysis must stay iterative: 100k-long depends_on chains plus cycles, no RecursionError."""
+
+from __future__ import annotations
+
+import unittest
+from typing import Dict, List
+
+from helpers import WorkspaceTestCase
+
+import agentctl_core
+
+CHAIN = 100_000
+DONE = 60_000
+RING = 50_000
+
+
+def chain_id(index: int) -> str:
+    return f"T-{index:06d}"
+
+
+def chain_tasks() -> List[Dict]:
+    """T-000001 <- T-000002 <- ..., the first DONE finished, listed tail first."""
+    return [
+        {
+            "id": chain_id(index),
+            "title": f"Chain step {index}",
+            "status": "DONE" if index <= DONE else "TODO",
+            "priority": "med",
+            "owner": "CODER",
+            "depends_on": [chain_id(index - 1)] if index > 1 else [],
+        }
+        for index in range(CHAIN, 0, -1)
+    ]
+
+
+def cycle_tasks() -> List[Dict]:
+    """A three-task cycle, one task blocked on it, and a RING-long cycle."""
+    tasks = [
+        {"id": "C-1", "title": "Cycle one", "status": "TODO", "depends_on": ["C-2"]},
+        {"id": "C-2", "title": "Cycle two", "status": "TODO", "depends_on": ["C-3"]},
+        {"id": "C-3", "title": "Cycle three", "status": "TODO", "depends_on": ["C-1"]},
+        {"id": "C-4", "title": "Blocked on the cycle", "status": "TODO", "depends_on": ["C-1"]},
+    ]
+    tasks.extend(
+        {"id": f"R-{index:06d}", "title": f"Ring {index}", "status": "TODO", "depends_on": [f"R-{(index + 1) % RING:06d}"]}
+        for index in range(RING)
+    )
+    return tasks
+
+
+class DependencyStateTest(unittest.TestCase):
+    def test_long_chain_and_cycles(self) -> None:
+        tasks_by_id = {task["id"]: task for task in chain_tasks() + cycle_tasks()}
+        state, warnings = agentctl_core.compute_dependency_state(tasks_by_id)
+
+        self.assertEqual(
+            warnings,
+            [
+                "Dependency cycle detected: C-1 -> C-2 -> C-3 -> C-1",
+                "Dependency cycle detected: R-000000 -> " + " -> ".join(f"R-{index:06d}" for index in range(1, RING)) + " -> R-000000",
+            ],
+        )
+        ready = [task_id for task_id, info in state.items() if not info["missing"] and not info["incomplete"] and tasks_by_id[task_id]["status"] != "DONE"]
+        self.assertEqual(ready, [chain_id(DONE + 1)])
+        self.assertEqual(state[chain_id(DONE + 2)]["incomplete"], [chain_id(DONE + 1)])
+        self.assertEqual(state[chain_id(CHAIN)]["incomplete"], [chain_id(CHAIN - 1)])
+        self.assertEqual(state["C-4"]["incomplete"], ["C-1"])
+
+    def test_components(self) -> None:
+        edges = {chain_id(index): [chain_id(index - 1)] if index > 1 else [] for index in range(CHAIN, 0, -1)}
+        edges[chain_id(1)] = [chain_id(CHAIN)]  # close the chain into one big cycle
+        components = agentctl_core.strongly_connected_components(edges)
+        self.assertEqual([len(component) for component in components], [CHAIN])
+
+
+class DependencyCliTest(WorkspaceTestCase):
+    def make_tasks(self) -> List[Dict]:
+        return chain_tasks() + cycle_tasks()[:4]
+
+    def test_lint_next_and_ready(self) -> None:
+        lint = self.agentctl("task", "lint", check=False)
+        self.assertIn("Dependency cycle detected: C-1 -> C-2 -> C-3 -> C-1", lint.stdout + lint.stderr)
+        self.assertNotIn("RecursionError", lint.stderr)
+
+        listed = self.agentctl("task", "next", "--quiet").stdout.splitlines()
+        self.assertEqual([line.split(" ", 1)[0] for line in listed], [chain_id(DONE + 1)])
+
+        self.assertEqual(self.agentctl("ready", chain_id(DONE + 1), check=False).returncode, 0)
+        blocked = self.agentctl("ready", chain_id(DONE + 2), check=False)
+        self.assertEqual(blocked.returncode, 2)
+        self.assertIn(chain_id(DONE + 1), blocked.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""`guard suggest-allow --max-prefixes`: PrefixTrie matches path_is_under, and covers are safe and tightest."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import itertools
+import random
+import subprocess
+import unittest
+from typing import List, Optional, Sequence, Set
+
+from helpers import WorkspaceTestCase
+
+import agentctl_core
+
+COMPONENTS = ("a", "b", "ab", "src", "src.py")
+
+
+def random_path(rng: random.Random, depth: int) -> str:
+    return "/".join(rng.choice(COMPONENTS) for _ in range(depth))
+
+
+def ancestors(path: str) -> List[str]:
+    parts = path.split("/")
+    return ["/".join(parts[: depth + 1]) for depth in range(len(parts))]
+
+
+def admitted(prefixes: Sequence[str], tracked: Sequence[str]) -> int:
+    trie = agentctl_core.PrefixTrie(prefixes)
+    return sum(1 for path in tracked if trie.covers(path))
+
+
+def brute_force(staged: List[str], unstaged_only: Set[str], tracked: List[str], limit: int) -> Optional[int]:
+    """Fewest tracked files admitted by any safe cover of at most limit prefixes (None when there is none)."""
+    candidates = sorted(
+        {
+            prefix
+            for path in staged
+            for prefix in ancestors(path)
+            if not any(agentctl_core.path_is_under(other, prefix) for other in unstaged_only)
+        }
+    )
+    best: Optional[int] = None
+    for size in range(1, limit + 1):
+        for cover in itertools.combinations(candidates, size):
+            trie = agentctl_core.PrefixTrie(cover)
+            if all(trie.covers(path) for path in staged):
+                cost = admitted(cover, tracked)
+                best = cost if best is None else min(best, cost)
+    return best
+
+
+def smallest_cover(staged: List[str], unstaged_only: Set[str]) -> int:
+    limit = 1
+    while brute_force(staged, unstaged_only, staged, limit) is None:
+        limit += 1
+    return limit
+
+
+class PrefixTrieTest(unittest.TestCase):
+    def test_matches_path_is_under(self) -> None:
+        rng = random.Random(7)
+        decorations = ("{}", "./{}", "{}/", " {} ", "/{}")
+        for _ in range(300):
+            prefixes = [rng.choice(decorations).format(random_path(rng, rng.randint(0, 3))) for _ in range(rng.randint(0, 4))]
+            trie = agentctl_core.PrefixTrie(prefixes)
+            for _ in range(20):
+                path = rng.choice(decorations).format(random_path(rng, rng.randint(0, 4)))
+                expected = any(agentctl_core.path_is_under(path, prefix) for prefix in prefixes)
+                self.assertEqual(trie.covers(path), expected, (path, prefixes))
+
+
+class CompactAllowPrefixesTest(unittest.TestCase):
+    def test_covers_are_safe_and_admit_the_fewest_files(self) -> None:
+        rng = random.Random(11)
+        checked = refused = 0
+        for _ in range(150):
+            tracked = sorted({random_path(rng, rng.randint(1, 3)) for _ in range(rng.randint(3, 12))})
+            tracked = [path for path in tracked if not any(other.startswith(path + "/") for other in tracked)]
+            staged = rng.sample(tracked, rng.randint(1, min(4, len(tracked))))
+            rest = [path for path in tracked if path not in staged]
+            unstaged = rng.sample(rest, rng.randint(0, min(2, len(rest)))) + rng.sample(staged, rng.randint(0, 1))
+            unstaged_only = set(unstaged) - set(staged)
+            limit = rng.randint(1, 4)
+            expected = brute_force(staged, unstaged_only, tracked, limit)
+            stderr = io.StringIO()
+            with self.subTest(staged=staged, unstaged=unstaged, tracked=tracked, limit=limit):
+                if expected is None:
+                    with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as raised:
+                        agentctl_core.compact_allow_prefixes(staged, unstaged, tracked, limit)
+                    self.assertEqual(raised.exception.code, 2)
+                    self.assertIn(f"at least {smallest_cover(staged, unstaged_only)} prefix(es)", stderr.getvalue())
+                    refused += 1
+                    continue
+                cover = agentctl_core.compact_allow_prefixes(staged, unstaged, tracked, limit)
+                self.assertLessEqual(len(cover), limit)
+                trie = agentctl_core.PrefixTrie(cover)
+                self.assertTrue(all(trie.covers(path) for path in staged))
+                self.assertFalse([path for path in unstaged_only if trie.covers(path)])
+                self.assertEqual(admitted(cover, tracked), expected)
+                checked += 1
+        self.assertGreater(checked, 50)
+        self.assertGreater(refused, 5)
+
+
+class SuggestAllowCommandTest(WorkspaceTestCase):
+    tasks = 5
+
+    def git(self, *argv: str) -> None:
+        subprocess.run(["git", *argv], cwd=self.root, check=True, capture_output=True)
+
+    def test_refusal_names_the_smallest_prefix_count(self) -> None:
+        for path in ("docs/guide.md", "docs/notes.md", "lib/core.py", "lib/util.py", "app/main.py"):
+            (self.root / path).parent.mkdir(exist_ok=True)
+            (self.root / path).write_text("one\n", encoding="utf-8")
+        self.git("add", "docs", "lib", "app")
+        self.git("-c", "user.name=t", "-c", "user.email=t@localhost", "commit", "-q", "-m", "files")
+        for path in ("docs/guide.md", "lib/core.py", "app/main.py", "lib/util.py"):
+            (self.root / path).write_text("two\n", encoding="utf-8")
+        self.git("add", "docs/guide.md", "lib/core.py", "app/main.py")  # lib/util.py stays unstaged
+
+        refused = self.agentctl("guard", "suggest-allow", "--max-prefixes", "2", check=False)
+        self.assertEqual(refused.returncode, 2)
+        self.assertIn("need at least 3 prefix(es)", refused.stderr)
+        for limit in ("3", "4"):  # docs would also admit docs/notes.md; app ties with app/main.py, deeper wins
+            suggested = self.agentctl("guard", "suggest-allow", "--max-prefixes", limit).stdout.split()
+            self.assertEqual(suggested, ["app/main.py", "docs/guide.md", "lib/core.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
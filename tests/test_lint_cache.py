@@ -0,0 +1,87 @@
+"""Incremental `task lint` (.agentctl/lint.cache) must report exactly what an uncached lint does."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from typing import Callable, List, Tuple
+
+from helpers import WorkspaceTestCase
+
+
+class LintCacheTest(WorkspaceTestCase):
+    tasks = 40
+
+    def lint(self, **env: str) -> Tuple[int, str, str, bool]:
+        """(exit code, stdout, stderr, whether the incremental path ran)."""
+        with tempfile.TemporaryDirectory() as scratch:
+            trace = os.path.join(scratch, "trace.jsonl")
+            proc = self.agentctl("task", "lint", check=False, env=self.env(AGENTCTL_TRACE=trace, **env))
+            with open(trace, encoding="utf-8") as handle:
+                spans = [json.loads(line)["name"] for line in handle]
+        return proc.returncode, proc.stdout, proc.stderr, "lint changed tasks" in spans
+
+    def assert_lint_matches_uncached(self, name: str, *, incremental: bool) -> None:
+        expected = self.lint(AGENTCTL_NO_CACHE="1")[:3]
+        for attempt in range(2):  # the first run may rebuild the cache, the second reads it
+            code, stdout, stderr, used_cache = self.lint()
+            with self.subTest(mutation=name, attempt=attempt):
+                self.assertEqual((code, stdout, stderr), expected)
+        if incremental:
+            self.assertTrue(used_cache, f"{name}: lint did not use its cache")
+
+    def manual_edit(self) -> None:
+        text = self.tasks_path.read_text(encoding="utf-8")
+        self.tasks_path.write_text(text.replace('"T-000039"', '"T-000039", "edited": true', 1), encoding="utf-8")
+
+    def test_cached_lint_matches_uncached_after_each_mutation(self) -> None:
+        doing = next(task["id"] for task in self.load_tasks_json()["tasks"] if task["status"] == "TODO")
+        mutations: List[Tuple[str, Callable[[], object], bool]] = [
+            ("comment", lambda: self.agentctl("task", "comment", "T-000020", "--author", "CODER", "--body", "note"), True),
+            ("status change", lambda: self.agentctl("task", "set-status", doing, "DOING", "--force"), True),
+            ("self dependency", lambda: self.agentctl("task", "update", "T-000035", "--depends-on", "T-000035"), True),
+            ("cycle", lambda: self.agentctl("task", "update", "T-000031", "--depends-on", "T-000035"), True),
+            ("cycle closed", lambda: self.agentctl("task", "update", "T-000035", "--depends-on", "T-000031"), True),
+            ("missing dependency", lambda: self.agentctl("task", "update", "T-000036", "--depends-on", "T-999999"), True),
+            ("unknown owner", lambda: self.agentctl("task", "update", "T-000037", "--owner", "NOBODY"), True),
+            (
+                "add",
+                lambda: self.agentctl(
+                    "task", "add", "T-000041", "--title", "Added", "--description", "Added task.",
+                    "--priority", "med", "--owner", "CODER", "--depends-on", "T-000036",
+                ),
+                True,
+            ),
+            (
+                "fix dependencies",
+                lambda: [
+                    self.agentctl("task", "update", task_id, "--replace-depends-on")
+                    for task_id in ("T-000031", "T-000035", "T-000036")
+                ],
+                True,
+            ),
+            (
+                "journal",
+                lambda: self.agentctl(
+                    "task", "comment", "T-000021", "--author", "CODER", "--body", "journaled", env=self.env(AGENTCTL_JOURNAL="1")
+                ),
+                False,
+            ),
+            ("compact", lambda: self.agentctl("task", "compact"), True),
+            ("archive", lambda: self.agentctl("task", "archive", "--before", "T-000010"), False),
+            ("manual edit", self.manual_edit, False),
+        ]
+        self.assert_lint_matches_uncached("initial", incremental=False)
+        for name, mutate, incremental in mutations:
+            mutate()
+            self.assert_lint_matches_uncached(name, incremental=incremental)
+
+        code, _, stderr, _ = self.lint()
+        self.assertEqual(code, 2)
+        self.assertIn("manual edit", stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
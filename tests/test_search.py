@@ -0,0 +1,82 @@
+"""Indexed `task search` must find what the substring search finds, honouring punctuation in the query."""
+
+from __future__ import annotations
+
+import unittest
+from typing import Set
+
+from helpers import WorkspaceTestCase
+
+import agentctl_core
+
+
+class SearchSubstringTest(WorkspaceTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.agentctl(
+            "task", "add", "T-900001",
+            "--title", "Rework agentctl shard loading",
+            "--description", "Multi-agent handoff via tasks.json.",
+            "--priority", "med",
+            "--owner", "CODER",
+        )
+        self.agentctl(
+            "task", "add", "T-900002",
+            "--title", "Copy agentctl helpers",
+            "--description", "Happy path, copied tooling.",
+            "--priority", "med",
+            "--owner", "CODER",
+        )
+
+    def search(self, query: str) -> Set[str]:
+        out = self.agentctl("task", "search", "--", query).stdout
+        return {line.split(" ", 1)[0] for line in out.splitlines() if line.strip()}
+
+    def substring_hits(self, query: str) -> Set[str]:
+        q = query.lower()
+        return {task["id"] for task in self.load_tasks_json()["tasks"] if q in agentctl_core._task_text_blob(task).lower()}
+
+    def test_mid_word_queries_match(self) -> None:
+        for query in ("gentctl", "hard load", "agent hand", "s.js"):
+            with self.subTest(query=query):
+                self.assertIn("T-900001", self.search(query))
+
+    def test_index_covers_substring_matches(self) -> None:
+        for query in ("sync", "ync", "T-0000", "ctl sh", "-agent h", "ks.js"):
+            with self.subTest(query=query):
+                expected = self.substring_hits(query)
+                self.assertTrue(expected)
+                self.assertLessEqual(expected, self.search(query))
+
+    def test_punctuation_in_the_query_anchors_words(self) -> None:
+        self.assertIn("T-900002", self.search("agentctl"))
+        self.assertIn("T-900002", self.search("py"))
+        self.assertNotIn("T-900002", self.search("agentctl.py"))
+        self.assertNotIn("T-900002", self.search("tl.py"))
+        self.assertIn("T-900001", self.search("tasks.json"))
+        self.assertNotIn("T-900001", self.search("tasks.jsonl"))
+
+    def test_archived_matcher_agrees_with_the_index(self) -> None:
+        tasks = self.load_tasks_json()["tasks"]
+        for query in ("gentctl", "agentctl.py", "s.js", "-agent h", "py", "T-0000"):
+            with self.subTest(query=query):
+                match = agentctl_core.search_text_matcher(query)
+                self.assertEqual({task["id"] for task in tasks if match(task)}, self.search(query))
+
+    def test_index_follows_edits(self) -> None:
+        self.assertEqual(self.search("kkafi"), set())
+        self.agentctl("task", "update", "T-900001", "--title", "Quokkafish shard loading")
+        self.assertEqual(self.search("kkafi"), {"T-900001"})
+        self.agentctl("task", "update", "T-900001", "--title", "Rework shard loading")
+        self.assertEqual(self.search("kkafi"), set())
+        self.assertEqual(self.search("quokkafish"), set())
+        self.agentctl("task", "update", "T-900002", "--title", "Wombatquokka helpers")
+        self.assertEqual(self.search("batquo"), {"T-900002"})
+        self.assertIn("T-900001", self.search("ework"))
+
+    def test_no_match(self) -> None:
+        self.assertEqual(self.search("zzqqxx"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
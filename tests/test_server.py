@@ -0,0 +1,118 @@
+"""`agentctl serve` must survive misbehaving clients, and clients must not hang on a stuck server."""
+
+from __future__ import annotations
+
+import json
+import socket
+import subprocess
+import sys
+import time
+import unittest
+from typing import Dict, List
+
+from helpers import WorkspaceTestCase
+
+
+class ServerTest(WorkspaceTestCase):
+    tasks = 20
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.socket_path = self.root / ".agentctl" / "test.sock"
+        self.server = subprocess.Popen(
+            [sys.executable, "scripts/agentctl.py", "serve", "--quiet", "--socket", str(self.socket_path)],
+            cwd=self.root,
+            env=self.client_env(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        self.addCleanup(self.stop_server)
+        deadline = time.monotonic() + 10
+        while not self.socket_path.exists():
+            self.assertIsNone(self.server.poll(), "agentctl serve exited during start-up")
+            self.assertLess(time.monotonic(), deadline, "agentctl serve did not start")
+            time.sleep(0.05)
+
+    def stop_server(self) -> None:
+        if self.server.poll() is None:
+            self.server.terminate()
+        self.server_log = self.server.communicate(timeout=10)[1]
+
+    def client_env(self, **extra: str) -> Dict[str, str]:
+        env = self.env(AGENTCTL_SOCKET=str(self.socket_path), **extra)
+        env.pop("AGENTCTL_NO_SERVER", None)
+        return env
+
+    def raw_client(self, argv: List[str]) -> socket.socket:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(str(self.socket_path))
+        conn.sendall(json.dumps({"argv": argv, "cwd": str(self.root), "env": {}}).encode("utf-8") + b"\n")
+        return conn
+
+    def assert_serving(self) -> None:
+        self.assertIsNone(self.server.poll(), "agentctl serve died")
+        listed = self.agentctl("task", "list", env=self.client_env()).stdout
+        self.assertIn("T-000020", listed)
+        self.assertIsNone(self.server.poll(), "agentctl serve died")
+
+    def test_client_closing_before_go_does_not_run_the_command(self) -> None:
+        self.raw_client(["task", "comment", "T-000001", "--author", "CODER", "--body", "never"]).close()
+        self.assert_serving()
+        comments = self.load_tasks_json()["tasks"][0].get("comments") or []
+        self.assertNotIn("never", [comment["body"] for comment in comments])
+
+    def test_client_disconnecting_before_the_reply(self) -> None:
+        for _ in range(3):
+            conn = self.raw_client(["task", "list"])
+            self.assertEqual(conn.recv(16), b"ready\n")
+            conn.sendall(b"go\n")
+            conn.close()
+        self.assert_serving()
+        self.stop_server()
+        self.assertIn("BrokenPipeError", self.server_log)
+
+    def test_stalled_client_does_not_block_others(self) -> None:
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stalled.connect(str(self.socket_path))  # sends nothing: the server waits on it until its timeout
+        self.addCleanup(stalled.close)
+        started = time.monotonic()
+        proc = subprocess.run(
+            [sys.executable, "scripts/agentctl.py", "task", "show", "T-000001"],
+            cwd=self.root,
+            env=self.client_env(AGENTCTL_SERVER_TIMEOUT="0.5"),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertIn("T-000001", proc.stdout)
+        self.assertLess(time.monotonic() - started, 10)
+        self.assert_serving()
+        self.stop_server()
+        self.assertIn("dropped a client connection", self.server_log)
+
+    def test_forwarded_write(self) -> None:
+        self.agentctl("task", "comment", "T-000002", "--author", "CODER", "--body", "via server", env=self.client_env())
+        comments = self.load_tasks_json()["tasks"][1].get("comments") or []
+        self.assertIn("via server", [comment["body"] for comment in comments])
+        self.assert_serving()
+
+    def test_forwarded_call_does_not_import_the_core(self) -> None:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "scripts/agentctl.py", "task", "list"],
+            cwd=self.root,
+            env=self.client_env(),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertIn("T-000020", proc.stdout)
+        self.assertNotIn("agentctl_core", proc.stderr)
+        local = self.agentctl("task", "list", env=self.env()).stdout
+        self.assertEqual(proc.stdout, local)
+
+
+if __name__ == "__main__":
+    unittest.main()
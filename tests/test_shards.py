@@ -0,0 +1,91 @@
+"""Sharded layout: enabled only by `task shard`'s marker, and one malformed shard does not break reads."""
+
+from __future__ import annotations
+
+import json
+import unittest
+
+from helpers import WorkspaceTestCase
+
+BAD_ID = "T-000005"
+
+
+class ShardLayoutTest(WorkspaceTestCase):
+    tasks = 20
+
+    def test_unrelated_tasks_dir_is_not_the_task_source(self) -> None:
+        (self.root / "tasks").mkdir()
+        (self.root / "tasks" / "notes.json").write_text("{}\n", encoding="utf-8")
+        listed = self.agentctl("task", "list").stdout.splitlines()
+        self.assertEqual(len(listed), self.tasks)
+        refused = self.agentctl("task", "shard", check=False)
+        self.assertEqual(refused.returncode, 1)
+        self.assertIn("not an agentctl shard directory", refused.stderr)
+
+    def test_shard_writes_marker_and_shard_algo(self) -> None:
+        self.agentctl("task", "shard")
+        marker = json.loads((self.root / "tasks" / ".agentctl-shards").read_text(encoding="utf-8"))
+        self.assertEqual(marker["checksum_algo"], "sha256-task")
+        shard = json.loads((self.root / "tasks" / "T-000001.json").read_text(encoding="utf-8"))
+        self.assertEqual(shard["meta"]["checksum_algo"], "sha256-task")
+        self.assertNotEqual(shard["meta"]["checksum_algo"], self.load_tasks_json()["meta"]["checksum_algo"])
+        self.assertIn("OK", self.agentctl("task", "lint").stdout)
+
+    def test_lint_checks_each_shard_against_its_checksum(self) -> None:
+        self.agentctl("task", "shard")
+        path = self.root / "tasks" / "T-000003.json"
+        shard = json.loads(path.read_text(encoding="utf-8"))
+        shard["task"]["title"] = "Edited by hand"
+        path.write_text(json.dumps(shard, indent=2) + "\n", encoding="utf-8")
+        lint = self.agentctl("task", "lint", check=False, env=self.env(AGENTCTL_NO_CACHE="1"))
+        self.assertNotEqual(lint.returncode, 0)
+        self.assertIn("T-000003: content does not match its recorded hash", lint.stdout + lint.stderr)
+
+        path.write_text(json.dumps(dict(shard, task=self.load_tasks_json()["tasks"][2]), indent=2) + "\n", encoding="utf-8")
+        self.agentctl("task", "render")
+        self.assertEqual(list(self.load_tasks_json()["meta"]), ["schema_version", "managed_by", "checksum_algo", "checksum"])
+
+
+class MalformedShardTest(WorkspaceTestCase):
+    tasks = 20
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.agentctl("task", "shard")
+        self.bad_path = self.root / "tasks" / f"{BAD_ID}.json"
+        self.bad_path.write_text('{"task": \n', encoding="utf-8")
+
+    def test_reads_skip_and_report_the_bad_shard(self) -> None:
+        listed = self.agentctl("task", "list")
+        ids = [line.split(" ", 1)[0] for line in listed.stdout.splitlines()]
+        self.assertEqual(len(ids), self.tasks - 1)
+        self.assertNotIn(BAD_ID, ids)
+        self.assertIn(f"tasks/{BAD_ID}.json: invalid JSON", listed.stderr)
+
+        self.assertIn("T-000006", self.agentctl("task", "show", "T-000006").stdout)
+        self.agentctl("task", "search", "--", "T-0000")
+        self.agentctl("task", "next")
+
+    def test_lint_reports_it(self) -> None:
+        lint = self.agentctl("task", "lint", check=False)
+        self.assertNotEqual(lint.returncode, 0)
+        self.assertIn(f"tasks/{BAD_ID}.json: invalid JSON", lint.stdout + lint.stderr)
+
+    def test_wrong_algo_is_malformed(self) -> None:
+        good = self.root / "tasks" / "T-000006.json"
+        shard = json.loads(good.read_text(encoding="utf-8"))
+        shard["meta"]["checksum_algo"] = "sha256"
+        good.write_text(json.dumps(shard), encoding="utf-8")
+        lint = self.agentctl("task", "lint", check=False)
+        self.assertIn("tasks/T-000006.json: meta.checksum_algo must be 'sha256-task'", lint.stdout + lint.stderr)
+
+    def test_writes_refuse_and_keep_the_bad_shard(self) -> None:
+        before = {path.name: path.read_bytes() for path in (self.root / "tasks").iterdir()}
+        write = self.agentctl("task", "comment", "T-000001", "--author", "CODER", "--body", "not while a shard is broken", check=False)
+        self.assertEqual(write.returncode, 2)
+        self.assertIn("malformed shard", write.stderr)
+        self.assertEqual({path.name: path.read_bytes() for path in (self.root / "tasks").iterdir()}, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Cold-start budget: `agentctl task list` stays cheap and read commands skip the lazily imported modules."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+import unittest
+from typing import Dict, List, Tuple
+
+from helpers import SCRIPTS_DIR, WorkspaceTestCase
+
+# Imported inside the functions that need them; a module-level import of any of these
+# is a start-up regression for every command.
+LAZY_MODULES = (
+    "bisect",
+    "concurrent.futures",
+    "datetime",
+    "hashlib",
+    "shlex",
+    "signal",
+    "socket",
+    "sqlite3",
+    "subprocess",
+    "tempfile",
+    "threading",
+    "traceback",
+)
+# Best-of-N wall time of a cached `task list` beyond bare interpreter start-up; generous so slow CI machines pass.
+STARTUP_BUDGET_MS = float(os.environ.get("AGENTCTL_STARTUP_BUDGET_MS") or 150)
+STARTUP_RUNS = 5
+
+
+def import_times(argv: List[str], *, cwd: str, env: Dict[str, str]) -> Dict[str, Tuple[int, int]]:
+    """Module -> (self us, cumulative us) from `python -X importtime argv`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode not in (0, 2):
+        raise AssertionError(f"{argv} exited with {proc.returncode}:\n{proc.stderr}")
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        if self_us.isdigit() and cumulative_us.isdigit():
+            times[name] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def best_wall_ms(argv: List[str], *, cwd: str, env: Dict[str, str]) -> float:
+    runs = []
+    for _ in range(STARTUP_RUNS):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *argv], cwd=cwd, env=env, capture_output=True, check=True)
+        runs.append(time.perf_counter() - started)
+    return min(runs) * 1000
+
+
+def lazy_imports(argv: List[str], *, cwd: str, env: Dict[str, str]) -> List[str]:
+    """LAZY_MODULES that `python argv` imports beyond what the bare interpreter (site, sitecustomize) already does."""
+    preloaded = import_times(["-c", "pass"], cwd=cwd, env=env)
+    return sorted(set(LAZY_MODULES) & (set(import_times(argv, cwd=cwd, env=env)) - set(preloaded)))
+
+
+class StartupTest(WorkspaceTestCase):
+    tasks = 50
+
+    def test_startup_budget(self) -> None:
+        self.agentctl("task", "list")  # warm the caches
+        interpreter = best_wall_ms(["-c", "pass"], cwd=str(self.root), env=self.env())
+        command = best_wall_ms(["scripts/agentctl.py", "task", "list"], cwd=str(self.root), env=self.env())
+        self.assertLess(command - interpreter, STARTUP_BUDGET_MS, f"task list: {command:.1f} ms, bare python: {interpreter:.1f} ms")
+
+    def test_import_skips_lazy_modules(self) -> None:
+        self.assertEqual(lazy_imports(["-c", "import agentctl_core"], cwd=str(SCRIPTS_DIR), env=self.env()), [])
+
+    def test_cached_read_commands_skip_lazy_modules(self) -> None:
+        for argv in (["task", "list"], ["task", "show", "T-000001"], ["task", "next"], ["ready", "T-000001"]):
+            with self.subTest(argv=argv):
+                self.agentctl(*argv, check=False)  # warm the caches
+                self.assertIn("agentctl_core", import_times(["scripts/agentctl.py", *argv], cwd=str(self.root), env=self.env()))
+                self.assertEqual(lazy_imports(["scripts/agentctl.py", *argv], cwd=str(self.root), env=self.env()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+""".github/scripts/sync_tasks.py against a local stand-in for the GitHub API (tests/fake_github.py)."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, List
+
+from fake_github import OWNER, FakeGitHub
+from helpers import ROOT
+
+SYNC_SCRIPT = ROOT / ".github" / "scripts" / "sync_tasks.py"
+
+
+def make_tasks(count: int) -> List[Dict]:
+    return [
+        {
+            "id": f"T-{index:03d}",
+            "title": f"Task {index}",
+            "description": f"Description {index}.",
+            "status": ("TODO", "DOING", "BLOCKED", "DONE")[index % 4],
+            "priority": "med",
+            "owner": "CODER",
+            "tags": ["sync"],
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+@unittest.skipUnless(importlib.util.find_spec("requests"), "sync_tasks.py needs requests")
+class SyncTasksTestCase(unittest.TestCase):
+    """A scratch repo root holding tasks.json and a copy of sync_tasks.py, plus a fake GitHub."""
+
+    def setUp(self) -> None:
+        scratch = tempfile.TemporaryDirectory(prefix="sync-tasks-test-")
+        self.addCleanup(scratch.cleanup)
+        self.root = Path(scratch.name)
+        (self.root / ".github" / "scripts").mkdir(parents=True)
+        shutil.copy2(SYNC_SCRIPT, self.root / ".github" / "scripts" / SYNC_SCRIPT.name)
+        self.state_path = self.root / ".tasks-sync-state.json"
+        self.github = FakeGitHub()
+        self.github.start()
+        self.addCleanup(self.github.stop)
+
+    def write_tasks(self, tasks: List[Dict]) -> None:
+        self.tasks = tasks
+        (self.root / "tasks.json").write_text(json.dumps({"tasks": tasks}, indent=2) + "\n", encoding="utf-8")
+
+    def sync(self, *argv: str) -> subprocess.CompletedProcess:
+        env = {key: value for key, value in os.environ.items() if not key.startswith("GITHUB_")}
+        env.update(self.github.env())
+        proc = subprocess.run(
+            [sys.executable, str(self.root / ".github" / "scripts" / SYNC_SCRIPT.name), *argv],
+            cwd=self.root,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        if proc.returncode != 0:
+            self.fail(f"sync_tasks.py exited with {proc.returncode}:\n{proc.stdout}{proc.stderr}")
+        return proc
+
+    def state(self) -> Dict[str, Dict]:
+        return json.loads(self.state_path.read_text(encoding="utf-8"))["tasks"]
+
+
+class PrefetchPaginationTest(SyncTasksTestCase):
+    TASKS = 230
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.write_tasks(make_tasks(self.TASKS))
+        github = self.github
+        # Issues created elsewhere (no sync state yet), mixed with a pull request and an unrelated issue,
+        # and project items for them mixed with drafts and another repo's items: 3 pages of each.
+        for task in self.tasks:
+            if task["id"] == "T-100":
+                github.add_issue(None, pull_request=True)
+                github.add_issue(None)
+            issue = github.add_issue(task["id"])
+            if task["id"] == "T-050":
+                github.add_item(None)
+                github.add_item(issue["number"], repo=f"{OWNER}/other-repo")
+            if task["id"] != "T-200":
+                github.add_item(issue["number"])
+
+    def test_first_sync_finds_issues_and_items_on_every_page(self) -> None:
+        self.sync()
+        github = self.github
+
+        self.assertEqual(github.issue_pages, [1, 2, 3])
+        self.assertEqual(github.item_cursors, [None, "cursor-100", "cursor-200"])
+        kinds = github.kinds()
+        self.assertNotIn("create issue", kinds)
+        self.assertEqual(kinds.count("update issue"), self.TASKS)
+        self.assertEqual(kinds.count("add item"), 1)  # only T-200 was not in the project yet
+        self.assertEqual(kinds.count("set status"), self.TASKS)
+
+        state = self.state()
+        for task in self.tasks:
+            issue = github.issues[state[task["id"]]["issue"]]
+            self.assertEqual(issue["title"], f"[{task['id']}] {task['title']}")
+            self.assertEqual(issue["state"], "closed" if task["status"] == "DONE" else "open")
+            item = github.item_for(issue["number"])
+            self.assertIsNotNone(item)
+            self.assertEqual(state[task["id"]]["item"], item["id"])
+            self.assertEqual(item["status"], task["status"])
+
+
+class IncrementalSyncTest(SyncTasksTestCase):
+    """After a first sync, a run only spends requests on the tasks that changed."""
+
+    TASKS = 5
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.write_tasks(make_tasks(self.TASKS))
+        self.sync()
+        self.sync()  # issues are created open; the second run closes the DONE task's
+        self.github.reset_log()
+
+    def test_unchanged_tasks_cost_no_requests(self) -> None:
+        self.sync()
+        self.assertEqual(self.github.kinds(), [])
+
+    def test_title_edit_costs_one_update(self) -> None:
+        self.tasks[1]["title"] = "Renamed"
+        self.write_tasks(self.tasks)
+        self.sync()
+        self.assertEqual(self.github.kinds(), ["project fields", "update issue"])
+        issue = self.github.issues[self.state()["T-002"]["issue"]]
+        self.assertEqual(issue["title"], "[T-002] Renamed")
+
+    def test_status_change_updates_issue_and_project_status(self) -> None:
+        self.tasks[0]["status"] = "DONE"
+        self.write_tasks(self.tasks)
+        self.sync()
+        self.assertEqual(self.github.kinds(), ["project fields", "update issue", "set status"])
+        self.assertEqual(self.github.item_for(self.state()["T-001"]["issue"])["status"], "DONE")
+
+    def test_deleted_issue_falls_back_to_the_listing(self) -> None:
+        old_number = self.state()["T-002"]["issue"]
+        del self.github.issues[old_number]
+        self.tasks[1]["title"] = "Recreated"
+        self.write_tasks(self.tasks)
+        self.sync()
+        self.assertEqual(
+            self.github.kinds(),
+            ["project fields", "update issue", "list issues", "list items", "create issue", "add item", "set status"],
+        )
+        entry = self.state()["T-002"]
+        self.assertNotEqual(entry["issue"], old_number)
+        issue = self.github.issues[entry["issue"]]
+        self.assertEqual(issue["title"], "[T-002] Recreated")
+        self.assertEqual(entry["item"], self.github.item_for(issue["number"])["id"])
+        self.assertEqual(self.github.item_for(issue["number"])["status"], self.tasks[1]["status"])
+
+        self.github.reset_log()
+        self.sync()
+        self.assertEqual(self.github.kinds(), [])
+
+    def test_transferred_issue_is_not_followed(self) -> None:
+        old_number = self.state()["T-002"]["issue"]
+        moved = self.github.issues.pop(old_number)
+        self.github.moved[old_number] = f"{OWNER}/other-repo"
+        self.tasks[1]["title"] = "Recreated"
+        self.write_tasks(self.tasks)
+        self.sync()
+        self.assertEqual(self.github.kinds().count("update issue"), 1)
+        self.assertIn("create issue", self.github.kinds())
+        self.assertEqual(moved["title"], "[T-002] Task 2")
+        self.assertNotEqual(self.state()["T-002"]["issue"], old_number)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""SQLite index (AGENTCTL_SQLITE=1): `task export` round-trips tasks.json and queries match the file-backed ones."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from typing import Callable, List, Tuple
+
+from helpers import WorkspaceTestCase
+
+import agentctl_core
+
+QUERIES: Tuple[Tuple[str, ...], ...] = (
+    ("task", "list"),
+    ("task", "list", "--status", "TODO", "--status", "BLOCKED"),
+    ("task", "list", "--owner", "CODER", "--tag", "api"),
+    ("task", "list", "--tag", "sqlite"),
+    ("task", "next"),
+    ("task", "next", "--owner", "TESTER", "--limit", "3"),
+    ("task", "next", "--status", "DOING", "--tag", "perf"),
+)
+
+
+class TaskDbTest(WorkspaceTestCase):
+    tasks = 60
+
+    def sqlite(self, *argv: str, check: bool = True):
+        return self.agentctl(*argv, check=check, env=self.env(AGENTCTL_SQLITE="1"))
+
+    def assert_export_matches(self, name: str) -> None:
+        exported = self.root / "exported.json"
+        self.sqlite("task", "export", "--output", str(exported))
+        with self.subTest(mutation=name):
+            self.assertEqual(exported.read_bytes(), self.tasks_path.read_bytes())
+            data = json.loads(exported.read_text(encoding="utf-8"))
+            hashes = [agentctl_core.compute_task_hash(task) for task in data["tasks"]]
+            self.assertEqual(data["meta"]["checksum"], agentctl_core.compute_root_checksum(hashes))
+
+    def assert_queries_match(self, name: str) -> None:
+        open_ids = [task["id"] for task in self.load_tasks_json()["tasks"] if task["status"] != "DONE"]
+        for argv in QUERIES + tuple(("ready", task_id) for task_id in open_ids[::5]):
+            expected = self.agentctl(*argv, check=False)
+            got = self.sqlite(*argv, check=False)
+            with self.subTest(mutation=name, argv=argv):
+                self.assertEqual((got.returncode, got.stdout, got.stderr), (expected.returncode, expected.stdout, expected.stderr))
+
+    def test_export_and_queries_follow_mutations(self) -> None:
+        todo = [task["id"] for task in self.load_tasks_json()["tasks"] if task["status"] == "TODO"]
+        mutations: List[Tuple[str, Callable[[], object]]] = [
+            ("comment", lambda: self.sqlite("task", "comment", "T-000050", "--author", "CODER", "--body", "indexed")),
+            ("status", lambda: self.sqlite("task", "set-status", todo[0], "DOING", "--force")),
+            ("retag", lambda: self.sqlite("task", "update", todo[1], "--tag", "sqlite", "--owner", "TESTER")),
+            ("depends_on", lambda: self.sqlite("task", "update", todo[2], "--depends-on", todo[3])),
+            (
+                "add",
+                lambda: self.sqlite(
+                    "task", "add", "T-000061", "--title", "Indexed add", "--description", "Added with the index on.",
+                    "--priority", "high", "--owner", "CODER", "--tag", "sqlite", "--depends-on", todo[0],
+                ),
+            ),
+            ("without the index", lambda: self.agentctl("task", "update", todo[4], "--tag", "sqlite")),
+            (
+                "journal then compact",
+                lambda: [
+                    self.agentctl("task", "comment", todo[5], "--author", "CODER", "--body", "journaled", env=self.env(AGENTCTL_JOURNAL="1")),
+                    self.sqlite("task", "compact"),
+                ],
+            ),
+        ]
+        self.assert_export_matches("initial")
+        self.assert_queries_match("initial")
+        for name, mutate in mutations:
+            mutate()
+            self.assert_export_matches(name)
+            self.assert_queries_match(name)
+
+
+if __name__ == "__main__":
+    unittest.main()
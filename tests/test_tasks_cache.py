@@ -0,0 +1,85 @@
+"""The parsed-tasks sidecar cache (.agentctl/tasks.cache) must never outlive an external edit of tasks.json."""
+
+from __future__ import annotations
+
+import marshal
+import os
+import re
+import unittest
+
+from helpers import WorkspaceTestCase
+
+TASK_ID = "T-000001"
+
+
+class TasksCacheInvalidationTest(WorkspaceTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.cache_path = self.root / ".agentctl" / "tasks.cache"
+        self.title = self.load_tasks_json()["tasks"][0]["title"]
+        self.assertIn(self.title, self.shown_title())
+        self.agentctl("task", "list")
+        self.assertTrue(self.cache_path.exists())
+
+    def shown_title(self) -> str:
+        return self.agentctl("task", "show", TASK_ID).stdout
+
+    def listed(self) -> str:
+        """The `task list` line of TASK_ID."""
+        lines = [line for line in self.agentctl("task", "list").stdout.splitlines() if line.startswith(TASK_ID + " ")]
+        self.assertEqual(len(lines), 1)
+        return lines[0]
+
+    def edit_title(self, new_title: str) -> None:
+        """Hand-edit the first task's title in place, leaving meta (and its checksum) untouched."""
+        raw = self.tasks_path.read_bytes()
+        old = f'"title": "{self.title}"'.encode("utf-8")
+        self.assertIn(old, raw)
+        edited = raw.replace(old, f'"title": "{new_title}"'.encode("utf-8"), 1)
+        with self.tasks_path.open("r+b") as handle:
+            handle.write(edited)
+            handle.truncate()
+
+    def assert_sees(self, title: str) -> None:
+        self.assertIn(title, self.shown_title())
+        self.assertTrue(self.listed().endswith(f"] {title}"))
+
+    def test_edit_changing_size_is_seen(self) -> None:
+        self.edit_title(self.title + " (edited)")
+        self.assert_sees(self.title + " (edited)")
+
+    def test_same_size_edit_with_restored_mtime_is_seen(self) -> None:
+        before = os.stat(self.tasks_path)
+        new_title = re.sub(r"\w", "x", self.title)
+        self.edit_title(new_title)
+        os.utime(self.tasks_path, ns=(before.st_atime_ns, before.st_mtime_ns))
+        after = os.stat(self.tasks_path)
+        self.assertEqual((after.st_size, after.st_mtime_ns), (before.st_size, before.st_mtime_ns))
+        self.assert_sees(new_title)
+
+    def test_cache_written_in_the_edit_tick_is_not_trusted(self) -> None:
+        # A same-size edit in the same timestamp tick as the cache write keeps the
+        # whole signature. Reproduce that state: relabel the cache (still holding
+        # the old content) with the edited file's signature.
+        new_title = re.sub(r"\w", "x", self.title)
+        self.edit_title(new_title)
+        stamp = max(os.stat(self.tasks_path).st_mtime_ns, os.stat(self.tasks_path).st_ctime_ns)
+
+        def relabel(cache_mtime_ns: int) -> None:
+            with self.cache_path.open("rb") as handle:
+                version, path, size, _, checksum = marshal.load(handle)
+                rest = handle.read()
+            self.cache_path.write_bytes(marshal.dumps((version, path, size, stamp, checksum)) + rest)
+            os.utime(self.cache_path, ns=(cache_mtime_ns, cache_mtime_ns))
+
+        # Sanity check: a cache written after the edit tick is served as-is.
+        relabel(stamp + 1)
+        self.assertTrue(self.listed().endswith(f"] {self.title}"))
+
+        # Written in the edit tick: rebuilt from tasks.json.
+        relabel(stamp)
+        self.assert_sees(new_title)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""The streaming tasks.json reader must accept and reject exactly what json.loads does."""
+
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from pathlib import Path
+from typing import List, Optional
+from unittest import mock
+
+import helpers  # noqa: F401 - puts scripts/ on sys.path
+
+import agentctl_core
+
+VALID = [
+    '{"tasks": [{"id": "x"}], "meta": {"checksum": "abc", "nested": [1, {"a": "]}"}]}}\n',
+    '{"meta": {"checksum": "abc"}, "tasks": [{"id": "x"}, {"id": "y", "title": "tasks \\"]\\" }"}]}',
+    '  {"tasks": []}  \n\n',
+    '{"tasks": [{"id": "x"}], "x": null}',
+]
+INVALID = [
+    '{"tasks": [{"id": "x"}], "x": }',
+    '{"tasks": [{"id": "x"}], "meta": {"checksum": "abc"}',
+    '{"tasks": [{"id": "x"}]} trailing',
+    '{"tasks": [{"id": "x"}]}{"tasks": []}',
+    '{"tasks": [{"id": "x"}],}',
+    '{"tasks": [{"id": "x"},]}',
+    '{"tasks": [{"id": "x"}], meta: {}}',
+    '{"tasks": [{"id": "x"}] "meta": {}}',
+    '{"tasks": [{"id": "x"}',
+]
+
+
+class TasksStreamTest(unittest.TestCase):
+    def stream(self, text: str, chunk_size: int) -> Optional[List]:
+        """Tasks from iter_tasks_json, or None when it rejects the document."""
+        with tempfile.TemporaryDirectory() as scratch:
+            path = Path(scratch) / "tasks.json"
+            path.write_text(text, encoding="utf-8")
+            with mock.patch.object(agentctl_core, "STREAM_CHUNK_SIZE", chunk_size), redirect_stderr(io.StringIO()):
+                try:
+                    return list(agentctl_core.iter_tasks_json(path))
+                except SystemExit:
+                    return None
+
+    def test_matches_json_loads(self) -> None:
+        for text in VALID + INVALID:
+            try:
+                expected: Optional[List] = json.loads(text)["tasks"]
+            except ValueError:
+                expected = None
+            self.assertEqual(expected is None, text in INVALID, text)
+            for chunk_size in (1, 3, 7, 1 << 16):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    self.assertEqual(self.stream(text, chunk_size), expected)
+
+    def test_duplicate_tasks_key_is_rejected(self) -> None:
+        self.assertIsNone(self.stream('{"tasks": [{"id": "x"}], "tasks": [{"id": "y"}]}', 1 << 16))
+
+    def test_tasks_must_be_a_list_of_objects(self) -> None:
+        for text in ('{"tasks": {}}', '{"meta": {}}', '{"tasks": [1]}'):
+            with self.subTest(text=text):
+                self.assertIsNone(self.stream(text, 1 << 16))
+
+
+if __name__ == "__main__":
+    unittest.main()
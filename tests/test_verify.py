@@ -0,0 +1,95 @@
+"""verify: fail-fast reporting and the verify result cache key."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import unittest
+from typing import Optional
+
+from helpers import WorkspaceTestCase
+
+TASK_ID = "T-900001"
+FIRST_FAILURE = "sleep 0.3; exit 5"
+OWN_FAILURE = "trap '' TERM; sleep 1; exit 4"  # ignores the fail-fast SIGTERM, then fails on its own
+LONG_RUNNING = "sleep 30"
+QUEUED = "true"
+
+
+class VerifyFailFastTest(WorkspaceTestCase):
+    tasks = 5
+
+    def test_real_failures_are_not_reported_as_cancelled(self) -> None:
+        verify = []
+        for command in (FIRST_FAILURE, OWN_FAILURE, LONG_RUNNING, QUEUED):
+            verify += ["--verify", command]
+        self.agentctl(
+            "task", "add", TASK_ID,
+            "--title", "Verify fail-fast",
+            "--description", "Concurrent verify commands.",
+            "--priority", "med",
+            "--owner", "CODER",
+            *verify,
+        )
+
+        proc = self.agentctl("verify", TASK_ID, "--jobs", "3", "--fail-fast", "--no-cache", check=False)
+
+        self.assertEqual(proc.returncode, 5)
+        self.assertIn("❌ exit 5 after", proc.stderr)
+        self.assertIn("❌ exit 4 after", proc.stderr)
+        self.assertIn(OWN_FAILURE, proc.stderr)
+        self.assertEqual(proc.stdout.count("⏹️ cancelled"), 1)
+        self.assertIn(f"$ {LONG_RUNNING}\n⏹️ cancelled", proc.stdout)
+        self.assertIn(f"⏭️ skipped (fail-fast): {QUEUED}", proc.stdout)
+
+
+class VerifyCacheContextTest(WorkspaceTestCase):
+    tasks = 5
+
+    def context(self) -> Optional[str]:
+        code = "import sys; sys.path.insert(0, 'scripts'); import agentctl_core; print(agentctl_core.verify_cache_context())"
+        out = subprocess.run([sys.executable, "-c", code], cwd=self.root, env=self.env(), capture_output=True, text=True, check=True)
+        value = out.stdout.strip()
+        return None if value == "None" else value
+
+    def git(self, *argv: str) -> None:
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@localhost", *argv],
+            cwd=self.root, check=True, capture_output=True,
+        )
+
+    def test_untracked_files_are_part_of_the_key(self) -> None:
+        clean = self.context()
+        self.assertIsNotNone(clean)
+        data = self.root / "data.txt"
+        data.write_text("one\n", encoding="utf-8")
+        with_data = self.context()
+        self.assertNotEqual(with_data, clean)
+        data.write_text("two\n", encoding="utf-8")  # same size, new content
+        self.assertNotIn(self.context(), (clean, with_data))
+        data.unlink()
+        self.assertEqual(self.context(), clean)
+
+        # Ignored files and tasks.json edits do not count.
+        (self.root / ".agentctl").mkdir(exist_ok=True)
+        (self.root / ".agentctl" / "scratch").write_text("x", encoding="utf-8")
+        self.agentctl("task", "comment", "T-000001", "--author", "CODER", "--body", "noise")
+        self.assertEqual(self.context(), clean)
+
+    def test_key_follows_index_not_head(self) -> None:
+        data = self.root / "data.txt"
+        data.write_text("one\n", encoding="utf-8")
+        self.git("add", "data.txt")
+        staged = self.context()
+        self.assertIsNotNone(staged)
+        self.git("commit", "-q", "-m", "add data")
+        self.assertEqual(self.context(), staged)  # same files, new HEAD
+
+        data.write_text("two\n", encoding="utf-8")
+        self.assertIsNone(self.context())  # unstaged edit of a tracked file: no caching
+        self.git("add", "data.txt")
+        self.assertNotIn(self.context(), (None, staged))
+
+
+if __name__ == "__main__":
+    unittest.main()